@@ -12,5 +12,18 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'careerlift.settings')
+# Reuse connections through the in-process pool (see DATABASES in settings);
+# 32 is mysql.connector's maximum pool size
+os.environ.setdefault('DB_POOL_SIZE', '32')
+# Serve the async dashboards (see core.async_views)
+os.environ.setdefault('ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+from core.async_views import RequestLimit  # noqa: E402
+
+if settings.DB_POOL_SIZE:
+    # Leave a pooled connection for each dashboard query worker
+    application = RequestLimit(application, max(1, settings.DB_POOL_SIZE - settings.ASYNC_QUERY_WORKERS))
@@ -43,6 +43,9 @@ INSTALLED_APPS = [
     # UI Frameworks
     'crispy_forms',
     'crispy_tailwind',
+
+    # JSON API (core.api_views)
+    'rest_framework',
 ]
 
 # ---------------------------
@@ -60,14 +63,21 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'core.routers.ReplicaPinMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 # ---------------------------
-# URLS & WSGI
+# URLS, WSGI & ASGI
 # ---------------------------
 ROOT_URLCONF = 'careerlift.urls'
 WSGI_APPLICATION = 'careerlift.wsgi.application'
+ASGI_APPLICATION = 'careerlift.asgi.application'
+
+# Serve the async dashboards in core.async_views (careerlift.asgi turns this on)
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False') == 'True'
+# Worker threads (each with its own DB connection) for concurrent dashboard queries
+ASYNC_QUERY_WORKERS = int(os.getenv('ASYNC_QUERY_WORKERS', '8'))
 
 # ---------------------------
 # TEMPLATE CONFIGURATION
@@ -76,13 +86,22 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, "core", "templates")],
-        'APP_DIRS': True,
+        # APP_DIRS must be off when loaders are listed explicitly; the
+        # app_directories loader below takes its place.
+        'APP_DIRS': False,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Compiled templates are kept in memory for the life of the process
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
@@ -90,6 +109,18 @@ TEMPLATES = [
 # ---------------------------
 # DATABASE CONFIG (MYSQL)
 # ---------------------------
+# Connections are kept open between requests for DB_CONN_MAX_AGE seconds and
+# pinged before reuse, so a request doesn't pay the TCP + auth handshake.
+# Set DB_USE_PURE=False to use the C extension (compare with `manage.py bench_db`).
+#
+# DB_POOL_SIZE > 0 switches to mysql.connector's in-process pool instead:
+# Django closes the connection after every request, which hands it back to the
+# pool. careerlift.asgi enables this by default, since persistent connections
+# are per-thread and ASGI runs sync code on short-lived executor threads.
+# A request that finds the pool empty fails with PoolError; careerlift.asgi
+# queues requests beyond DB_POOL_SIZE - ASYNC_QUERY_WORKERS to avoid that.
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '0'))
+
 DATABASES = {
     'default': {
         'ENGINE': 'mysql.connector.django',
@@ -98,14 +129,118 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD', ''),
         'HOST': os.getenv('DB_HOST', 'mysql'),
         'PORT': os.getenv('DB_PORT', '3306'),
+        'CONN_MAX_AGE': 0 if DB_POOL_SIZE else int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
         'OPTIONS': {
             'autocommit': True,
-            'use_pure': True,
+            'use_pure': os.getenv('DB_USE_PURE', 'True') == 'True',
             'auth_plugin': 'mysql_native_password',
         },
     }
 }
 
+if DB_POOL_SIZE:
+    DATABASES['default']['OPTIONS'].update({
+        'pool_name': 'careerlift',
+        'pool_size': DB_POOL_SIZE,
+        # Undo session variables and temporary tables left by the previous request
+        'pool_reset_session': True,
+    })
+
+# ---------------------------
+# READ REPLICA
+# ---------------------------
+# With DB_REPLICA_HOST set, views using ReplicaReadMixin (dashboards, listings,
+# admin change lists) read from the replica; see core.routers. For local
+# testing, point it at a second database on the same server (DB_REPLICA_NAME).
+# Tests use the default test database for both aliases.
+if os.getenv('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'USER': os.getenv('DB_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.getenv('DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'HOST': os.getenv('DB_REPLICA_HOST'),
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+        'TEST': {'MIRROR': 'default'},
+    }
+    if DB_POOL_SIZE:
+        DATABASES['replica']['OPTIONS']['pool_name'] = 'careerlift-replica'
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Seconds a browser reads from the primary after a POST/PUT/DELETE
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', '10'))
+# Replicas further behind than this (in seconds) are skipped
+REPLICA_MAX_LAG = int(os.getenv('REPLICA_MAX_LAG', '5'))
+REPLICA_HEALTH_CHECK_INTERVAL = int(os.getenv('REPLICA_HEALTH_CHECK_INTERVAL', '5'))
+
+# Completed, rejected and cancelled sessions scheduled longer ago than this
+# are moved to SessionArchive by the archive_sessions command
+SESSION_ARCHIVE_AFTER_DAYS = int(os.getenv('SESSION_ARCHIVE_AFTER_DAYS', '365'))
+SESSION_ARCHIVE_BATCH_SIZE = int(os.getenv('SESSION_ARCHIVE_BATCH_SIZE', '1000'))
+
+# Rows read per query by the streaming CSV/JSON Lines exports (core.export)
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+
+# Weeks of upcoming AvailabilitySlot rows kept materialized from the weekly
+# availability rules; rolled forward nightly by roll_availability_slots
+AVAILABILITY_SLOT_WEEKS = int(os.getenv('AVAILABILITY_SLOT_WEEKS', '4'))
+
+# ---------------------------
+# CACHE
+# ---------------------------
+# CACHE_VERSION should be bumped on every deploy so stale pages and
+# fragments rendered by the previous release are never served.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'careerlift'),
+        'KEY_PREFIX': 'careerlift',
+        'VERSION': int(os.getenv('CACHE_VERSION', '1')),
+    }
+}
+
+# Serialized .ics feeds up to this size are cached between calendar polls (see core.ical)
+CALENDAR_FEED_CACHE_MAX_BYTES = int(os.getenv('CALENDAR_FEED_CACHE_MAX_BYTES', str(256 * 1024)))
+CALENDAR_FEED_CACHE_TIMEOUT = int(os.getenv('CALENDAR_FEED_CACHE_TIMEOUT', str(24 * 60 * 60)))
+
+# Full-page cache for anonymous visitors (see core.cache)
+PAGE_CACHE_ENABLED = os.getenv('PAGE_CACHE_ENABLED', 'True') == 'True'
+PAGE_CACHE_TIMEOUT = int(os.getenv('PAGE_CACHE_TIMEOUT', '600'))
+
+# ---------------------------
+# SESSIONS
+# ---------------------------
+# db:             one django_session read per authenticated request
+# cached_db:      reads served from the cache above, written through to the
+#                 database; needs a shared CACHE_BACKEND (Redis/Memcached) to
+#                 help across workers
+# signed_cookies: no server-side storage at all; logging out doesn't revoke a
+#                 copied cookie before it expires
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_ENGINES[os.getenv('SESSION_BACKEND', 'db')]
+SESSION_COOKIE_AGE = int(os.getenv('SESSION_COOKIE_AGE', str(60 * 60 * 24 * 14)))
+
+# ---------------------------
+# REST API
+# ---------------------------
+REST_FRAMEWORK = {
+    'DEFAULT_VERSIONING_CLASS': 'rest_framework.versioning.NamespaceVersioning',
+    'ALLOWED_VERSIONS': ['v1'],
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
+    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticated'],
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+}
+
 # ---------------------------
 # PASSWORD VALIDATION
 # ---------------------------
@@ -147,6 +282,14 @@ CRISPY_TEMPLATE_PACK = 'tailwind'
 # ---------------------------
 AUTH_USER_MODEL = 'core.User'
 
+# Loads the user together with their mentor profile. Sessions remember the
+# backend that logged them in, so the stock backend stays listed for sessions
+# created before this one was added.
+AUTHENTICATION_BACKENDS = [
+    'core.identity.MentorProfileBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 LOGIN_URL = 'core:login'
 LOGIN_REDIRECT_URL = 'core:home'
 LOGOUT_REDIRECT_URL = 'core:home'
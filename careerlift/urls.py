@@ -26,6 +26,8 @@ def health(request):
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('health',health),
+    # New API versions get their own namespace; request.version is the namespace
+    path('api/v1/', include(('core.api_urls', 'api'), namespace='v1')),
     path('', include(('core.urls', 'core'), namespace='core')),  # All URLs are now in core.urls with 'core' namespace
 ]
 
@@ -1,15 +1,37 @@
 from django.contrib import admin
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
-from django.dispatch import receiver
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils import timezone
+from django.shortcuts import redirect
 
-from .models import Mentor, Project, ProjectImage, Resume, Feedback, Session, Availability
+from .export import export_response
+from .forms import WeeklyAvailabilityFormSet
+from .ical import invalidate_session_feeds
+from .models import Mentor, Project, ProjectImage, Resume, Feedback, Session, SessionArchive, Availability
+from .routers import serve_from_replica
+from .slots import regenerate_slots
 
 User = get_user_model()
 
+class ReplicaChangeListMixin:
+    """Read change lists from the replica; bulk actions are POSTs and stay on the primary."""
+    def changelist_view(self, request, extra_context=None):
+        return serve_from_replica(request, super().changelist_view, extra_context)
+
+class ExportActionsMixin:
+    """
+    Download the selected rows -- or, after "Select all", every row matching
+    the change list's filters and search -- as a streamed CSV or JSON Lines file.
+    """
+    def export_csv(self, request, queryset):
+        return export_response(request, queryset, 'csv')
+    export_csv.short_description = 'Export selected as CSV'
+    
+    def export_jsonl(self, request, queryset):
+        return export_response(request, queryset, 'jsonl')
+    export_jsonl.short_description = 'Export selected as JSON Lines'
+
 class MentorInline(admin.StackedInline):
     model = Mentor
     can_delete = False
@@ -18,7 +40,7 @@ class MentorInline(admin.StackedInline):
     extra = 0
 
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(ReplicaChangeListMixin, ExportActionsMixin, admin.ModelAdmin):
     list_display = ('username', 'email', 'full_name', 'is_student', 'is_mentor', 'is_active', 'last_login')
     list_filter = ('is_student', 'is_mentor', 'is_active', 'date_joined')
     search_fields = ('username', 'email', 'first_name', 'last_name')
@@ -34,7 +56,7 @@ class UserAdmin(admin.ModelAdmin):
             return []
         return super().get_inline_instances(request, obj)
     
-    actions = ['activate_users', 'deactivate_users']
+    actions = ['activate_users', 'deactivate_users', 'export_csv', 'export_jsonl']
     
     def activate_users(self, request, queryset):
         updated = queryset.update(is_active=True)
@@ -48,16 +70,27 @@ class UserAdmin(admin.ModelAdmin):
 
 class AvailabilityInline(admin.TabularInline):
     model = Availability
+    formset = WeeklyAvailabilityFormSet
     extra = 1
     fields = ('day_of_week', 'start_time', 'end_time', 'is_recurring')
 
 @admin.register(Mentor)
-class MentorAdmin(admin.ModelAdmin):
-    list_display = ('user_link', 'title', 'company', 'is_available', 'session_count', 'upcoming_sessions_count')
+class MentorAdmin(ReplicaChangeListMixin, ExportActionsMixin, admin.ModelAdmin):
+    list_display = ('user_link', 'title', 'company', 'is_available', 'rating_average', 'rating_count',
+                    'session_count', 'upcoming_sessions_count')
     search_fields = ('user__username', 'title', 'company', 'user__email')
     list_filter = ('is_available', 'user__is_active')
     list_per_page = 25
     inlines = [AvailabilityInline]
+    actions = ['export_csv', 'export_jsonl']
+    
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Slots may have been added, changed or removed through the inline
+        mentor = form.instance
+        mentor.refresh_weekly_availability()
+        mentor.save(update_fields=['weekly_availability', 'updated_at'])
+        regenerate_slots([mentor.pk])
     
     def user_link(self, obj):
         url = reverse('admin:core_user_change', args=[obj.user.id])
@@ -94,14 +127,35 @@ class SessionStatusFilter(admin.SimpleListFilter):
             today = now.date()
             return queryset.filter(scheduled_time__date=today)
 
+class ArchivedSessionsFilter(admin.SimpleListFilter):
+    """Old terminal sessions live in SessionArchive; choosing this opens its change list."""
+    title = 'archive'
+    parameter_name = 'archived'
+
+    def lookups(self, request, model_admin):
+        return [('1', 'Archived sessions')]
+
+    def queryset(self, request, queryset):
+        # Handled by SessionAdmin.changelist_view
+        return queryset
+
 @admin.register(Session)
-class SessionAdmin(admin.ModelAdmin):
+class SessionAdmin(ReplicaChangeListMixin, ExportActionsMixin, admin.ModelAdmin):
     list_display = ('title', 'student_link', 'mentor_link', 'scheduled_time', 'duration_minutes', 'status_badge', 'created_at')
-    list_filter = ('status', SessionStatusFilter, 'scheduled_time')
+    list_filter = ('status', SessionStatusFilter, 'scheduled_time', ArchivedSessionsFilter)
     search_fields = ('title', 'student__username', 'mentor__username', 'student__email', 'mentor__email')
     date_hierarchy = 'scheduled_time'
     list_per_page = 25
-    actions = ['mark_as_completed', 'cancel_sessions']
+    actions = ['mark_as_completed', 'cancel_sessions', 'export_csv', 'export_jsonl']
+    
+    def changelist_view(self, request, extra_context=None):
+        if request.GET.get(ArchivedSessionsFilter.parameter_name) == '1':
+            # Same field names, so the other filters and the search carry over
+            query = request.GET.copy()
+            del query[ArchivedSessionsFilter.parameter_name]
+            url = reverse('admin:core_sessionarchive_changelist')
+            return redirect(f'{url}?{query.urlencode()}' if query else url)
+        return super().changelist_view(request, extra_context)
     
     def student_link(self, obj):
         url = reverse('admin:core_user_change', args=[obj.student.id])
@@ -132,15 +186,36 @@ class SessionAdmin(admin.ModelAdmin):
     status_badge.admin_order_field = 'status'
     
     def mark_as_completed(self, request, queryset):
-        updated = queryset.update(status='completed')
+        invalidate_session_feeds(queryset)
+        updated = queryset.update(status='completed', updated_at=timezone.now())
         self.message_user(request, f'{updated} sessions marked as completed.')
     mark_as_completed.short_description = 'Mark selected sessions as completed'
     
     def cancel_sessions(self, request, queryset):
-        updated = queryset.update(status='cancelled')
+        invalidate_session_feeds(queryset)
+        updated = queryset.update(status='cancelled', updated_at=timezone.now())
         self.message_user(request, f'{updated} sessions have been cancelled.')
     cancel_sessions.short_description = 'Cancel selected sessions'
 
+@admin.register(SessionArchive)
+class SessionArchiveAdmin(SessionAdmin):
+    """Read-only view of sessions moved out of the live table by archive_sessions."""
+    list_display = SessionAdmin.list_display + ('archived_at',)
+    list_filter = ('status', SessionStatusFilter, 'scheduled_time')
+    actions = None
+
+    def changelist_view(self, request, extra_context=None):
+        return super(SessionAdmin, self).changelist_view(request, extra_context)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
 class ProjectImageInline(admin.TabularInline):
     model = ProjectImage
     extra = 1
@@ -153,12 +228,18 @@ class ProjectImageInline(admin.TabularInline):
     preview_image.short_description = 'Preview'
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(ReplicaChangeListMixin, ExportActionsMixin, admin.ModelAdmin):
     list_display = ('title', 'student_link', 'created_at', 'tech_stack_list')
     search_fields = ('title', 'description', 'student__username')
     list_filter = ('created_at',)
     inlines = [ProjectImageInline]
     list_per_page = 20
+    actions = ['export_csv', 'export_jsonl']
+    
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Images may have been added or removed through the inline
+        form.instance.update_cover_image()
     
     def student_link(self, obj):
         url = reverse('admin:core_user_change', args=[obj.student.id])
@@ -170,7 +251,7 @@ class ProjectAdmin(admin.ModelAdmin):
     tech_stack_list.short_description = 'Tech Stack'
 
 @admin.register(Resume)
-class ResumeAdmin(admin.ModelAdmin):
+class ResumeAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
     list_display = ('title', 'student_link', 'uploaded_at', 'is_primary')
     list_filter = ('is_primary', 'uploaded_at')
     search_fields = ('title', 'student__username')
@@ -182,10 +263,11 @@ class ResumeAdmin(admin.ModelAdmin):
     student_link.short_description = 'Student'
 
 @admin.register(Feedback)
-class FeedbackAdmin(admin.ModelAdmin):
-    list_display = ('mentor_link', 'student_link', 'created_at', 'short_content')
+class FeedbackAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
+    list_display = ('mentor_link', 'student_link', 'rating', 'created_at', 'short_content')
     search_fields = ('content', 'mentor__username', 'student__username')
-    list_filter = ('created_at',)
+    list_filter = ('rating', 'created_at')
+    raw_id_fields = ('session',)
     list_per_page = 20
     
     def mentor_link(self, obj):
@@ -201,16 +283,3 @@ class FeedbackAdmin(admin.ModelAdmin):
     def short_content(self, obj):
         return f"{obj.content[:100]}..." if len(obj.content) > 100 else obj.content
     short_content.short_description = 'Content'
-
-# Signal to create/delete mentor profile when user.is_mentor changes
-@receiver(post_save, sender=User)
-def update_mentor_profile(sender, instance, created, **kwargs):
-    """Create or delete mentor profile when user.is_mentor changes."""
-    if hasattr(instance, 'mentor_profile'):
-        if not instance.is_mentor:
-            # User is no longer a mentor, delete the profile
-            instance.mentor_profile.delete()
-    elif instance.is_mentor:
-        # User is now a mentor, create a profile
-        from .models import Mentor
-        Mentor.objects.get_or_create(user=instance)
@@ -0,0 +1,12 @@
+from rest_framework.routers import DefaultRouter
+
+from . import api_views
+
+router = DefaultRouter()
+router.register('sessions', api_views.SessionViewSet, basename='session')
+router.register('mentors', api_views.MentorViewSet, basename='mentor')
+router.register('availability', api_views.AvailabilityViewSet, basename='availability')
+router.register('projects', api_views.ProjectViewSet, basename='project')
+router.register('resumes', api_views.ResumeViewSet, basename='resume')
+
+urlpatterns = router.urls
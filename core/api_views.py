@@ -0,0 +1,199 @@
+"""
+Read-only JSON API, version 1 (mounted at /api/v1/).
+
+Every list is keyset-paginated (``?cursor=`` from the previous page's
+``next``), accepts ``?fields=a,b`` to return -- and SELECT -- only those
+fields, and answers ``If-None-Match`` with a 304 from a single
+COUNT/MAX(updated_at) query before any row is read.
+"""
+import base64
+import datetime
+import json
+
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework import viewsets
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .conditional import not_modified, queryset_validators, set_validators, validators
+from .mixins import ReplicaReadMixin
+from .models import Availability, Mentor, Project, Resume, Session
+from .serializers import (
+    AvailabilitySerializer, MentorSerializer, ProjectSerializer, ResumeSerializer, SessionSerializer,
+)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward cursor pagination on the view's ``cursor_ordering``, which must end
+    with a unique field. The cursor holds the last row's ordering values, so
+    each page is an index range scan however deep the client has scrolled.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 20
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = view.cursor_ordering
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.after(self.decode(queryset.model, cursor)))
+
+        page = list(queryset[:self.page_size + 1])
+        self.has_next = len(page) > self.page_size
+        page = page[:self.page_size]
+        self.last = page[-1] if page else None
+        return page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            size = self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def after(self, values):
+        """Rows that sort after ``values``: (a > x) OR (a = x AND b > y) ..."""
+        condition = Q()
+        for i, field in enumerate(self.ordering):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            step = Q(**{f'{field.lstrip("-")}__{lookup}': values[i]})
+            for previous, value in zip(self.ordering[:i], values):
+                step &= Q(**{previous.lstrip('-'): value})
+            condition |= step
+        return condition
+
+    def encode(self, obj):
+        values = []
+        for field in self.ordering:
+            value = getattr(obj, field.lstrip('-'))
+            values.append(value.isoformat() if isinstance(value, (datetime.date, datetime.time)) else value)
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode(self, model, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            fields = [model._meta.pk if name.lstrip('-') == 'pk' else model._meta.get_field(name.lstrip('-'))
+                      for name in self.ordering]
+            if len(values) != len(fields):
+                raise ValueError
+            return [field.to_python(value) for field, value in zip(fields, values)]
+        except Exception:
+            raise NotFound('Invalid cursor.')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode(self.last))
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+
+class ReadOnlyApiViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    """Sparse fieldsets, keyset pagination and conditional GET for a read-only resource."""
+    pagination_class = KeysetPagination
+    cursor_ordering = ('pk',)
+
+    @cached_property
+    def requested_fields(self):
+        fields = self.request.query_params.get('fields')
+        if not fields:
+            return None
+        requested = [name.strip() for name in fields.split(',') if name.strip()]
+        unknown = set(requested) - set(self.serializer_class.Meta.fields)
+        if unknown:
+            raise ValidationError({'fields': f'Unknown fields: {", ".join(sorted(unknown))}'})
+        return requested
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.requested_fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        # The cursor and the validators read these even when they weren't asked for
+        always = {field.lstrip('-') for field in self.cursor_ordering} | {'updated_at'}
+        return self.get_serializer().queryset_for(self.get_base_queryset(), always=always - {'pk'})
+
+    def get_base_queryset(self):
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        etag, last_modified = queryset_validators(queryset, request.user.pk, request.get_full_path())
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            page = self.paginate_queryset(queryset)
+            response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return set_validators(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, last_modified = validators(instance.updated_at, request.user.pk, request.get_full_path())
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+        return set_validators(response, etag, last_modified)
+
+
+class SessionViewSet(ReadOnlyApiViewSet):
+    """Sessions the user takes part in, as student or mentor."""
+    serializer_class = SessionSerializer
+    cursor_ordering = ('scheduled_time', 'id')
+
+    def get_base_queryset(self):
+        user = self.request.user
+        sessions = Session.objects.filter(Q(student=user) | Q(mentor=user))
+        status = self.request.query_params.get('status')
+        return sessions.filter(status=status) if status else sessions
+
+
+class MentorViewSet(ReadOnlyApiViewSet):
+    """The mentor directory."""
+    serializer_class = MentorSerializer
+    cursor_ordering = ('pk',)
+
+    def get_base_queryset(self):
+        return Mentor.objects.filter(user__is_mentor=True, user__is_active=True)
+
+
+class AvailabilityViewSet(ReadOnlyApiViewSet):
+    """Weekly availability slots, optionally for one mentor (``?mentor=<id>``)."""
+    serializer_class = AvailabilitySerializer
+    cursor_ordering = ('mentor_id', 'day_of_week', 'start_time', 'id')
+
+    def get_base_queryset(self):
+        slots = Availability.objects.filter(mentor__user__is_mentor=True)
+        mentor = self.request.query_params.get('mentor')
+        if mentor:
+            if not mentor.isdecimal():
+                raise ValidationError({'mentor': 'Must be a mentor id.'})
+            slots = slots.filter(mentor_id=mentor)
+        return slots
+
+
+class ProjectViewSet(ReadOnlyApiViewSet):
+    """The user's own projects, newest first."""
+    serializer_class = ProjectSerializer
+    cursor_ordering = ('-created_at', '-id')
+
+    def get_base_queryset(self):
+        return Project.objects.filter(student=self.request.user)
+
+
+class ResumeViewSet(ReadOnlyApiViewSet):
+    """The user's own resumes, newest first."""
+    serializer_class = ResumeSerializer
+    cursor_ordering = ('-uploaded_at', '-id')
+
+    def get_base_queryset(self):
+        return Resume.objects.filter(student=self.request.user)
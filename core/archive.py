@@ -0,0 +1,92 @@
+"""
+Session archival.
+
+Completed, rejected and cancelled sessions never change again, but left in
+``core_session`` they stay in every index the live pages use. ``archive_sessions``
+moves the old ones into ``SessionArchive`` a batch at a time: each batch is
+copied and deleted in one short transaction, so the live table is never
+locked for long and an interrupted run simply continues with what's left.
+
+Pages read the live table only; ``with_archived`` merges in archived rows for
+the views that offer them, a page at a time.
+"""
+import datetime
+import heapq
+import time
+from operator import attrgetter
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Session, SessionArchive
+
+ARCHIVED_FIELDS = [
+    'id', 'student_id', 'mentor_id', 'title', 'description', 'status',
+    'scheduled_time', 'duration_minutes', 'created_at', 'updated_at',
+]
+
+
+def archivable_sessions(before=None):
+    """Terminal sessions scheduled before ``before`` (default: SESSION_ARCHIVE_AFTER_DAYS ago)."""
+    if before is None:
+        before = timezone.now() - datetime.timedelta(days=settings.SESSION_ARCHIVE_AFTER_DAYS)
+    return Session.objects.filter(status__in=Session.TERMINAL_STATUSES, scheduled_time__lt=before)
+
+
+def archive_sessions(before=None, batch_size=None, sleep=0):
+    """Move archivable sessions into SessionArchive, yielding the number moved per batch."""
+    batch_size = batch_size or settings.SESSION_ARCHIVE_BATCH_SIZE
+    sessions = archivable_sessions(before).order_by('pk')
+    while True:
+        with transaction.atomic():
+            rows = list(sessions.values(*ARCHIVED_FIELDS)[:batch_size])
+            if not rows:
+                return
+            # ignore_conflicts: a row copied by a run that died before its
+            # delete committed is already there
+            SessionArchive.objects.bulk_create(
+                [SessionArchive(**row) for row in rows], ignore_conflicts=True,
+            )
+            Session.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+        yield len(rows)
+        if sleep:
+            time.sleep(sleep)
+
+
+class MergedSessions:
+    """
+    A Session queryset and a SessionArchive queryset, both ordered by ``key``,
+    as one sequence in that order that a Paginator can page through. A slice
+    ending at ``stop`` reads at most ``stop`` rows from each queryset.
+    """
+
+    def __init__(self, sessions, archived, key='-scheduled_time'):
+        self.sessions = sessions.order_by(key)
+        self.archived = archived.order_by(key)
+        self.key = key
+
+    def count(self):
+        return self.sessions.count() + self.archived.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        stop = index.stop
+        if stop is None or stop < 0 or (index.start or 0) < 0:
+            # Only bounded slices can stop early
+            sessions, archived = self.sessions, self.archived
+        else:
+            sessions, archived = self.sessions[:stop], self.archived[:stop]
+        merged = list(heapq.merge(
+            sessions, archived, key=attrgetter(self.key.lstrip('-')), reverse=self.key.startswith('-'),
+        ))
+        return merged[index]
+
+
+def with_archived(sessions, archived, key='-scheduled_time'):
+    """Merge live and archived sessions, ordered by ``key``; see ``MergedSessions``."""
+    return MergedSessions(sessions, archived, key)
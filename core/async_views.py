@@ -0,0 +1,176 @@
+"""
+Async dashboards, used in place of the views in core.views under ASGI.
+
+A dashboard is a dozen small independent queries. Gathering the async ORM
+methods (``acount()``, ``aget()``...) doesn't overlap them, because Django
+runs every one of them on the request's single thread-sensitive executor.
+``gather_queries`` gives each query its own worker thread and database
+connection instead, so a dashboard takes roughly as long as its slowest
+query. Anything that needs the request's own connection still goes through
+the async ORM.
+
+Worker threads keep persistent connections (CONN_MAX_AGE) like any other
+thread, or hand them back to the pool when DB_POOL_SIZE is set. The pool
+must cover every request thread plus ASYNC_QUERY_WORKERS; ``RequestLimit``
+keeps requests within what's left so they queue instead of failing.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.db import close_old_connections
+from django.template.response import TemplateResponse
+from django.utils import timezone
+from django.views import View
+
+from .mixins import ReplicaReadMixin
+from .models import Mentor, Session, User
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.ASYNC_QUERY_WORKERS, thread_name_prefix='careerlift-query'
+        )
+    return _executor
+
+
+def _run_query(query):
+    try:
+        return query()
+    finally:
+        # What request_finished does for a request's connection
+        close_old_connections()
+
+
+async def gather_queries(*queries):
+    """Run zero-argument ORM callables concurrently and return their results in order."""
+    executor = _get_executor()
+    return await asyncio.gather(*(
+        sync_to_async(_run_query, thread_sensitive=False, executor=executor)(query)
+        for query in queries
+    ))
+
+
+class RequestLimit:
+    """
+    ASGI wrapper that serves at most ``limit`` HTTP requests at once; the
+    rest wait for a place. ASGI starts a thread per request, each holding
+    a pooled connection, so without it a burst empties the pool.
+    """
+
+    def __init__(self, app, limit):
+        self.app = app
+        self.limit = asyncio.Semaphore(limit)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        # Held until the response body is sent: streamed exports read as they send
+        async with self.limit:
+            return await self.app(scope, receive, send)
+
+
+class AsyncDashboardView(ReplicaReadMixin, View):
+    """Login-required async dashboard; subclasses build the context in ``get_context_data``."""
+    template_name = None
+
+    async def get(self, request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        # Let templates use the user loaded above instead of resolving request.user again
+        request.user = user
+        context = await self.get_context_data(user)
+        return TemplateResponse(request, self.template_name, context)
+
+    async def get_context_data(self, user):
+        raise NotImplementedError
+
+
+class StudentDashboardView(AsyncDashboardView):
+    template_name = 'student/dashboard.html'
+
+    async def get_context_data(self, user):
+        now = timezone.now()
+        sessions = Session.objects.filter(student=user)
+        upcoming_sessions = sessions.filter(
+            scheduled_time__gte=now,
+            status__in=['accepted', 'requested']
+        ).select_related('mentor').order_by('scheduled_time')
+        accepted_sessions = upcoming_sessions.filter(status='accepted')
+        mentors = User.objects.filter(
+            id__in=sessions.values_list('mentor', flat=True).distinct(),
+            is_mentor=True
+        )
+        projects = user.projects.all()
+        resumes = user.resumes.all()
+
+        (upcoming_list, accepted_list, mentor_list, recent_projects,
+         upcoming_count, accepted_count, mentors_count, projects_count,
+         sessions_count, resumes_count) = await gather_queries(
+            lambda: list(upcoming_sessions[:5]),
+            lambda: list(accepted_sessions[:5]),
+            lambda: list(mentors[:3]),
+            lambda: list(projects.order_by('-created_at')[:3]),
+            upcoming_sessions.count,
+            accepted_sessions.count,
+            mentors.count,
+            projects.count,
+            sessions.count,
+            resumes.count,
+        )
+
+        return {
+            'resumes': resumes,
+            'projects': projects,
+            'upcoming_sessions': upcoming_list,
+            'accepted_sessions': accepted_list,
+            'mentors_count': mentors_count,
+            'projects_count': projects_count,
+            'sessions_count': sessions_count,
+            'resumes_count': resumes_count,
+            'mentors': mentor_list,
+            'recent_projects': recent_projects,
+            'upcoming_sessions_count': upcoming_count,
+            'accepted_sessions_count': accepted_count,
+        }
+
+
+class MentorDashboardView(AsyncDashboardView):
+    template_name = 'mentor/dashboard.html'
+
+    async def get_context_data(self, user):
+        try:
+            mentor = await Mentor.objects.select_related('user').aget(user=user)
+        except Mentor.DoesNotExist:
+            return {}
+
+        now = timezone.now()
+        mentor_sessions = mentor.mentor_sessions
+
+        (upcoming_sessions, recent_sessions, recent_activity,
+         pending_requests, total_students, completed_sessions) = await gather_queries(
+            lambda: list(mentor.upcoming_sessions[:5]),
+            lambda: list(mentor_sessions.order_by('-scheduled_time')[:5]),
+            lambda: list(mentor_sessions.order_by('-updated_at')[:5]),
+            mentor.session_requests.count,
+            mentor_sessions.values('student').distinct().count,
+            mentor.completed_sessions.count,
+        )
+
+        return {
+            'mentor': mentor,
+            'upcoming_sessions': upcoming_sessions,
+            'recent_sessions': recent_sessions,
+            'pending_requests': pending_requests,
+            'total_students': total_students,
+            'completed_sessions': completed_sessions,
+            'recent_activity': recent_activity,
+            'now': now,
+        }
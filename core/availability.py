@@ -0,0 +1,95 @@
+"""
+A mentor's weekly availability as one bitmask of 7 × 96 quarter-hours.
+
+Bit ``day * 96 + quarter`` is counted from the top, so the mask written as
+168 hex digits (``encode``) has one digit per hour of the week, Monday 00:00
+first, with that hour's four quarters from the high bit down. The mentor row
+keeps this string next to the slots it's built from
+(``Mentor.weekly_availability``):
+
+* a whole week of slots is checked for overlaps in memory, one AND per slot;
+* "free on Tuesday at 18:00" is a test of one character of one column
+  (``free_at_filter``), with no join to the slots.
+"""
+from django.db.models.functions import Substr
+
+DAYS = 7
+QUARTERS_PER_DAY = 96
+QUARTERS = DAYS * QUARTERS_PER_DAY
+HEX_DIGITS = QUARTERS // 4
+
+EMPTY = '0' * HEX_DIGITS
+
+
+def quarter(value, round_up=False):
+    """The quarter-hour of the day ``value`` (a time) falls in, or ends at."""
+    minutes = value.hour * 60 + value.minute
+    if round_up and (minutes % 15 or value.second or value.microsecond):
+        return minutes // 15 + 1
+    return minutes // 15
+
+
+def is_on_quarter(value):
+    return value.minute % 15 == 0 and not value.second and not value.microsecond
+
+
+def slot_mask(day, start_time, end_time):
+    """
+    The bits of one slot. Times between quarter-hours widen it to the
+    quarters they touch; an ``end_time`` of midnight isn't after any start.
+    """
+    first = day * QUARTERS_PER_DAY + quarter(start_time)
+    last = day * QUARTERS_PER_DAY + quarter(end_time, round_up=True)
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << (QUARTERS - last)
+
+
+def week_mask(slots):
+    """The mask of ``(day, start_time, end_time)`` slots."""
+    mask = 0
+    for day, start_time, end_time in slots:
+        mask |= slot_mask(day, start_time, end_time)
+    return mask
+
+
+def first_overlap(slots, mask=0):
+    """
+    The first of ``slots`` that overlaps ``mask`` or an earlier slot, or None.
+    One bitwise AND per slot, whatever order they come in.
+    """
+    for slot in slots:
+        bits = slot_mask(*slot)
+        if mask & bits:
+            return slot
+        mask |= bits
+    return None
+
+
+def encode(mask):
+    return format(mask, f'0{HEX_DIGITS}x')
+
+
+def decode(value):
+    return int(value or EMPTY, 16)
+
+
+def is_free(value, day, at):
+    """Whether the encoded week ``value`` covers the quarter-hour starting at ``at`` on ``day``."""
+    return bool(decode(value) >> (QUARTERS - 1 - day * QUARTERS_PER_DAY - quarter(at)) & 1)
+
+
+def free_at_filter(field, day, at):
+    """
+    ``(alias, lookup)`` for ``queryset.alias(**alias).filter(**lookup)``,
+    matching rows whose encoded week in ``field`` covers the quarter-hour at
+    ``at`` on ``day``: the hour's hex digit must have that quarter's bit set.
+    """
+    hour = quarter(at) // 4
+    bit = 8 >> quarter(at) % 4
+    digits = [format(value, 'x') for value in range(16) if value & bit]
+    alias = f'{field.replace("__", "_")}_hour'
+    return (
+        {alias: Substr(field, day * 24 + hour + 1, 1)},
+        {f'{alias}__in': digits},
+    )
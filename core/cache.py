@@ -0,0 +1,116 @@
+"""
+Response and fragment caching helpers.
+
+Anonymous pages (home, login, registration) are identical for every visitor
+apart from the CSRF token, so the rendered response is stored once with the
+token swapped for a placeholder and the visitor's own token is put back on
+every hit. Only the bare URL is cached: one entry per page, however many
+query strings visitors make up. Mentor directory cards are cached per mentor and invalidated by
+bumping that mentor's version when the mentor or their user row is saved.
+
+Every key goes through the default cache, whose ``VERSION`` comes from the
+``CACHE_VERSION`` setting, so a deploy that bumps it drops everything at once.
+"""
+import functools
+import re
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import patch_vary_headers
+
+CSRF_PLACEHOLDER = b'__careerlift_csrf_token__'
+CSRF_INPUT_RE = re.compile(rb'(name="csrfmiddlewaretoken" value=")[^"]+(")')
+
+PAGE_CACHE_KEY = 'page:{path}'
+MENTOR_CARD_VERSION_KEY = 'mentor_card_version:{pk}'
+
+# Campaign tracking parameters don't change the page, so it's still served from the cache
+TRACKING_PARAMS = ('gclid', 'fbclid')
+
+
+def _is_cacheable_request(request):
+    """Only cookie-less anonymous GETs are safe to share between visitors."""
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    # A session cookie may belong to a logged-in user; resolving it costs a query
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        return False
+    # Pending flash messages are rendered into the page
+    if 'messages' in request.COOKIES:
+        return False
+    return True
+
+
+def _page_cache_key(request):
+    """The page's key, or None if the query string may change the page (``?next=``...)."""
+    if any(not name.startswith('utm_') and name not in TRACKING_PARAMS for name in request.GET):
+        return None
+    return PAGE_CACHE_KEY.format(path=request.path)
+
+
+def cache_anonymous_page(view_func=None, timeout=None):
+    """
+    Serve a whole rendered page from the cache to anonymous visitors.
+
+    Authenticated requests, requests carrying pending messages and non-GET
+    requests always reach the view. Rendered CSRF tokens are replaced by the
+    requesting visitor's token, so cached login and registration forms still
+    validate, and the response keeps ``Vary: Cookie`` for downstream caches.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(request, *args, **kwargs):
+            key = _page_cache_key(request)
+            if not settings.PAGE_CACHE_ENABLED or key is None or not _is_cacheable_request(request):
+                return func(request, *args, **kwargs)
+
+            cached = cache.get(key)
+            if cached is not None:
+                content, status, headers = cached
+                response = HttpResponse(
+                    content.replace(CSRF_PLACEHOLDER, get_token(request).encode()),
+                    status=status,
+                )
+                for header, value in headers:
+                    response[header] = value
+                patch_vary_headers(response, ('Cookie',))
+                return response
+
+            response = func(request, *args, **kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                response = response.render()
+            # csrf_protect views set the CSRF cookie themselves; that one is per-visitor
+            # and re-issued on every hit, anything else makes the page private
+            if response.status_code == 200 and not response.cookies.keys() - {settings.CSRF_COOKIE_NAME}:
+                content = CSRF_INPUT_RE.sub(rb'\1' + CSRF_PLACEHOLDER + rb'\2', response.content)
+                headers = list(response.items())
+                cache.set(
+                    key, (content, response.status_code, headers),
+                    settings.PAGE_CACHE_TIMEOUT if timeout is None else timeout,
+                )
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+
+    if view_func is not None:
+        return decorator(view_func)
+    return decorator
+
+
+def mentor_card_versions(pks):
+    """Return ``{pk: version}`` for the given mentors in one cache round trip."""
+    keys = {MENTOR_CARD_VERSION_KEY.format(pk=pk): pk for pk in pks}
+    found = cache.get_many(keys)
+    return {pk: found.get(key, 0) for key, pk in keys.items()}
+
+
+def bump_mentor_card_version(pk):
+    """Invalidate one mentor's cached directory card."""
+    key = MENTOR_CARD_VERSION_KEY.format(pk=pk)
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Evicted between add() and incr()
+            cache.set(key, 1, None)
@@ -0,0 +1,53 @@
+"""
+Conditional GET validators derived from the data behind a response.
+
+A response built from a queryset changes only when a row in it is added,
+removed or saved, so ``COUNT(*)`` and ``MAX(updated_at)`` over that queryset
+-- one aggregate query -- are enough to answer ``If-None-Match`` before any
+row is fetched, serialized or rendered. Only single rows also get a
+Last-Modified: a set can lose a row without its newest date moving.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def queryset_validators(queryset, *parts, field='updated_at'):
+    """
+    Return a weak ETag for ``queryset``, and None for Last-Modified.
+
+    ``parts`` are anything else the response depends on (the user, the query
+    string...) and are folded into the ETag.
+
+    A row that leaves the set (deleted, or filtered out by its new status)
+    doesn't raise MAX(updated_at), so a date alone would call the old
+    response current; only the ETag, which also covers the count, can say so.
+    """
+    summary = queryset.order_by().aggregate(count=Count('pk'), last_modified=Max(field))
+    etag, _ = validators(summary['last_modified'], summary['count'], *parts)
+    return etag, None
+
+
+def validators(last_modified, *parts):
+    """A weak ETag over ``last_modified`` and ``parts``, and ``last_modified`` itself."""
+    digest = hashlib.sha1(
+        '|'.join(str(part) for part in (last_modified.isoformat() if last_modified else '', *parts)).encode()
+    ).hexdigest()[:20]
+    return f'W/{quote_etag(digest)}', last_modified
+
+
+def not_modified(request, etag, last_modified):
+    """A 304 (or 412) response if the client's copy is current, otherwise None."""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def set_validators(response, etag, last_modified):
+    """Add the validators, and make browsers revalidate rather than guess a freshness lifetime."""
+    response.headers['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    if last_modified:
+        response.headers['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
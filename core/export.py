@@ -0,0 +1,121 @@
+"""
+Streaming CSV and JSON Lines exports of sessions, users, mentors and projects.
+
+An export walks its queryset in primary-key batches. Each batch is one query
+joined to the related tables the columns name (student, mentor, profile...),
+read through ``iterator(chunk_size=...)`` and written out before the next is
+fetched, so memory use is the same for ten rows or ten million and the first
+bytes reach the client straight away.
+"""
+import csv
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import Mentor, Project, Session, User
+
+# Column name -> lookup, for each exportable model
+COLUMNS = {
+    Session: [
+        ('id', 'id'), ('title', 'title'), ('status', 'status'),
+        ('scheduled_time', 'scheduled_time'), ('duration_minutes', 'duration_minutes'),
+        ('student', 'student__username'), ('student_email', 'student__email'),
+        ('mentor', 'mentor__username'), ('mentor_email', 'mentor__email'),
+        ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    ],
+    User: [
+        ('id', 'id'), ('username', 'username'), ('email', 'email'),
+        ('first_name', 'first_name'), ('last_name', 'last_name'),
+        ('is_student', 'is_student'), ('is_mentor', 'is_mentor'), ('is_active', 'is_active'),
+        ('date_joined', 'date_joined'), ('last_login', 'last_login'),
+        ('mentor_title', 'mentor_profile__title'), ('mentor_company', 'mentor_profile__company'),
+    ],
+    Mentor: [
+        ('id', 'user_id'), ('username', 'user__username'), ('email', 'user__email'),
+        ('first_name', 'user__first_name'), ('last_name', 'user__last_name'),
+        ('title', 'title'), ('company', 'company'), ('linkedin_url', 'linkedin_url'),
+        ('is_available', 'is_available'), ('updated_at', 'updated_at'),
+    ],
+    Project: [
+        ('id', 'id'), ('title', 'title'), ('tech_stack', 'tech_stack'),
+        ('student', 'student__username'), ('student_email', 'student__email'),
+        ('cover_image', 'cover_image__image'),
+        ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    ],
+}
+
+
+def export_header(model):
+    return [name for name, _ in COLUMNS[model]]
+
+
+def export_batches(queryset, chunk_size=None):
+    """Yield the rows of ``queryset`` as lists of tuples, one list per query, in primary-key order."""
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    lookups = [lookup for _, lookup in COLUMNS[queryset.model]]
+    # Whatever the change list ordered or joined by, the export walks the primary key
+    queryset = queryset.select_related(None).order_by('pk')
+    last_pk = None
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = []
+        for pk, *values in batch.values_list('pk', *lookups)[:chunk_size].iterator(chunk_size=chunk_size):
+            rows.append(tuple(values))
+            last_pk = pk
+        if not rows:
+            return
+        yield rows
+        if len(rows) < chunk_size:
+            return
+
+
+class _Echo:
+    """A file-like object whose write() returns what it was given, for csv.writer."""
+    def write(self, value):
+        return value
+
+
+def render_csv(model, batches):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(export_header(model))
+    for rows in batches:
+        yield ''.join(writer.writerow(row) for row in rows)
+
+
+def render_jsonl(model, batches):
+    header = export_header(model)
+    for rows in batches:
+        yield ''.join(json.dumps(dict(zip(header, row)), cls=DjangoJSONEncoder) + '\n' for row in rows)
+
+
+FORMATS = {
+    'csv': (render_csv, 'text/csv'),
+    'jsonl': (render_jsonl, 'application/x-ndjson'),
+}
+
+
+async def _async_chunks(chunks):
+    # Under ASGI a plain iterator would be read into memory before sending;
+    # pull one batch at a time through the sync thread instead
+    done = object()
+    next_chunk = sync_to_async(next)
+    while (chunk := await next_chunk(chunks, done)) is not done:
+        yield chunk
+
+
+def export_response(request, queryset, format='csv', chunk_size=None):
+    """A StreamingHttpResponse downloading ``queryset`` as CSV or JSON Lines."""
+    render, content_type = FORMATS[format]
+    model = queryset.model
+    chunks = render(model, export_batches(queryset, chunk_size))
+    if isinstance(request, ASGIRequest):
+        chunks = _async_chunks(chunks)
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    filename = f'{model._meta.model_name}s-{timezone.now():%Y%m%d-%H%M%S}.{format}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,65 @@
+"""
+Shared Tailwind styling for form widgets.
+
+Widget classes used to be patched onto ``self.fields`` in each form's
+``__init__``, which rebuilt the same attribute dicts on every request. The
+metaclasses here apply them once, to ``base_fields``, when the form class is
+created; Django's per-instance deepcopy of ``base_fields`` then carries them
+into every bound form for free.
+
+Precedence, lowest first: the default class for the widget type, attrs
+passed to the widget declaration, then the form's ``widget_attrs`` mapping
+of field name to attrs.
+"""
+import copy
+
+from django import forms
+from django.forms.forms import DeclarativeFieldsMetaclass
+from django.forms.models import ModelFormMetaclass
+
+INPUT_CLASSES = 'mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500'
+INPUT_SM_CLASSES = f'{INPUT_CLASSES} sm:text-sm'
+CHECKBOX_CLASSES = 'h-4 w-4 text-blue-600 focus:ring-blue-500 border-gray-300 rounded'
+FILE_INPUT_CLASSES = (
+    'block w-full text-sm text-gray-500 file:mr-4 file:py-2 file:px-4 file:rounded-full '
+    'file:border-0 file:text-sm file:font-semibold file:bg-blue-50 file:text-blue-700 hover:file:bg-blue-100'
+)
+
+
+def default_widget_class(widget):
+    """Return the Tailwind class for a widget type, or None to leave it unstyled."""
+    if isinstance(widget, forms.HiddenInput):
+        return None
+    if isinstance(widget, forms.CheckboxInput):
+        return CHECKBOX_CLASSES
+    if isinstance(widget, forms.FileInput):
+        return FILE_INPUT_CLASSES
+    return INPUT_CLASSES
+
+
+def style_fields(fields, widget_attrs):
+    for name, field in fields.items():
+        attrs = {}
+        css_class = default_widget_class(field.widget)
+        if css_class:
+            attrs['class'] = css_class
+        attrs.update(field.widget.attrs)
+        attrs.update(widget_attrs.get(name, {}))
+        field.widget.attrs = attrs
+
+
+class StyledFormMetaclass(DeclarativeFieldsMetaclass):
+    def __new__(mcs, name, bases, attrs):
+        new_class = super().__new__(mcs, name, bases, attrs)
+        # Inherited Field objects are shared with the parent class; copy before styling
+        new_class.base_fields = copy.deepcopy(new_class.base_fields)
+        style_fields(new_class.base_fields, getattr(new_class, 'widget_attrs', {}))
+        return new_class
+
+
+class StyledModelFormMetaclass(ModelFormMetaclass):
+    def __new__(mcs, name, bases, attrs):
+        new_class = super().__new__(mcs, name, bases, attrs)
+        new_class.base_fields = copy.deepcopy(new_class.base_fields)
+        style_fields(new_class.base_fields, getattr(new_class, 'widget_attrs', {}))
+        return new_class
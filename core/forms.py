@@ -2,90 +2,51 @@ from django import forms
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.forms import inlineformset_factory
 from .models import User, Mentor, Project, Resume, Feedback, Availability, Session
+from .availability import encode, first_overlap, week_mask
+from .form_styles import StyledFormMetaclass, StyledModelFormMetaclass, INPUT_SM_CLASSES
 
-class UserRegisterForm(UserCreationForm):
+class UserRegisterForm(UserCreationForm, metaclass=StyledModelFormMetaclass):
     email = forms.EmailField(
         required=True,
-        widget=forms.EmailInput(attrs={
-            'placeholder': 'Enter your email address',
-            'class': 'mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500',
-            'required': 'required'
-        })
+        widget=forms.EmailInput(attrs={'placeholder': 'Enter your email address', 'required': 'required'})
     )
     first_name = forms.CharField(
         required=True,
         max_length=30,
-        widget=forms.TextInput(attrs={
-            'placeholder': 'First name',
-            'class': 'mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500',
-            'required': 'required'
-        })
+        widget=forms.TextInput(attrs={'placeholder': 'First name', 'required': 'required'})
     )
     last_name = forms.CharField(
         required=True,
         max_length=30,
-        widget=forms.TextInput(attrs={
-            'placeholder': 'Last name',
-            'class': 'mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500',
-            'required': 'required'
-        })
+        widget=forms.TextInput(attrs={'placeholder': 'Last name', 'required': 'required'})
     )
     username = forms.CharField(
         required=True,
         max_length=30,
-        widget=forms.TextInput(attrs={
-            'placeholder': 'Choose a username',
-            'class': 'mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500',
-            'required': 'required'
-        })
+        widget=forms.TextInput(attrs={'placeholder': 'Choose a username', 'required': 'required'})
     )
     password1 = forms.CharField(
         required=True,
-        widget=forms.PasswordInput(attrs={
-            'placeholder': 'Create a password',
-            'class': 'mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500',
-            'required': 'required'
-        })
+        widget=forms.PasswordInput(attrs={'placeholder': '••••••••', 'required': 'required'})
     )
     password2 = forms.CharField(
         required=True,
-        widget=forms.PasswordInput(attrs={
-            'placeholder': 'Confirm password',
-            'class': 'mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500',
-            'required': 'required'
-        })
+        widget=forms.PasswordInput(attrs={'placeholder': '••••••••', 'required': 'required'})
     )
     is_mentor = forms.BooleanField(
         required=False, 
         label='Register as a mentor',
         help_text='Check this if you want to register as a mentor.',
-        widget=forms.CheckboxInput(attrs={
-            'class': 'h-4 w-4 text-blue-600 focus:ring-blue-500 border-gray-300 rounded'
-        })
     )
     
     class Meta:
         model = User
         fields = ['username', 'email', 'first_name', 'last_name', 'password1', 'password2', 'is_mentor']
-        
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # Add Tailwind classes to form fields
-        for field_name, field in self.fields.items():
-            if field_name == 'username':
-                field.widget.attrs.update({
-                    'class': 'mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500',
-                    'placeholder': 'Choose a username'
-                })
-            elif field_name in ['password1', 'password2']:
-                field.widget.attrs.update({
-                    'class': 'mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500',
-                    'placeholder': '••••••••'
-                })
     
     def clean_first_name(self):
         first_name = self.cleaned_data.get('first_name', '').strip()
@@ -139,59 +100,39 @@ class UserRegisterForm(UserCreationForm):
                 )
         return user
 
-class UserLoginForm(AuthenticationForm):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # Add Tailwind classes to form fields
-        for field_name, field in self.fields.items():
-            field.widget.attrs['class'] = 'mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500'
+class UserLoginForm(AuthenticationForm, metaclass=StyledFormMetaclass):
+    pass
 
-class UserUpdateForm(forms.ModelForm):
+class UserUpdateForm(forms.ModelForm, metaclass=StyledModelFormMetaclass):
     first_name = forms.CharField(
         required=True,
         max_length=30,
-        widget=forms.TextInput(attrs={
-            'class': 'mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500 sm:text-sm',
-            'required': 'required'
-        })
+        widget=forms.TextInput(attrs={'class': INPUT_SM_CLASSES, 'required': 'required'})
     )
     last_name = forms.CharField(
         required=True,
         max_length=30,
-        widget=forms.TextInput(attrs={
-            'class': 'mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500 sm:text-sm',
-            'required': 'required'
-        })
+        widget=forms.TextInput(attrs={'class': INPUT_SM_CLASSES, 'required': 'required'})
     )
     email = forms.EmailField(
         required=True,
-        widget=forms.EmailInput(attrs={
-            'class': 'mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500 sm:text-sm',
-            'required': 'required'
-        })
+        widget=forms.EmailInput(attrs={'class': INPUT_SM_CLASSES, 'required': 'required'})
     )
     
     class Meta:
         model = User
         fields = ['first_name', 'last_name', 'email', 'phone', 'bio', 'profile_picture']
         widgets = {
-            'bio': forms.Textarea(attrs={
-                'rows': 3,
-                'class': 'mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500 sm:text-sm'
-            }),
+            'bio': forms.Textarea(attrs={'rows': 3, 'class': INPUT_SM_CLASSES}),
             'phone': forms.TextInput(attrs={
                 'placeholder': 'Enter your phone number',
-                'class': 'mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500 sm:text-sm'
+                'class': INPUT_SM_CLASSES
             }),
         }
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # Add Tailwind classes to profile picture field
-        self.fields['profile_picture'].widget.attrs.update({
-            'class': 'block w-full text-sm text-gray-500 file:mr-4 file:py-2 file:px-4 file:rounded-full file:border-0 file:text-sm file:font-semibold file:bg-blue-50 file:text-blue-700 hover:file:bg-blue-100',
-            'accept': 'image/*'
-        })
+    widget_attrs = {
+        'profile_picture': {'accept': 'image/*'},
+    }
         
     def clean_first_name(self):
         first_name = self.cleaned_data.get('first_name', '').strip()
@@ -230,8 +171,8 @@ class AvailabilityForm(forms.ModelForm):
         (6, 'Sunday'),
     ]
     day_of_week = forms.ChoiceField(choices=DAY_CHOICES)
-    start_time = forms.TimeField(widget=TimeInput(attrs={'class': 'w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500'}))
-    end_time = forms.TimeField(widget=TimeInput(attrs={'class': 'w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500'}))
+    start_time = forms.TimeField(widget=TimeInput(attrs={'class': 'w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500', 'step': 900}))
+    end_time = forms.TimeField(widget=TimeInput(attrs={'class': 'w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500', 'step': 900}))
     is_recurring = forms.BooleanField(
         required=False, 
         initial=True,
@@ -309,8 +250,68 @@ class SessionForm(forms.ModelForm):
         return duration
 
 
+class WeeklyAvailabilityFormSet(forms.BaseInlineFormSet):
+    """
+    A mentor's availability slots, checked for overlaps as a whole week.
+
+    Every slot, including ones added in the same submission, is one AND
+    against the bitmask of the slots before it (see core.availability), so
+    validation costs no queries. ``weekly_mask`` is the resulting week.
+    """
+    weekly_mask = None
+
+    def slot(self, form):
+        data = form.cleaned_data
+        return int(data['day_of_week']), data['start_time'], data['end_time']
+
+    def clean(self):
+        super().clean()
+        if any(self.errors):
+            return
+        # Slots the submission left out (a stale page) still take up their time
+        listed = {form.instance.pk for form in self.initial_forms}
+        mask = week_mask(
+            (slot.day_of_week, slot.start_time, slot.end_time)
+            for slot in self.get_queryset() if slot.pk not in listed
+        )
+        slots = [
+            self.slot(form) for form in self.forms
+            if form.cleaned_data and not self._should_delete_form(form)
+        ]
+        overlap = first_overlap(slots, mask)
+        if overlap:
+            day, start_time, end_time = overlap
+            slot = Availability(day_of_week=day, start_time=start_time, end_time=end_time)
+            raise forms.ValidationError(f'{slot} overlaps with another availability slot.')
+        self.weekly_mask = mask | week_mask(slots)
+
+    def bulk_save(self):
+        """
+        Save the changes with one query each for deleted, new and changed
+        slots, and set the mentor's ``weekly_availability`` (the caller saves
+        the mentor).
+        """
+        self.save(commit=False)
+        with transaction.atomic():
+            if self.deleted_objects:
+                Availability.objects.filter(
+                    mentor=self.instance, pk__in=[slot.pk for slot in self.deleted_objects],
+                ).delete()
+            if self.new_objects:
+                Availability.objects.bulk_create(self.new_objects)
+            changed = [slot for slot, _ in self.changed_objects]
+            if changed:
+                now = timezone.now()
+                for slot in changed:
+                    slot.updated_at = now
+                Availability.objects.bulk_update(
+                    changed, ['day_of_week', 'start_time', 'end_time', 'is_recurring', 'updated_at'],
+                )
+        self.instance.weekly_availability = encode(self.weekly_mask)
+
+
 # Formset for managing multiple availability slots
-class CustomInlineFormSet(forms.BaseInlineFormSet):
+class CustomInlineFormSet(WeeklyAvailabilityFormSet):
     def clean(self):
         super().clean()
         # Check that at least one time slot is provided
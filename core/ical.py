@@ -0,0 +1,160 @@
+"""
+iCalendar (.ics) feeds of a user's accepted sessions.
+
+Calendar apps poll a feed without logging in, so each user has a secret feed
+URL (``feed_url``). Its token is an HMAC of the user's id and password hash:
+changing the password revokes every old URL.
+
+``write_feed`` writes the calendar a batch of events at a time from
+``iterator()``, so years of history never become one large string. Feeds up
+to CALENDAR_FEED_CACHE_MAX_BYTES are also kept in the cache, keyed by a
+per-user version that ``invalidate_feeds`` moves on whenever one of the
+user's sessions changes. A poll is then the token check plus a cache hit, and
+with the ETag it got last time, usually a 304.
+"""
+import datetime
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from .models import Session
+
+FEED_TOKEN_SALT = 'core.ical.feed_token'
+FEED_VERSION_KEY = 'calendar_feed_version:{pk}'
+FEED_KEY = 'calendar_feed:{pk}:{version}'
+CONTENT_TYPE = 'text/calendar; charset=utf-8'
+
+# Events written per chunk of output
+EVENTS_PER_CHUNK = 100
+
+
+def feed_token(user):
+    return salted_hmac(FEED_TOKEN_SALT, f'{user.pk}:{user.password}').hexdigest()[:32]
+
+
+def check_feed_token(user, token):
+    return constant_time_compare(feed_token(user), token)
+
+
+def feed_url(user):
+    return reverse('core:sessions:calendar_feed', args=[user.pk, feed_token(user)])
+
+
+def feed_sessions(user):
+    """The sessions in ``user``'s feed: accepted ones, as student or mentor."""
+    return Session.objects.filter(Q(student=user) | Q(mentor=user), status='accepted')
+
+
+def feed_cache_key(pk):
+    """The cache key of user ``pk``'s current feed."""
+    key = FEED_VERSION_KEY.format(pk=pk)
+    version = cache.get(key)
+    if version is None:
+        # A timestamp, not a counter: after an eviction the new version can't
+        # collide with one an old cached feed was stored under
+        version = time.time_ns()
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return FEED_KEY.format(pk=pk, version=version)
+
+
+def invalidate_feeds(user_ids):
+    """Move the given users' feeds to a new version; call after the change commits."""
+    now = time.time_ns()
+    cache.set_many({FEED_VERSION_KEY.format(pk=pk): now for pk in set(user_ids)}, None)
+
+
+def invalidate_session_feeds(sessions):
+    """
+    Invalidate the feeds of everyone taking part in ``sessions`` once the
+    current transaction commits. For querysets about to be changed with
+    ``update()``, which sends no signals; read them before the update.
+    """
+    sessions = sessions.order_by()
+    user_ids = (
+        set(sessions.values_list('student_id', flat=True).distinct())
+        | set(sessions.values_list('mentor_id', flat=True).distinct())
+    )
+    transaction.on_commit(lambda: invalidate_feeds(user_ids))
+
+
+def escape_text(value):
+    return (
+        value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """``line`` with CRLF, folded at 75 octets as RFC 5545 requires."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Don't split a UTF-8 sequence
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start, limit = end, 74
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def format_utc(value):
+    return value.astimezone(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def write_feed(sessions, name='CareerLift sessions'):
+    """Yield the iCalendar text for ``sessions``, a chunk of events at a time."""
+    yield ''.join(fold(line) for line in (
+        'BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//CareerLift//Sessions//EN',
+        'CALSCALE:GREGORIAN', 'METHOD:PUBLISH', f'X-WR-CALNAME:{escape_text(name)}',
+    ))
+    rows = sessions.order_by('pk').values_list(
+        'pk', 'title', 'description', 'scheduled_time', 'duration_minutes', 'updated_at',
+    ).iterator(chunk_size=500)
+    chunk, events = [], 0
+    for pk, title, description, scheduled_time, duration, updated_at in rows:
+        end = scheduled_time + datetime.timedelta(minutes=duration)
+        chunk.extend(fold(line) for line in (
+            'BEGIN:VEVENT',
+            f'UID:session-{pk}@careerlift',
+            f'DTSTAMP:{format_utc(updated_at)}',
+            f'DTSTART:{format_utc(scheduled_time)}',
+            f'DTEND:{format_utc(end)}',
+            f'SUMMARY:{escape_text(title)}',
+            f'DESCRIPTION:{escape_text(description)}',
+            'STATUS:CONFIRMED',
+            'END:VEVENT',
+        ))
+        events += 1
+        if events % EVENTS_PER_CHUNK == 0:
+            yield ''.join(chunk)
+            chunk = []
+    chunk.append(fold('END:VCALENDAR'))
+    yield ''.join(chunk)
+
+
+def caching_feed(chunks, key, etag, last_modified):
+    """
+    Pass ``chunks`` through and, if the whole feed fits in
+    CALENDAR_FEED_CACHE_MAX_BYTES, cache it under ``key`` once it's complete.
+    """
+    kept, size = [], 0
+    for chunk in chunks:
+        yield chunk
+        if kept is not None:
+            size += len(chunk)
+            if size <= settings.CALENDAR_FEED_CACHE_MAX_BYTES:
+                kept.append(chunk)
+            else:
+                # Too big to cache; stop holding on to it
+                kept = None
+    if kept is not None:
+        cache.set(key, (etag, last_modified, ''.join(kept)), settings.CALENDAR_FEED_CACHE_TIMEOUT)
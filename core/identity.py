@@ -0,0 +1,63 @@
+"""
+Request-scoped identity map.
+
+The logged-in user is loaded with their mentor profile in the same query (see
+``MentorProfileBackend``), and everything else a request needs about who is
+involved -- the user's mentor profile, mentors referenced by the URL -- is
+resolved once through ``identity_map(request)`` and reused by the view, its
+form and its template.
+"""
+from django.contrib import messages
+from django.contrib.auth.backends import ModelBackend
+from django.utils.functional import cached_property
+
+from .models import Mentor, User
+
+
+class MentorProfileBackend(ModelBackend):
+    """Load the session's user joined to their mentor profile, so ``user.mentor_profile`` costs no query."""
+
+    def get_user(self, user_id):
+        try:
+            user = User._default_manager.select_related('mentor_profile').get(pk=user_id)
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+
+class IdentityMap:
+    def __init__(self, request):
+        self.request = request
+        self._mentors = {}
+
+    @cached_property
+    def mentor_profile(self):
+        """The current mentor's profile, created on first visit if it's missing."""
+        user = self.request.user
+        try:
+            return user.mentor_profile
+        except Mentor.DoesNotExist:
+            pass
+        profile, created = Mentor.objects.get_or_create(user=user)
+        if created:
+            messages.info(self.request, "Your mentor profile has been created.")
+        user.mentor_profile = profile
+        return profile
+
+    def mentor(self, user_id):
+        """The mentor user ``user_id`` with their profile, or None if there's no such mentor."""
+        user_id = int(user_id)
+        if user_id not in self._mentors:
+            self._mentors[user_id] = (
+                User.objects.select_related('mentor_profile').filter(pk=user_id, is_mentor=True).first()
+            )
+        return self._mentors[user_id]
+
+
+def identity_map(request):
+    """The request's IdentityMap, created on first use."""
+    try:
+        return request.identity
+    except AttributeError:
+        request.identity = IdentityMap(request)
+        return request.identity
@@ -0,0 +1,37 @@
+import datetime
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.archive import archivable_sessions, archive_sessions
+
+
+class Command(BaseCommand):
+    help = 'Move completed, rejected and cancelled sessions older than --days into SessionArchive, in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.SESSION_ARCHIVE_AFTER_DAYS,
+                            help='Archive sessions scheduled more than this many days ago '
+                                 '(default: SESSION_ARCHIVE_AFTER_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=settings.SESSION_ARCHIVE_BATCH_SIZE,
+                            help='Sessions moved per transaction')
+        parser.add_argument('--sleep', type=float, default=0.1, help='Seconds to pause between batches')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be archived')
+
+    def handle(self, *args, **options):
+        before = timezone.now() - datetime.timedelta(days=options['days'])
+        if options['dry_run']:
+            count = archivable_sessions(before).count()
+            self.stdout.write(f'{count} sessions scheduled before {before:%Y-%m-%d} would be archived')
+            return
+
+        start = time.perf_counter()
+        total = 0
+        for moved in archive_sessions(before, options['batch_size'], options['sleep']):
+            total += moved
+            self.stdout.write(f'Archived {total} sessions...')
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {total} sessions scheduled before {before:%Y-%m-%d} in {time.perf_counter() - start:.1f}s'
+        ))
@@ -0,0 +1,284 @@
+import time
+
+from django.apps import apps
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, models, transaction
+from django.db.models import Count
+from django.test import RequestFactory
+
+from core import mentor_views, project_views, resume_views, session_views, views
+from core.models import Session, User
+from core.routers import REPLICA_PIN_COOKIE
+
+# Read paths behind the most-visited pages: (label, view, role of the requesting user)
+HOT_VIEWS = [
+    ('student dashboard', views.StudentDashboardView, 'student'),
+    ('mentor dashboard', views.MentorDashboardView, 'mentor'),
+    ('mentor directory', session_views.MentorListView, 'student'),
+    ('resume list', resume_views.ResumeListView, 'student'),
+    ('project list', project_views.ProjectListView, 'student'),
+    ('session requests', mentor_views.MentorSessionRequestsView, 'mentor'),
+    ('upcoming sessions', mentor_views.MentorUpcomingSessionsView, 'mentor'),
+    ('completed sessions', mentor_views.MentorCompletedSessionsView, 'mentor'),
+    ('mentor availability', mentor_views.MentorAvailabilityView, 'mentor'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Audit core tables: sizes, declared vs actual indexes, unused/duplicate indexes and EXPLAIN of hot queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias to audit')
+        parser.add_argument('--student', help='Username whose pages are explained (default: busiest student)')
+        parser.add_argument('--mentor', help='Username whose pages are explained (default: busiest mentor)')
+        parser.add_argument('--min-rows', type=int, default=1000,
+                            help='Only flag full scans estimated to read at least this many rows (MySQL)')
+        parser.add_argument('--skip-explain', action='store_true', help='Skip running the hot views')
+
+    def handle(self, *args, **options):
+        self.connection = connections[options['database']]
+        self.options = options
+        self.models = [
+            model for model in apps.get_app_config('core').get_models(include_auto_created=True)
+            if model._meta.managed and not model._meta.proxy
+        ]
+        self.tables = sorted(model._meta.db_table for model in self.models)
+
+        with self.connection.cursor() as cursor:
+            self.actual_indexes = self.get_actual_indexes(cursor)
+            self.audit_tables(cursor)
+            self.audit_declared_indexes()
+            self.audit_duplicate_indexes()
+            self.audit_unused_indexes(cursor)
+        if not options['skip_explain']:
+            self.audit_hot_queries()
+
+    def heading(self, title):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n{title}'))
+
+    # Tables
+
+    def audit_tables(self, cursor):
+        self.heading('Tables')
+        existing = set(self.connection.introspection.table_names(cursor))
+        missing = [table for table in self.tables if table not in existing]
+        for table in missing:
+            self.stdout.write(self.style.ERROR(f'  {table}: missing (unapplied migrations?)'))
+
+        present = [table for table in self.tables if table in existing]
+        if self.connection.vendor == 'mysql':
+            # TABLE_ROWS is InnoDB's estimate; exact counts would scan every table
+            placeholders = ', '.join(['%s'] * len(present))
+            cursor.execute(
+                'SELECT table_name, table_rows, data_length, index_length FROM information_schema.tables '
+                f'WHERE table_schema = DATABASE() AND table_name IN ({placeholders}) '
+                'ORDER BY data_length + index_length DESC',
+                present,
+            )
+            self.stdout.write(f'  {"table":<32} {"~rows":>10} {"data":>10} {"indexes":>10}')
+            for table, rows, data, index in cursor.fetchall():
+                self.stdout.write(f'  {table:<32} {rows or 0:>10} {self.size(data):>10} {self.size(index):>10}')
+        else:
+            for table in present:
+                cursor.execute(f'SELECT COUNT(*) FROM {self.connection.ops.quote_name(table)}')
+                self.stdout.write(f'  {table:<32} {cursor.fetchone()[0]:>10} rows')
+
+    def size(self, length):
+        length = length or 0
+        for unit in ('B', 'KB', 'MB', 'GB'):
+            if length < 1024 or unit == 'GB':
+                return f'{length:.0f} {unit}' if unit == 'B' else f'{length:.1f} {unit}'
+            length /= 1024
+
+    # Indexes
+
+    def get_actual_indexes(self, cursor):
+        """``{table: {index name: {'columns': (...), 'unique': bool, 'primary_key': bool}}}``"""
+        existing = set(self.connection.introspection.table_names(cursor))
+        indexes = {}
+        for table in self.tables:
+            if table not in existing:
+                continue
+            constraints = self.connection.introspection.get_constraints(cursor, table)
+            indexes[table] = {
+                name: {
+                    'columns': tuple(info['columns']),
+                    'unique': info['unique'],
+                    'primary_key': info['primary_key'],
+                }
+                for name, info in constraints.items()
+                if info['index'] or info['unique'] or info['primary_key']
+            }
+        return indexes
+
+    def get_declared_indexes(self, model):
+        """Column tuples Django's migrations create indexes for."""
+        declared = set()
+        for field in model._meta.local_concrete_fields:
+            if field.primary_key or field.unique or field.db_index:
+                declared.add((field.column,))
+        for index in model._meta.indexes:
+            declared.add(tuple(model._meta.get_field(name.lstrip('-')).column for name in index.fields))
+        for fields in model._meta.unique_together:
+            declared.add(tuple(model._meta.get_field(name).column for name in fields))
+        for constraint in model._meta.constraints:
+            if isinstance(constraint, models.UniqueConstraint) and constraint.fields:
+                declared.add(tuple(model._meta.get_field(name).column for name in constraint.fields))
+        return declared
+
+    def audit_declared_indexes(self):
+        self.heading('Declared vs actual indexes')
+        clean = True
+        for model in self.models:
+            table = model._meta.db_table
+            if table not in self.actual_indexes:
+                continue
+            actual = {info['columns'] for info in self.actual_indexes[table].values()}
+            declared = self.get_declared_indexes(model)
+            for columns in sorted(declared):
+                # A composite index whose leading columns match serves the same lookups
+                if not any(index[:len(columns)] == columns for index in actual):
+                    clean = False
+                    self.stdout.write(self.style.ERROR(f'  {table}({", ".join(columns)}): declared but missing'))
+            for name, info in sorted(self.actual_indexes[table].items()):
+                if info['columns'] not in declared and not info['primary_key']:
+                    clean = False
+                    self.stdout.write(self.style.WARNING(
+                        f'  {table}.{name}({", ".join(info["columns"])}): not declared on {model.__name__}'
+                    ))
+        if clean:
+            self.stdout.write(self.style.SUCCESS('  Every declared index exists and nothing else does'))
+
+    def audit_duplicate_indexes(self):
+        self.heading('Duplicate and redundant indexes')
+        found = False
+        for table, indexes in sorted(self.actual_indexes.items()):
+            for name, info in sorted(indexes.items()):
+                if info['unique'] or info['primary_key']:
+                    continue
+                for other, other_info in sorted(indexes.items()):
+                    columns = info['columns']
+                    if other == name or other_info['columns'][:len(columns)] != columns:
+                        continue
+                    # Equal column lists: keep one of the pair
+                    if other_info['columns'] == columns and not other_info['unique'] and other < name:
+                        continue
+                    found = True
+                    self.stdout.write(self.style.WARNING(
+                        f'  {table}.{name}({", ".join(columns)}) is covered by '
+                        f'{other}({", ".join(other_info["columns"])})'
+                    ))
+                    break
+        if not found:
+            self.stdout.write(self.style.SUCCESS('  None'))
+
+    def audit_unused_indexes(self, cursor):
+        self.heading('Unused indexes (performance_schema, since server start)')
+        if self.connection.vendor != 'mysql':
+            self.stdout.write('  Skipped: needs MySQL performance_schema')
+            return
+        placeholders = ', '.join(['%s'] * len(self.tables))
+        try:
+            cursor.execute("SHOW GLOBAL STATUS LIKE 'Uptime'")
+            uptime = int(cursor.fetchone()[1])
+            cursor.execute(
+                'SELECT object_name, index_name FROM performance_schema.table_io_waits_summary_by_index_usage '
+                f'WHERE object_schema = DATABASE() AND object_name IN ({placeholders}) '
+                "AND index_name IS NOT NULL AND index_name <> 'PRIMARY' AND count_star = 0 "
+                'ORDER BY object_name, index_name',
+                self.tables,
+            )
+        except DatabaseError as exc:
+            self.stdout.write(self.style.WARNING(f'  Skipped: {exc}'))
+            return
+        rows = cursor.fetchall()
+        self.stdout.write(f'  Server up {uptime / 3600:.1f} h; counters reset on restart')
+        for table, index in rows:
+            self.stdout.write(self.style.WARNING(f'  {table}.{index}: never used'))
+        if not rows:
+            self.stdout.write(self.style.SUCCESS('  None'))
+
+    # Hot queries
+
+    def get_user(self, role):
+        username = self.options[role]
+        if username:
+            return User.objects.filter(username=username).first()
+        # The user with the most sessions exercises the largest plans
+        column = 'student' if role == 'student' else 'mentor'
+        busiest = (
+            Session.objects.values(column).annotate(total=Count('id')).order_by('-total').first()
+        )
+        if busiest:
+            return User.objects.get(pk=busiest[column])
+        return User.objects.filter(is_mentor=(role == 'mentor')).order_by('pk').first()
+
+    def audit_hot_queries(self):
+        self.heading('EXPLAIN of hot view queries')
+        users = {role: self.get_user(role) for role in ('student', 'mentor')}
+        factory = RequestFactory()
+
+        for label, view_class, role in HOT_VIEWS:
+            user = users[role]
+            if user is None:
+                self.stdout.write(f'  {label}: skipped, no {role} to run it as')
+                continue
+
+            request = factory.get('/')
+            request.user = user
+            # Keep the view's reads on the connection being audited
+            request.COOKIES[REPLICA_PIN_COOKIE] = '1'
+            request._messages = CookieStorage(request)
+
+            queries = []
+
+            def capture(execute, sql, params, many, context):
+                start = time.perf_counter()
+                try:
+                    return execute(sql, params, many, context)
+                finally:
+                    queries.append((sql, params, time.perf_counter() - start))
+
+            with transaction.atomic(using=self.connection.alias):
+                with self.connection.execute_wrapper(capture):
+                    response = view_class.as_view()(request)
+                    if hasattr(response, 'render'):
+                        response.render()
+                transaction.set_rollback(True, using=self.connection.alias)
+
+            selects = {}
+            for sql, params, seconds in queries:
+                if sql.lstrip().upper().startswith('SELECT'):
+                    selects.setdefault(sql, (params, seconds))
+            total_ms = sum(seconds for _, _, seconds in queries) * 1e3
+            self.stdout.write(f'  {label} (as {user.username}): {len(queries)} queries, {total_ms:.1f} ms')
+            for sql, (params, seconds) in selects.items():
+                for problem in self.explain(sql, params):
+                    self.stdout.write(self.style.WARNING(f'    {problem}: {sql[:120]}'))
+
+    def explain(self, sql, params):
+        """Return a description of each expensive step in the query plan."""
+        problems = []
+        with self.connection.cursor() as cursor:
+            if self.connection.vendor == 'mysql':
+                cursor.execute(f'EXPLAIN {sql}', params)
+                columns = [column[0].lower() for column in cursor.description]
+                for row in cursor.fetchall():
+                    step = dict(zip(columns, row))
+                    extra = step.get('extra') or ''
+                    if step['type'] == 'ALL' and (step['rows'] or 0) >= self.options['min_rows']:
+                        problems.append(f'full scan of {step["table"]} (~{step["rows"]} rows)')
+                    if 'Using filesort' in extra:
+                        problems.append(f'filesort on {step["table"]}')
+                    if 'Using temporary' in extra:
+                        problems.append(f'temporary table for {step["table"]}')
+            elif self.connection.vendor == 'sqlite':
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                for row in cursor.fetchall():
+                    detail = row[-1]
+                    if detail.startswith('SCAN') and 'INDEX' not in detail:
+                        problems.append(detail.lower().replace('scan', 'full scan of', 1))
+                    if 'TEMP B-TREE' in detail:
+                        problems.append(detail.lower())
+        return problems
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.test import AsyncRequestFactory, RequestFactory
+
+from core import async_views, views
+from core.models import User
+
+
+class Command(BaseCommand):
+    help = 'Compare latency percentiles of the sync and async dashboards under concurrent load'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per dashboard and mode')
+        parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight at once')
+        parser.add_argument('--student', help='Username of the student to render the dashboard for')
+        parser.add_argument('--mentor', help='Username of the mentor to render the dashboard for')
+
+    def handle(self, *args, **options):
+        student = self._get_user(options['student'], is_mentor=False)
+        mentor = self._get_user(options['mentor'], is_mentor=True)
+        total, concurrency = options['requests'], options['concurrency']
+
+        self.stdout.write(
+            f'\n{total} requests per run, {concurrency} in flight\n'
+            f'{"dashboard":<10} {"mode":<6} {"p50":>9} {"p95":>9} {"p99":>9} {"max":>9} {"req/s":>8}'
+        )
+        dashboards = [
+            ('student', student, views.StudentDashboardView, async_views.StudentDashboardView),
+            ('mentor', mentor, views.MentorDashboardView, async_views.MentorDashboardView),
+        ]
+        for name, user, sync_view, async_view in dashboards:
+            for mode, run in (('sync', self._run_sync), ('async', self._run_async)):
+                start = time.perf_counter()
+                latencies = run(sync_view if mode == 'sync' else async_view, user, total, concurrency)
+                elapsed = time.perf_counter() - start
+                self._report(name, mode, latencies, total / elapsed)
+
+    def _get_user(self, username, is_mentor):
+        users = User.objects.filter(is_mentor=is_mentor)
+        if username:
+            users = users.filter(username=username)
+        user = users.order_by('pk').first()
+        if user is None:
+            raise CommandError(f'No {"mentor" if is_mentor else "student"} found to benchmark with')
+        return user
+
+    def _run_sync(self, view_class, user, total, concurrency):
+        view = view_class.as_view()
+        factory = RequestFactory()
+
+        def request_once(_):
+            request = factory.get('/')
+            request.user = user
+            start = time.perf_counter()
+            view(request).render()
+            latency = time.perf_counter() - start
+            close_old_connections()
+            return latency
+
+        # Like gunicorn's gthread worker: a fixed pool of request threads
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            return list(pool.map(request_once, range(total)))
+
+    def _run_async(self, view_class, user, total, concurrency):
+        view = view_class.as_view()
+        factory = AsyncRequestFactory()
+
+        async def auser():
+            return user
+
+        async def request_once(limit):
+            # ASGIHandler gives every request its own thread for sync code
+            async with limit, ThreadSensitiveContext():
+                request = factory.get('/')
+                request.auser = auser
+                start = time.perf_counter()
+                response = await view(request)
+                await sync_to_async(response.render)()
+                return time.perf_counter() - start
+
+        async def run():
+            limit = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(*(request_once(limit) for _ in range(total)))
+
+        return asyncio.run(run())
+
+    def _report(self, name, mode, latencies, throughput):
+        ordered = sorted(latencies)
+
+        def percentile(percent):
+            return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))] * 1e3
+
+        self.stdout.write(
+            f'{name:<10} {mode:<6} {percentile(50):>7.2f}ms {percentile(95):>7.2f}ms '
+            f'{percentile(99):>7.2f}ms {max(ordered) * 1e3:>7.2f}ms {throughput:>8.1f}'
+        )
@@ -0,0 +1,97 @@
+import statistics
+import time
+
+import mysql.connector
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+# Keys that make mysql.connector hand out pooled connections
+POOL_OPTIONS = ('pool_name', 'pool_size', 'pool_reset_session')
+
+
+class Command(BaseCommand):
+    help = 'Benchmark MySQL connect and query overhead for the pure-Python driver vs the C extension'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connects', type=int, default=50, help='Connections to open per driver')
+        parser.add_argument('--queries', type=int, default=500, help='Queries to run per driver')
+        parser.add_argument('--rows', type=int, default=100, help='Rows fetched by the row-decoding query')
+        parser.add_argument('--database', default='default', help='Database alias to benchmark')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'mysql':
+            raise CommandError(f'bench_db needs a MySQL database, {options["database"]!r} is {connection.vendor}')
+
+        params = connection.get_connection_params()
+        for key in POOL_OPTIONS:
+            params.pop(key, None)
+
+        drivers = [('pure', True)]
+        if mysql.connector.HAVE_CEXT:
+            drivers.append(('cext', False))
+        else:
+            self.stdout.write(self.style.WARNING('C extension not available, benchmarking the pure-Python driver only'))
+
+        self.stdout.write(
+            f'\n{"driver":<6} {"connect p50":>12} {"connect p95":>12} {"ping":>9} {"SELECT 1":>9} '
+            f'{options["rows"]:>4} rows'
+        )
+        for label, use_pure in drivers:
+            driver_params = dict(params, use_pure=use_pure)
+            connect = self._time_connect(driver_params, options['connects'])
+
+            cnx = mysql.connector.connect(**driver_params)
+            try:
+                cursor = cnx.cursor()
+                ping = self._time(lambda: cnx.ping(), options['queries'])
+                select_one = self._time(lambda: self._fetch(cursor, 'SELECT 1'), options['queries'])
+                rows_sql = (
+                    'SELECT id, username, email, first_name, last_name, date_joined, is_mentor '
+                    f'FROM core_user ORDER BY id LIMIT {int(options["rows"])}'
+                )
+                rows = self._time(lambda: self._fetch(cursor, rows_sql), options['queries'])
+                cursor.close()
+            finally:
+                cnx.close()
+
+            self.stdout.write(
+                f'{label:<6} {self._ms(statistics.median(connect)):>12} '
+                f'{self._ms(self._percentile(connect, 95)):>12} '
+                f'{self._ms(statistics.mean(ping)):>9} {self._ms(statistics.mean(select_one)):>9} '
+                f'{self._ms(statistics.mean(rows)):>9}'
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            '\nconnect is paid on every request with DB_CONN_MAX_AGE=0; with persistent or pooled '
+            'connections it is replaced by roughly one ping.'
+        ))
+
+    def _time_connect(self, params, count):
+        timings = []
+        for _ in range(count):
+            start = time.perf_counter()
+            cnx = mysql.connector.connect(**params)
+            timings.append(time.perf_counter() - start)
+            cnx.close()
+        return timings
+
+    def _time(self, func, count):
+        func()  # warm up
+        timings = []
+        for _ in range(count):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return timings
+
+    def _fetch(self, cursor, sql):
+        cursor.execute(sql)
+        return cursor.fetchall()
+
+    def _percentile(self, timings, percent):
+        ordered = sorted(timings)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+    def _ms(self, seconds):
+        return f'{seconds * 1e3:.3f}ms'
@@ -0,0 +1,80 @@
+import timeit
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.middleware.csrf import get_token
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.test import RequestFactory
+
+from core.forms import UserRegisterForm, UserLoginForm, UserUpdateForm
+from core.models import User
+from core.project_forms import ProjectForm
+from core.resume_forms import ResumeForm
+
+
+class Command(BaseCommand):
+    help = 'Benchmark form construction and registration/profile page rendering'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000, help='Constructions per form')
+        parser.add_argument('--renders', type=int, default=200, help='Renders per template and loader')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        renders = options['renders']
+
+        self.stdout.write(f'\nForm construction ({iterations} instances each):')
+        user = User(username='bench', first_name='Bench', last_name='User', email='bench@example.com')
+        forms = [
+            ('UserRegisterForm', lambda: UserRegisterForm()),
+            ('UserLoginForm', lambda: UserLoginForm()),
+            ('UserUpdateForm', lambda: UserUpdateForm(instance=user)),
+            ('ProjectForm', lambda: ProjectForm()),
+            ('ResumeForm', lambda: ResumeForm(user=user)),
+        ]
+        for name, build in forms:
+            seconds = timeit.timeit(build, number=iterations)
+            self.stdout.write(f'  {name:<18} {seconds / iterations * 1e6:8.1f} us/form')
+
+        self.stdout.write(f'\nPage render ({renders} renders each):')
+        factory = RequestFactory()
+        anonymous = factory.get('/register/')
+        anonymous.user = AnonymousUser()
+        profile = factory.get('/profile/')
+        profile.user = user
+        pages = [
+            ('registration/register.html', anonymous, lambda: {'form': UserRegisterForm()}),
+            ('mentor/profile.html', profile, lambda: {'form': UserUpdateForm(instance=user), 'object': user}),
+        ]
+
+        cached = engines['django']
+        uncached = self._uncached_engine()
+        for template_name, request, context in pages:
+            get_token(request)
+            results = []
+            for label, engine in (('uncached', uncached), ('cached', cached)):
+                def render():
+                    engine.get_template(template_name).render(context(), request)
+                render()  # warm up, and fill the cached loader
+                seconds = timeit.timeit(render, number=renders)
+                results.append(seconds / renders * 1e3)
+                self.stdout.write(f'  {template_name:<28} {label:<9} {results[-1]:8.2f} ms/render')
+            self.stdout.write(self.style.SUCCESS(
+                f'  {template_name:<28} speedup   {results[0] / results[1]:8.2f}x'
+            ))
+
+    def _uncached_engine(self):
+        config = settings.TEMPLATES[0]
+        options = dict(config['OPTIONS'])
+        options['loaders'] = [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]
+        return DjangoTemplates({
+            'NAME': 'uncached',
+            'DIRS': config['DIRS'],
+            'APP_DIRS': False,
+            'OPTIONS': options,
+        })
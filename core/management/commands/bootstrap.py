@@ -0,0 +1,26 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Prepare the database for serving: wait for it, migrate and optionally create the superuser, in one process'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--create-superuser', action='store_true',
+                            help='Also run create_superuser_if_not_exists (from DJANGO_SUPERUSER_* variables)')
+
+    def handle(self, *args, **options):
+        # One Django setup and one round of system checks for all the steps,
+        # instead of one per manage.py invocation in the container command
+        steps = [('wait_for_db', {}), ('migrate', {'interactive': False})]
+        if options['create_superuser']:
+            steps.append(('create_superuser_if_not_exists', {}))
+
+        start = time.perf_counter()
+        for name, kwargs in steps:
+            step_start = time.perf_counter()
+            call_command(name, stdout=self.stdout, stderr=self.stderr, verbosity=options['verbosity'], **kwargs)
+            self.stdout.write(f'{name} took {time.perf_counter() - step_start:.2f}s')
+        self.stdout.write(self.style.SUCCESS(f'Bootstrap finished in {time.perf_counter() - start:.2f}s'))
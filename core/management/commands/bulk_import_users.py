@@ -0,0 +1,100 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from core.user_import import import_chunk, read_rows, validate_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Create users, mentor profiles and availability from a CSV or JSON Lines file, '
+        'a chunk at a time, hashing passwords in a process pool'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or JSON Lines file, or '-' for stdin")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Default: from the file extension')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows inserted per transaction')
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Processes hashing passwords (1 hashes in this process)',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Validate the rows without importing them')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        try:
+            stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        except OSError as e:
+            raise CommandError(f'Cannot read {path}: {e}')
+
+        workers = max(1, options['workers'])
+        pool = None
+        if workers > 1 and not options['dry_run']:
+            # Workers only hash; django.setup() gives spawned ones the settings
+            pool = ProcessPoolExecutor(workers, initializer=django.setup)
+
+        def hash_passwords(passwords):
+            if pool is None:
+                return [make_password(password) for password in passwords]
+            return list(pool.map(make_password, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+        self.imported = self.rejected = self.valid = 0
+        self.start = time.perf_counter()
+        chunk = []
+        try:
+            for line_number, data, errors in validate_rows(read_rows(stream, format)):
+                if errors:
+                    self.report_errors([(line_number, errors)])
+                    continue
+                self.valid += 1
+                if options['dry_run']:
+                    continue
+                chunk.append((line_number, data))
+                if len(chunk) >= options['chunk_size']:
+                    self.import_chunk(chunk, hash_passwords)
+                    chunk = []
+            if chunk:
+                self.import_chunk(chunk, hash_passwords)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            if stream is not sys.stdin:
+                stream.close()
+
+        elapsed = time.perf_counter() - self.start
+        if options['dry_run']:
+            summary = f'{self.valid} valid rows, {self.rejected} rejected (dry run, nothing imported)'
+        else:
+            summary = (
+                f'Imported {self.imported} users in {elapsed:.1f}s '
+                f'({self.imported / elapsed if elapsed else 0:.0f} rows/s); {self.rejected} rows rejected'
+            )
+        self.stdout.write(self.style.SUCCESS(summary) if not self.rejected else self.style.WARNING(summary))
+
+    def import_chunk(self, chunk, hash_passwords):
+        try:
+            created, errors = import_chunk(chunk, hash_passwords)
+        except IntegrityError as e:
+            # Someone created one of these usernames since we checked; the
+            # chunk was rolled back as a whole
+            created, errors = 0, [(line_number, {'__all__': [f'Not imported: {e}']}) for line_number, _ in chunk]
+        self.imported += created
+        self.report_errors(errors)
+        elapsed = time.perf_counter() - self.start
+        self.stdout.write(f'Imported {self.imported} users ({self.imported / elapsed:.0f} rows/s)')
+
+    def report_errors(self, errors):
+        self.rejected += len(errors)
+        for line_number, fields in sorted(errors, key=lambda error: error[0]):
+            for field, messages in fields.items():
+                label = '' if field == '__all__' else f'{field}: '
+                for message in messages:
+                    self.stderr.write(f'Line {line_number}: {label}{message}')
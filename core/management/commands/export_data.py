@@ -0,0 +1,64 @@
+import time
+
+from django.core.exceptions import FieldError, ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from core.export import FORMATS, export_batches
+from core.models import Mentor, Project, Session, User
+
+MODELS = {'sessions': Session, 'users': User, 'mentors': Mentor, 'projects': Project}
+
+
+class Command(BaseCommand):
+    help = 'Stream sessions, users, mentors or projects to CSV or JSON Lines, a batch of rows at a time'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=sorted(MODELS))
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--output', help='File to write (default: stdout)')
+        parser.add_argument(
+            '--filter', action='append', default=[], metavar='LOOKUP=VALUE',
+            help='Only export rows matching this lookup, e.g. status=completed (repeatable)',
+        )
+        parser.add_argument('--chunk-size', type=int, help='Rows read per query (default: EXPORT_CHUNK_SIZE)')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias to read from, e.g. replica')
+
+    def handle(self, *args, **options):
+        model = MODELS[options['model']]
+        filters = {}
+        for condition in options['filter']:
+            lookup, sep, value = condition.partition('=')
+            if not sep:
+                raise CommandError(f'--filter must look like lookup=value, not {condition!r}')
+            filters[lookup] = value
+        queryset = model._default_manager.using(options['database'])
+        try:
+            queryset = queryset.filter(**filters)
+        except (FieldError, ValidationError) as e:
+            raise CommandError(f'Invalid --filter: {e}')
+
+        render, _ = FORMATS[options['format']]
+        rows = 0
+
+        def batches():
+            nonlocal rows
+            for batch in export_batches(queryset, options['chunk_size']):
+                rows += len(batch)
+                yield batch
+
+        start = time.perf_counter()
+        output = open(options['output'], 'w', newline='', encoding='utf-8') if options['output'] else None
+        write = output.write if output else (lambda chunk: self.stdout.write(chunk, ending=''))
+        try:
+            for chunk in render(model, batches()):
+                write(chunk)
+        finally:
+            if output:
+                output.close()
+
+        # Progress goes to stderr so stdout stays a clean export
+        elapsed = time.perf_counter() - start
+        self.stderr.write(self.style.SUCCESS(
+            f'Exported {rows} {options["model"]} in {elapsed:.1f}s ({rows / elapsed if elapsed else 0:.0f} rows/s)'
+        ))
@@ -0,0 +1,130 @@
+import os
+import subprocess
+import sys
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a worker imports before it can serve its first request
+STARTUP_MODULES = [
+    'core.admin',
+    'core.views',
+    'core.session_views',
+    'core.mentor_views',
+    'core.project_views',
+    'core.resume_views',
+    'core.async_views',
+]
+
+# Heavy dependencies that should only load on first use
+WATCHED_MODULES = ['PIL.Image', 'crispy_forms.helper', 'crispy_tailwind', 'mysql.connector', 'rest_framework']
+
+# Run in a fresh interpreter, since everything is already imported in this one.
+# -X importtime only sees imports made through the import statement, so Django's
+# importlib.import_module() calls (settings, apps, admin modules) are routed
+# through __import__ to show up too.
+PROBE = '''
+import importlib
+import importlib.util
+import sys
+import time
+
+def import_module(name, package=None):
+    name = importlib.util.resolve_name(name, package) if name.startswith('.') else name
+    __import__(name)
+    return sys.modules[name]
+
+importlib.import_module = import_module
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+from django.urls import get_resolver
+get_resolver().url_patterns
+print('TIMINGS', setup - start, time.perf_counter() - setup)
+'''
+
+
+class Command(BaseCommand):
+    help = 'Report cumulative import cost of settings, admin and views in a fresh interpreter (-X importtime)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=15, help='Number of packages and modules to list')
+        parser.add_argument('--module', action='append', default=[], help='Extra module to import and report')
+
+    def handle(self, *args, **options):
+        modules = STARTUP_MODULES + options['module']
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE, PYTHONPATH=str(settings.BASE_DIR))
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROBE.format(modules=modules)],
+            capture_output=True, text=True, env=env, cwd=settings.BASE_DIR,
+        )
+        if result.returncode:
+            raise CommandError(f'Startup probe failed:\n{result.stderr[-2000:]}')
+
+        imports = parse_importtime(result.stderr)
+        setup_seconds, import_seconds = (float(value) for value in result.stdout.split('TIMINGS')[1].split())
+        by_name = {entry['name']: entry for entry in imports}
+
+        self.stdout.write(f'\ndjango.setup(): {setup_seconds * 1e3:.1f} ms, '
+                          f'admin + views + URLconf: {import_seconds * 1e3:.1f} ms\n')
+
+        self.stdout.write('Cumulative import time (modules already loaded by an earlier line are free):')
+        for name in [settings.SETTINGS_MODULE] + modules:
+            entry = by_name.get(name)
+            self.stdout.write(f'  {name:<32} {entry["cumulative"] / 1e3:8.1f} ms')
+
+        self.stdout.write(f'\nHeaviest packages (self time, top {options["top"]}):')
+        packages = Counter()
+        for entry in imports:
+            packages[entry['name'].split('.')[0]] += entry['self']
+        for package, micros in packages.most_common(options['top']):
+            self.stdout.write(f'  {package:<32} {micros / 1e3:8.1f} ms')
+
+        self.stdout.write(f'\nSlowest modules (self time, top {options["top"]}):')
+        for entry in sorted(imports, key=lambda entry: entry['self'], reverse=True)[:options['top']]:
+            self.stdout.write(f'  {entry["name"]:<32} {entry["self"] / 1e3:8.1f} ms')
+
+        self.stdout.write('\nHeavy dependencies loaded at startup:')
+        for name in WATCHED_MODULES:
+            entry = by_name.get(name)
+            if entry:
+                self.stdout.write(self.style.WARNING(
+                    f'  {name:<32} {entry["cumulative"] / 1e3:8.1f} ms, imported by {entry["parent"] or "django.setup()"}'
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'  {name:<32}   deferred'))
+
+        total = sum(entry['self'] for entry in imports)
+        self.stdout.write(f'\n{len(imports)} modules, {total / 1e3:.1f} ms of import time in total')
+
+
+def parse_importtime(stderr):
+    """
+    Parse ``-X importtime`` output into dicts with name, self and cumulative
+    microseconds and the importing module. Python prints a module after
+    everything it imports, one indentation level deeper than its importer.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative, name = line[len('import time:'):].split('|')
+        imports.append({
+            'name': name.strip(),
+            'depth': len(name) - len(name.lstrip()),
+            'self': int(self_us),
+            'cumulative': int(cumulative),
+            'parent': None,
+        })
+
+    # The importer is the next line printed at a shallower depth
+    waiting = []
+    for entry in imports:
+        while waiting and waiting[-1]['depth'] > entry['depth']:
+            waiting.pop()['parent'] = entry['name']
+        waiting.append(entry)
+    return imports
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.models import Mentor
+from core.ratings import rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = "Recompute every mentor's rating count, sum and Bayesian average from Feedback, a batch of mentors at a time"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Mentors recomputed per query')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        mentors = Mentor.objects.order_by('pk')
+        checked = repaired = 0
+        last_pk = None
+        while True:
+            batch = mentors if last_pk is None else mentors.filter(pk__gt=last_pk)
+            pks = list(batch.values_list('pk', flat=True)[:options['batch_size']])
+            if not pks:
+                break
+            repaired += rebuild_ratings(Mentor.objects.filter(pk__in=pks))
+            checked += len(pks)
+            last_pk = pks[-1]
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {checked} mentors and repaired {repaired} in {time.perf_counter() - start:.1f}s'
+        ))
@@ -0,0 +1,24 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.slots import roll_forward
+
+
+class Command(BaseCommand):
+    help = (
+        'Roll the materialized availability slots forward: delete the ones that have ended '
+        'and add the ones now within AVAILABILITY_SLOT_WEEKS'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Availability rules expanded per insert')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        deleted, rules = roll_forward(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} past slots and expanded {rules} availability rules '
+            f'{settings.AVAILABILITY_SLOT_WEEKS} weeks ahead in {time.perf_counter() - start:.1f}s'
+        ))
@@ -1,20 +1,86 @@
-# core/management/commands/wait_for_db.py
+import os
+import random
 import time
-from django.core.management.base import BaseCommand
-from django.db import connections
-from django.db.utils import OperationalError
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, Error, connections
+from django.db.migrations.executor import MigrationExecutor
+
 
 class Command(BaseCommand):
     """Django command to pause execution until database is available"""
+    help = 'Wait until the database accepts queries, with jittered exponential backoff and an overall deadline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias to wait for')
+        parser.add_argument('--timeout', type=float, default=float(os.getenv('DB_WAIT_TIMEOUT', '60')),
+                            help='Give up after this many seconds (default: DB_WAIT_TIMEOUT or 60)')
+        parser.add_argument('--initial-delay', type=float, default=0.05, help='First retry delay in seconds')
+        parser.add_argument('--max-delay', type=float, default=5.0, help='Upper bound for a single retry delay')
+        parser.add_argument('--table', action='append', default=[], dest='tables',
+                            help='Also wait until this table exists (repeatable)')
+        parser.add_argument('--migrations', action='store_true',
+                            help='Also wait until every migration has been applied')
 
     def handle(self, *args, **options):
+        self.connection = connections[options['database']]
+        self.options = options
+        self.deadline = time.monotonic() + options['timeout']
+
         self.stdout.write('Waiting for database...')
-        db_conn = None
-        while not db_conn:
+        connect, query = self.wait_until('database', self.check_connection)
+        self.stdout.write(self.style.SUCCESS(
+            f'Database available! (connect {connect * 1e3:.1f} ms, SELECT 1 {query * 1e3:.1f} ms)'
+        ))
+
+        if options['tables']:
+            self.wait_until('tables', self.check_tables)
+            self.stdout.write(self.style.SUCCESS(f'Tables present: {", ".join(options["tables"])}'))
+        if options['migrations']:
+            self.wait_until('migrations', self.check_migrations)
+            self.stdout.write(self.style.SUCCESS('All migrations applied'))
+
+    def wait_until(self, what, check):
+        """Call ``check`` until it returns a truthy value, backing off between failed attempts."""
+        delay = self.options['initial_delay']
+        attempt = 0
+        while True:
+            attempt += 1
             try:
-                db_conn = connections['default']
-                db_conn.ensure_connection()
-                self.stdout.write(self.style.SUCCESS('Database available!'))
-            except OperationalError:
-                self.stdout.write('Database unavailable, waiting 1 second...')
-                time.sleep(1)
\ No newline at end of file
+                result = check()
+                reason = None if result else 'not ready'
+            except Error as exc:
+                # Drop the broken connection so the next attempt reconnects
+                self.connection.close()
+                result, reason = None, f'{exc.__class__.__name__}: {exc}'
+            if reason is None:
+                return result
+
+            remaining = self.deadline - time.monotonic()
+            if remaining <= 0:
+                raise CommandError(
+                    f'Gave up waiting for {what} after {attempt} attempts '
+                    f'({self.options["timeout"]:g}s): {reason}'
+                )
+            # Equal jitter: half the delay fixed, half random, so restarting pods spread out
+            sleep = min(delay / 2 + random.uniform(0, delay / 2), remaining)
+            self.stdout.write(f'{what.capitalize()} unavailable ({reason}), retrying in {sleep:.2f}s')
+            time.sleep(sleep)
+            delay = min(delay * 2, self.options['max_delay'])
+
+    def check_connection(self):
+        start = time.perf_counter()
+        self.connection.ensure_connection()
+        connected = time.perf_counter()
+        with self.connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        return connected - start, time.perf_counter() - connected
+
+    def check_tables(self):
+        existing = set(self.connection.introspection.table_names())
+        return all(table in existing for table in self.options['tables'])
+
+    def check_migrations(self):
+        executor = MigrationExecutor(self.connection)
+        return not executor.migration_plan(executor.loader.graph.leaf_nodes())
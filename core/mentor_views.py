@@ -1,4 +1,7 @@
-from django.views.generic import ListView, UpdateView, TemplateView, CreateView, UpdateView, DeleteView
+from django import forms
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
+from django.views.generic import ListView, UpdateView, TemplateView, CreateView, UpdateView, DeleteView, View
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.shortcuts import redirect, get_object_or_404
 from django.contrib import messages
@@ -7,10 +10,19 @@ from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 from django.conf import settings
+from django.db.models import Q
+from django.db import transaction
 from django.utils import timezone
 
-from .models import Session, Mentor, Availability
+from .archive import with_archived
+from .identity import identity_map
+from .mixins import ConditionalGetMixin
+from .models import Session, SessionArchive, Availability
+from .session_actions import (
+    ACCEPT, ACCEPTED, ACTIONS, REJECT, REJECTED, RESCHEDULE, RESCHEDULED, apply_bulk_action,
+)
 from .forms import MentorProfileForm, AvailabilityFormSet, SessionForm
+from .slots import regenerate_slots
 
 class MentorRequiredMixin(LoginRequiredMixin):
     """Verify that the current user is a mentor."""
@@ -27,121 +39,137 @@ class MentorRequiredMixin(LoginRequiredMixin):
             )
             return redirect('core:home')
             
-        # Get or create mentor profile safely
-        from django.db import IntegrityError
-        from .models import Mentor
-        
-        # First try to get the mentor profile
-        if not hasattr(request.user, 'mentor_profile'):
-            try:
-                # Try to create a mentor profile if it doesn't exist
-                Mentor.objects.get_or_create(user=request.user)
-                messages.info(request, "Your mentor profile has been created.")
-            except IntegrityError:
-                # In case of race condition, just get the existing profile
-                pass
-                
+        # Resolved once here (creating it if missing) and reused by the view
+        self.mentor_profile = identity_map(request).mentor_profile
         return super().dispatch(request, *args, **kwargs)
 
-class MentorSessionRequestsView(MentorRequiredMixin, ListView):
+class MentorSessionRequestsView(MentorRequiredMixin, ConditionalGetMixin, ListView):
     """View for mentors to see their pending session requests."""
     model = Session
     template_name = 'mentor/session_requests.html'
     context_object_name = 'session_requests'
     
     def get_queryset(self):
-        # Ensure mentor profile exists
-        mentor_profile = getattr(self.request.user, 'mentor_profile', None)
-        if not mentor_profile:
-            # If for some reason the profile doesn't exist, create it
-            mentor_profile, created = Mentor.objects.get_or_create(user=self.request.user)
-            if created:
-                messages.info(self.request, "Your mentor profile has been created.")
-        return mentor_profile.session_requests.order_by('scheduled_time')
+        return self.mentor_profile.session_requests.order_by('scheduled_time')
+    
+    def get_validator_queryset(self):
+        # Every session on the page: requests, upcoming and completed
+        return Session.objects.filter(
+            Q(status__in=['requested', 'completed']) | Q(status='accepted', scheduled_time__gt=timezone.now()),
+            mentor=self.request.user,
+        )
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        mentor_profile = getattr(self.request.user, 'mentor_profile', None)
-        if not mentor_profile:
-            # If for some reason the profile doesn't exist, create it
-            mentor_profile, created = Mentor.objects.get_or_create(user=self.request.user)
-            if created:
-                messages.info(self.request, "Your mentor profile has been created.")
-        
-        context['upcoming_sessions'] = mentor_profile.upcoming_sessions
-        context['completed_sessions'] = mentor_profile.completed_sessions
+        context['upcoming_sessions'] = self.mentor_profile.upcoming_sessions
+        context['completed_sessions'] = self.mentor_profile.completed_sessions
         return context
 
-class UpdateSessionStatusView(MentorRequiredMixin, UpdateView):
+class UpdateSessionStatusView(MentorRequiredMixin, View):
     """View for mentors to accept or reject session requests."""
-    model = Session
-    fields = []  # We'll handle the status in the form_valid method
     http_method_names = ['post']  # Only allow POST requests
     
-    def get_queryset(self):
-        # Ensure mentor profile exists
-        mentor_profile = getattr(self.request.user, 'mentor_profile', None)
-        if not mentor_profile:
-            # If for some reason the profile doesn't exist, create it
-            mentor_profile, created = Mentor.objects.get_or_create(user=self.request.user)
-            if created:
-                messages.info(self.request, "Your mentor profile has been created.")
-        return Session.objects.filter(mentor=self.request.user)
-    
     def post(self, request, *args, **kwargs):
-        session = self.get_object()
         action = request.POST.get('action')
+        if action not in (ACCEPT, REJECT):
+            messages.error(request, 'Invalid action.')
+            return redirect('core:mentor_session_requests')
         
-        if action == 'accept':
-            session.status = 'accepted'
-            # Ensure the mentor field is set to the current user
-            session.mentor = request.user
-            message = 'Session request has been accepted.'
-        elif action == 'reject':
-            session.status = 'rejected'
-            message = 'Session request has been rejected.'
+        # The same conditional update as the bulk action, for one session
+        outcome, = apply_bulk_action(request.user, action, [kwargs['pk']])
+        if outcome.outcome == ACCEPTED:
+            messages.success(request, 'Session request has been accepted.')
+        elif outcome.outcome == REJECTED:
+            messages.success(request, 'Session request has been rejected.')
         else:
-            messages.error(request, 'Invalid action.')
+            messages.error(request, outcome.detail)
+        return redirect('core:mentor_session_requests')
+
+class BulkSessionActionView(MentorRequiredMixin, View):
+    """
+    Accept, reject or reschedule many session requests in one POST.
+
+    Answers with JSON outcomes per session when the client asks for JSON,
+    otherwise with a summary message on the requests page.
+    """
+    http_method_names = ['post']
+    
+    def wants_json(self):
+        return self.request.accepts('application/json') and not self.request.accepts('text/html')
+    
+    def post(self, request, *args, **kwargs):
+        action = request.POST.get('action')
+        session_ids = [int(pk) for pk in request.POST.getlist('sessions') if pk.isdecimal()]
+        if action not in ACTIONS or not session_ids:
+            error = 'Choose an action and at least one request.'
+            if self.wants_json():
+                return JsonResponse({'error': error}, status=400)
+            messages.error(request, error)
             return redirect('core:mentor_session_requests')
         
-        session.save()
-        messages.success(request, message)
+        new_times = {}
+        if action == RESCHEDULE:
+            field = forms.DateTimeField(required=False)
+            for pk in session_ids:
+                try:
+                    new_times[pk] = field.clean(request.POST.get(f'time_{pk}'))
+                except ValidationError:
+                    new_times[pk] = None
+        
+        outcomes = apply_bulk_action(request.user, action, session_ids, new_times)
+        if self.wants_json():
+            return JsonResponse({'results': [outcome._asdict() for outcome in outcomes]})
+        
+        done = [outcome for outcome in outcomes if outcome.outcome in (ACCEPTED, REJECTED, RESCHEDULED)]
+        if done:
+            messages.success(request, f'{done[0].outcome.capitalize()} {len(done)} session request(s).')
+        for outcome in outcomes:
+            if outcome not in done:
+                messages.warning(request, f'{outcome.title or f"Request #{outcome.session_id}"}: {outcome.detail}')
         return redirect('core:mentor_session_requests')
 
-class MentorUpcomingSessionsView(MentorRequiredMixin, ListView):
+class MentorUpcomingSessionsView(MentorRequiredMixin, ConditionalGetMixin, ListView):
     """View for mentors to see their upcoming sessions."""
     model = Session
     template_name = 'mentor/upcoming_sessions.html'
     context_object_name = 'sessions'
     
     def get_queryset(self):
-        # Ensure mentor profile exists
-        mentor_profile = getattr(self.request.user, 'mentor_profile', None)
-        if not mentor_profile:
-            # If for some reason the profile doesn't exist, create it
-            mentor_profile, created = Mentor.objects.get_or_create(user=self.request.user)
-            if created:
-                messages.info(self.request, "Your mentor profile has been created.")
-        return mentor_profile.upcoming_sessions
-
-class MentorCompletedSessionsView(MentorRequiredMixin, ListView):
+        return self.mentor_profile.upcoming_sessions
+
+class MentorCompletedSessionsView(MentorRequiredMixin, ConditionalGetMixin, ListView):
     """View for mentors to see their completed sessions."""
     model = Session
     template_name = 'mentor/completed_sessions.html'
     context_object_name = 'sessions'
+    paginate_by = 10
     
+    def get_validator_queryset(self):
+        # Archived rows never change, and archiving more of them removes
+        # live rows, so the live sessions alone tell when the page changes
+        return self.mentor_profile.completed_sessions
+
     def get_queryset(self):
-        # Ensure mentor profile exists
-        mentor_profile = getattr(self.request.user, 'mentor_profile', None)
-        if not mentor_profile:
-            # If for some reason the profile doesn't exist, create it
-            mentor_profile, created = Mentor.objects.get_or_create(user=self.request.user)
-            if created:
-                messages.info(self.request, "Your mentor profile has been created.")
-        return mentor_profile.completed_sessions
+        if self.show_archived:
+            # Archived sessions are only read when asked for
+            archived = SessionArchive.objects.filter(
+                mentor=self.request.user, status='completed'
+            ).select_related('student')
+            return with_archived(self.mentor_profile.completed_sessions, archived)
+        return self.mentor_profile.completed_sessions
 
+    @property
+    def show_archived(self):
+        return self.request.GET.get('archived') == '1'
 
-class MentorSessionsView(MentorRequiredMixin, ListView):
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['show_archived'] = self.show_archived
+        context['current_path'] = self.request.path
+        return context
+
+
+class MentorSessionsView(MentorRequiredMixin, ConditionalGetMixin, ListView):
     """View for mentors to manage their sessions."""
     model = Session
     template_name = 'mentor/sessions.html'
@@ -152,7 +180,7 @@ class MentorSessionsView(MentorRequiredMixin, ListView):
         return Session.objects.filter(
             mentor=self.request.user,
             status__in=['requested', 'accepted', 'scheduled']
-        ).order_by('scheduled_time')
+        ).select_related('student').order_by('scheduled_time')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -199,7 +227,7 @@ class MentorAvailabilityView(MentorRequiredMixin, TemplateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        mentor = self.request.user.mentor_profile
+        mentor = self.mentor_profile
         
         form = MentorProfileForm(
             instance=mentor,
@@ -220,7 +248,7 @@ class MentorAvailabilityView(MentorRequiredMixin, TemplateView):
         return context
     
     def post(self, request, *args, **kwargs):
-        mentor = request.user.mentor_profile
+        mentor = self.mentor_profile
         form = MentorProfileForm(
             request.POST, 
             instance=mentor,
@@ -233,18 +261,11 @@ class MentorAvailabilityView(MentorRequiredMixin, TemplateView):
         )
         
         if form.is_valid() and formset.is_valid():
-            form.save()
-            instances = formset.save(commit=False)
-            
-            # Handle deleted forms
-            for obj in formset.deleted_objects:
-                obj.delete()
-                
-            # Save new and updated instances
-            for instance in instances:
-                instance.mentor = mentor
-                instance.save()
-                
+            with transaction.atomic():
+                # Sets mentor.weekly_availability, saved with the profile
+                formset.bulk_save()
+                form.save()
+                regenerate_slots([mentor.pk])
             messages.success(request, 'Your availability has been updated successfully.')
             return redirect('core:mentor_availability')
         
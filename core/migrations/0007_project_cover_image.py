@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-19 08:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_cover_images(apps, schema_editor):
+    Project = apps.get_model('core', 'Project')
+    ProjectImage = apps.get_model('core', 'ProjectImage')
+    # One UPDATE: a per-row loop over an open iterator() would hit the MySQL
+    # connector's unbuffered cursor ("Unread result found")
+    first_image = ProjectImage.objects.filter(project=OuterRef('pk')).order_by('id').values('id')[:1]
+    # Projects without images get NULL, which the new column already holds
+    Project.objects.update(cover_image_id=Subquery(first_image))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_mentor_is_available_alter_mentor_availability_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='cover_image',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.projectimage'),
+        ),
+        migrations.RunPython(backfill_cover_images, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-19 10:12
+
+from django.db import migrations, models
+from django.db.models import F
+
+from core.operations import AddIndexOnline, BatchedRunPython
+
+
+def sync_availability(batch):
+    batch.exclude(availability=F('is_available')).update(availability=F('is_available'))
+
+
+class Migration(migrations.Migration):
+    # Let each backfill batch commit on its own
+    atomic = False
+
+    dependencies = [
+        ('core', '0007_project_cover_image'),
+    ]
+
+    operations = [
+        AddIndexOnline(
+            model_name='session',
+            index=models.Index(fields=['mentor', 'status', 'scheduled_time'], name='session_mentor_status_time'),
+        ),
+        AddIndexOnline(
+            model_name='session',
+            index=models.Index(fields=['student', 'status', 'scheduled_time'], name='session_student_status_time'),
+        ),
+        BatchedRunPython('mentor', sync_availability, name='0008_sync_mentor_availability', max_replica_lag=5),
+    ]
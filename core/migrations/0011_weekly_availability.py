@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mentor',
+            name='weekly_availability',
+            field=models.CharField(default='0' * 168, editable=False, max_length=168),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:02
+
+from django.db import migrations
+
+from core.availability import encode, week_mask
+from core.operations import BatchedRunPython
+
+
+def build_weekly_availability(batch):
+    mentors = list(batch.prefetch_related('availability_slots'))
+    for mentor in mentors:
+        mentor.weekly_availability = encode(week_mask(
+            (slot.day_of_week, slot.start_time, slot.end_time) for slot in mentor.availability_slots.all()
+        ))
+    batch.model._base_manager.using(batch.db).bulk_update(mentors, ['weekly_availability'])
+
+
+class Migration(migrations.Migration):
+    # Let each backfill batch commit on its own. The column is added by the
+    # previous migration, so a re-run after an interruption goes straight
+    # back to the checkpoint
+    atomic = False
+
+    dependencies = [
+        ('core', '0011_weekly_availability'),
+    ]
+
+    operations = [
+        BatchedRunPython('mentor', build_weekly_availability, name='0012_weekly_availability_backfill', max_replica_lag=5),
+    ]
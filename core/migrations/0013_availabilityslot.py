@@ -0,0 +1,59 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:40
+
+import datetime
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+from core.slots import RULE_FIELDS, occurrences
+
+
+def fill_slots(apps, schema_editor):
+    # The same expansion as core.slots.roll_forward, on the historical models
+    Availability = apps.get_model('core', 'Availability')
+    AvailabilitySlot = apps.get_model('core', 'AvailabilitySlot')
+    db = schema_editor.connection.alias
+    now = timezone.now()
+    end = now + datetime.timedelta(weeks=settings.AVAILABILITY_SLOT_WEEKS)
+    rules = Availability.objects.using(db).order_by('pk')
+    last_pk = None
+    while True:
+        # Read each batch in full before inserting (unbuffered MySQL cursors)
+        batch = rules if last_pk is None else rules.filter(pk__gt=last_pk)
+        rows = list(batch.values_list('pk', *RULE_FIELDS)[:1000])
+        if not rows:
+            break
+        AvailabilitySlot.objects.using(db).bulk_create([
+            AvailabilitySlot(mentor_id=mentor_id, start_time=start, end_time=slot_end)
+            for _, mentor_id, *rule in rows
+            for start, slot_end in occurrences(*rule, now, end)
+        # Older rules can overlap, so two may start a slot at the same time
+        ], ignore_conflicts=True)
+        last_pk = rows[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_weekly_availability_backfill'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvailabilitySlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_time', models.DateTimeField()),
+                ('end_time', models.DateTimeField()),
+                ('mentor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upcoming_slots', to='core.mentor')),
+            ],
+            options={
+                'ordering': ['start_time'],
+                'indexes': [models.Index(fields=['start_time', 'mentor'], name='availslot_start_mentor')],
+                'constraints': [models.UniqueConstraint(fields=('mentor', 'start_time'), name='availslot_mentor_start_unique')],
+            },
+        ),
+        migrations.RunPython(fill_slots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:15
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+from core.operations import AddIndexOnline
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_availabilityslot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedback',
+            name='rating',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='1 to 5 stars, for session feedback', null=True, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)]),
+        ),
+        migrations.AddField(
+            model_name='feedback',
+            name='session',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='feedback', to='core.session'),
+        ),
+        migrations.AddField(
+            model_name='mentor',
+            name='rating_average',
+            field=models.FloatField(default=3.5, editable=False, help_text='Bayesian average of the ratings'),
+        ),
+        migrations.AddField(
+            model_name='mentor',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='mentor',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        AddIndexOnline(
+            model_name='mentor',
+            index=models.Index(fields=['-rating_average', 'user'], name='mentor_rating_average'),
+        ),
+    ]
@@ -1,6 +1,11 @@
+from django.conf import settings
+from django.contrib import messages
 from django.contrib.auth.mixins import UserPassesTestMixin
 from django.core.exceptions import PermissionDenied
 
+from .conditional import not_modified, queryset_validators, set_validators
+from .routers import aserve_from_replica, serve_from_replica
+
 class StudentRequiredMixin(UserPassesTestMixin):
     """Verify that the current user is a student."""
     def test_func(self):
@@ -24,3 +29,53 @@ class MentorRequiredMixin(UserPassesTestMixin):
         if not self.request.user.is_authenticated:
             return super().handle_no_permission()
         raise PermissionDenied("This page is only available to mentors.")
+
+class ReplicaReadMixin:
+    """Serve GET requests from the read replica unless the user has just written."""
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return aserve_from_replica(request, super().dispatch, *args, **kwargs)
+        return serve_from_replica(request, super().dispatch, *args, **kwargs)
+
+
+class ConditionalGetMixin:
+    """
+    Answer a GET with 304 Not Modified when the browser's copy is current,
+    before the view fetches or renders anything.
+
+    The validators come from one COUNT/MAX(updated_at) query over
+    ``get_validator_queryset()`` (the view's own queryset by default); views
+    whose pages depend on other rows override ``get_validators``.
+    """
+    validator_field = 'updated_at'
+
+    def get_validator_queryset(self):
+        queryset = self.get_queryset()
+        # A detail view's page is its one object
+        pk = self.kwargs.get(getattr(self, 'pk_url_kwarg', None))
+        return queryset.filter(pk=pk) if pk is not None else queryset
+
+    def get_validator_parts(self):
+        # Besides the rows, the page depends on who is looking, the query
+        # string, the deployed templates and the CSRF secret in its forms
+        return (
+            self.request.user.pk,
+            self.request.get_full_path(),
+            settings.CACHES['default'].get('VERSION', 1),
+            self.request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+        )
+
+    def get_validators(self):
+        return queryset_validators(
+            self.get_validator_queryset(), *self.get_validator_parts(), field=self.validator_field,
+        )
+
+    def get(self, request, *args, **kwargs):
+        # Pending flash messages are part of the page, so it must be rendered
+        if len(messages.get_messages(request)):
+            return super().get(request, *args, **kwargs)
+        etag, last_modified = self.get_validators()
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
@@ -3,8 +3,12 @@ from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
 from django.core.validators import FileExtensionValidator, MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
 import datetime
 
+from .availability import EMPTY, encode, is_on_quarter, week_mask
+
 class User(AbstractUser):
     """Custom user model that extends Django's built-in User model."""
     is_student = models.BooleanField(default=True)
@@ -13,6 +17,29 @@ class User(AbstractUser):
     bio = models.TextField(max_length=500, blank=True)
     phone = models.CharField(max_length=20, blank=True, null=True, help_text='Contact phone number')
     
+    # Shown on other rows' pages (the mentor directory), whose validators must follow them
+    DISPLAY_FIELDS = ('username', 'first_name', 'last_name', 'profile_picture')
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # is_mentor as loaded (None if deferred), so a save can tell whether it changed
+        instance._loaded_is_mentor = instance.__dict__.get('is_mentor')
+        instance._loaded_display = instance.display_values()
+        return instance
+    
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        if fields is None or 'is_mentor' in fields:
+            self._loaded_is_mentor = self.__dict__.get('is_mentor')
+        if fields is None or set(self.DISPLAY_FIELDS) & set(fields):
+            self._loaded_display = self.display_values()
+    
+    def display_values(self):
+        """The DISPLAY_FIELDS as loaded or set (None for deferred ones)."""
+        return tuple(str(self.__dict__.get(name) or '') if name in self.__dict__ else None
+                     for name in self.DISPLAY_FIELDS)
+    
     def __str__(self):
         return self.username
 
@@ -33,6 +60,7 @@ class Availability(models.Model):
     start_time = models.TimeField()
     end_time = models.TimeField()
     is_recurring = models.BooleanField(default=True, help_text='If checked, this slot repeats every week')
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name_plural = 'Availabilities'
@@ -48,19 +76,35 @@ class Availability(models.Model):
         if self.start_time >= self.end_time:
             raise ValidationError('End time must be after start time')
         
-        # Check for overlapping slots
-        if not self.mentor_id:  # Skip overlap check if mentor is not set yet
-            return
-            
-        overlapping = Availability.objects.filter(
-            mentor=self.mentor,
-            day_of_week=self.day_of_week,
-            start_time__lt=self.end_time,
-            end_time__gt=self.start_time
-        ).exclude(pk=self.pk if self.pk else None)
+        if not (is_on_quarter(self.start_time) and is_on_quarter(self.end_time)):
+            raise ValidationError('Times must be on the quarter hour (:00, :15, :30 or :45)')
         
-        if overlapping.exists():
-            raise ValidationError('This time slot overlaps with an existing availability slot')
+        # Overlaps are checked across the whole week at once, in memory, by
+        # the availability formsets (core.forms.WeeklyAvailabilityFormSet)
+
+
+class AvailabilitySlot(models.Model):
+    """
+    A concrete upcoming occurrence of an availability slot, materialized for
+    the next AVAILABILITY_SLOT_WEEKS weeks (see core.slots).
+    """
+    mentor = models.ForeignKey('Mentor', on_delete=models.CASCADE, related_name='upcoming_slots')
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['start_time']
+        indexes = [
+            # "Who is free between these times" is a range scan of start_time
+            models.Index(fields=['start_time', 'mentor'], name='availslot_start_mentor'),
+        ]
+        constraints = [
+            # Lets the nightly roll-forward insert with ignore_conflicts
+            models.UniqueConstraint(fields=['mentor', 'start_time'], name='availslot_mentor_start_unique'),
+        ]
+    
+    def __str__(self):
+        return f"{self.mentor_id} {self.start_time:%Y-%m-%d %H:%M}-{self.end_time:%H:%M}"
 
 
 class Mentor(models.Model):
@@ -74,6 +118,50 @@ class Mentor(models.Model):
     
     # Deprecated - kept for backward compatibility
     availability = models.BooleanField(default=True, editable=False)
+    # The availability slots as a bitmask of the week's quarter-hours (see core.availability)
+    weekly_availability = models.CharField(max_length=168, default=EMPTY, editable=False)
+    
+    # The Bayesian average counts this many ratings of RATING_PRIOR_MEAN
+    # before the real ones, so one 5-star review doesn't top the directory.
+    # Run rebuild_mentor_ratings after changing either.
+    RATING_PRIOR_COUNT = 5
+    RATING_PRIOR_MEAN = 3.5
+    
+    # Running totals of the session ratings in Feedback, kept up to date by
+    # core.signals and repaired by the rebuild_mentor_ratings command
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_average = models.FloatField(default=RATING_PRIOR_MEAN, editable=False,
+                                       help_text='Bayesian average of the ratings')
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        indexes = [
+            # The directory's "top rated" order
+            models.Index(fields=['-rating_average', 'user'], name='mentor_rating_average'),
+        ]
+    
+    @classmethod
+    def bayesian_average(cls, count, total):
+        return (cls.RATING_PRIOR_COUNT * cls.RATING_PRIOR_MEAN + total) / (cls.RATING_PRIOR_COUNT + count)
+    
+    @classmethod
+    def add_ratings(cls, pk, count, total):
+        """
+        Add ``count`` ratings summing to ``total`` (negative to remove them) to
+        mentor ``pk``'s aggregates, in one UPDATE that reads the current totals.
+        """
+        return cls.objects.filter(pk=pk).update(
+            # First: MySQL evaluates SET left to right, so later assignments
+            # would see the new count and sum
+            rating_average=(
+                Cast(F('rating_sum') + total + cls.RATING_PRIOR_COUNT * cls.RATING_PRIOR_MEAN, FloatField())
+                / (F('rating_count') + count + cls.RATING_PRIOR_COUNT)
+            ),
+            rating_count=F('rating_count') + count,
+            rating_sum=F('rating_sum') + total,
+            updated_at=timezone.now(),
+        )
     
     def save(self, *args, **kwargs):
         # Keep the old availability field in sync with is_available
@@ -82,11 +170,17 @@ class Mentor(models.Model):
     
     def __str__(self):
         return f"{self.user.username} (Mentor)"
+    
+    def refresh_weekly_availability(self):
+        """Rebuild ``weekly_availability`` from the slots in the database (not saved)."""
+        self.weekly_availability = encode(week_mask(
+            self.availability_slots.values_list('day_of_week', 'start_time', 'end_time')
+        ))
         
     @property
     def session_requests(self):
         """Return all pending session requests for this mentor."""
-        return self.user.mentor_sessions.filter(status='requested')
+        return self.user.mentor_sessions.filter(status='requested').select_related('student')
         
     @property
     def upcoming_sessions(self):
@@ -94,19 +188,19 @@ class Mentor(models.Model):
         return self.user.mentor_sessions.filter(
             status='accepted',
             scheduled_time__gt=timezone.now()
-        ).order_by('scheduled_time')
+        ).select_related('student').order_by('scheduled_time')
         
     @property
     def completed_sessions(self):
         """Return all completed sessions."""
         return self.user.mentor_sessions.filter(
             status='completed'
-        ).order_by('-scheduled_time')
+        ).select_related('student').order_by('-scheduled_time')
         
     @property
     def mentor_sessions(self):
         """Return all sessions for this mentor."""
-        return self.user.mentor_sessions.all()
+        return self.user.mentor_sessions.select_related('student')
 
 class Project(models.Model):
     """Projects created by students."""
@@ -116,9 +210,19 @@ class Project(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='projects')
+    # Denormalized first image so listings don't query images per project
+    cover_image = models.ForeignKey(
+        'ProjectImage', on_delete=models.SET_NULL, null=True, blank=True,
+        editable=False, related_name='+'
+    )
     
     def __str__(self):
         return self.title
+    
+    def update_cover_image(self):
+        """Point cover_image at the earliest remaining image, or clear it."""
+        self.cover_image = self.images.order_by('pk').first()
+        Project.objects.filter(pk=self.pk).update(cover_image=self.cover_image, updated_at=timezone.now())
         
     def get_tech_stack_list(self):
         """Return tech stack as a list of strings."""
@@ -145,6 +249,7 @@ class Resume(models.Model):
         validators=[FileExtensionValidator(allowed_extensions=['pdf'])]
     )
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     is_primary = models.BooleanField(default=False)
     
     def __str__(self):
@@ -153,13 +258,25 @@ class Resume(models.Model):
     def save(self, *args, **kwargs):
         if self.is_primary:
             # Ensure only one primary resume per user
-            Resume.objects.filter(student=self.student, is_primary=True).update(is_primary=False)
+            Resume.objects.filter(student=self.student, is_primary=True).update(
+                is_primary=False, updated_at=timezone.now()
+            )
         super().save(*args, **kwargs)
 
 class Feedback(models.Model):
-    """Feedback provided by mentors on student resumes/projects."""
+    """
+    Feedback between a mentor and a student: a mentor's notes on a student's
+    resumes/projects, or a student's star rating of a session with the mentor.
+    """
     mentor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='given_feedback')
     student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='received_feedback')
+    # Archiving deletes old sessions; their ratings stay and keep counting
+    session = models.OneToOneField('Session', on_delete=models.SET_NULL, null=True, blank=True,
+                                   related_name='feedback')
+    rating = models.PositiveSmallIntegerField(
+        null=True, blank=True, validators=[MinValueValidator(1), MaxValueValidator(5)],
+        help_text='1 to 5 stars, for session feedback',
+    )
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -167,6 +284,13 @@ class Feedback(models.Model):
     class Meta:
         ordering = ['-created_at']
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The rating as loaded, so a save or delete can adjust the mentor's totals
+        instance._loaded_rating = (instance.__dict__.get('mentor_id'), instance.__dict__.get('rating'))
+        return instance
+    
     def __str__(self):
         return f"Feedback from {self.mentor.username} to {self.student.username}"
 
@@ -179,6 +303,10 @@ class Session(models.Model):
         ('completed', 'Completed'),
         ('cancelled', 'Cancelled'),
     ]
+    # Sessions in these states never change again and may be archived
+    TERMINAL_STATUSES = ('completed', 'rejected', 'cancelled')
+    # Longest bookable session; bounds the window searched for overlaps
+    MAX_DURATION_MINUTES = 120
     
     student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='student_sessions')
     mentor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='mentor_sessions')
@@ -192,6 +320,42 @@ class Session(models.Model):
     
     class Meta:
         ordering = ['scheduled_time']
+        indexes = [
+            # Dashboards and session lists filter one side by status and sort by time
+            models.Index(fields=['mentor', 'status', 'scheduled_time'], name='session_mentor_status_time'),
+            models.Index(fields=['student', 'status', 'scheduled_time'], name='session_student_status_time'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.student.username} with {self.mentor.username}"
+
+
+class SessionArchive(models.Model):
+    """
+    Terminal sessions moved out of ``Session`` by ``archive_sessions``, keeping
+    their original id. Same field names as ``Session`` so templates can render
+    either.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_student_sessions')
+    mentor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_mentor_sessions')
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=Session.SESSION_STATUS)
+    scheduled_time = models.DateTimeField()
+    duration_minutes = models.PositiveIntegerField(default=30)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    is_archived = True
+
+    class Meta:
+        ordering = ['-scheduled_time']
+        indexes = [
+            models.Index(fields=['mentor', 'status', 'scheduled_time'], name='archive_mentor_status_time'),
+            models.Index(fields=['student', 'scheduled_time'], name='archive_student_time'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} - {self.student.username} with {self.mentor.username} (archived)"
@@ -0,0 +1,215 @@
+"""
+Migration operations that keep tables writable while a deploy migrates them.
+
+``BatchedRunPython`` backfills a model a primary-key range at a time, each
+range in its own short transaction, sleeping between batches and waiting out
+replica lag (up to ``max_wait`` seconds at a time, logging each wait, then
+failing rather than hanging the deploy). Progress is checkpointed, so a migration that is interrupted
+resumes from the last finished batch instead of starting over. Use it in a
+migration with ``atomic = False`` so the batches actually commit one by one
+(MySQL can't roll back DDL, so its migrations never run in one transaction).
+
+``AddIndexOnline`` and ``RemoveIndexOnline`` build and drop indexes with
+``ALGORITHM=INPLACE, LOCK=NONE`` on MySQL, which fails fast rather than
+silently copying the table under a write lock. Other backends get the plain
+statements. Both skip an index that is already there (or already gone): a
+non-atomic migration re-run after an interrupted backfill repeats the index
+operations before it gets back to the checkpoint.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.db import migrations, transaction
+
+from .routers import REPLICA_DB, replica_lag
+
+CHECKPOINT_TABLE = 'core_backfill_checkpoint'
+
+logger = logging.getLogger(__name__)
+
+
+class BatchedRunPython(migrations.RunPython):
+    """
+    Apply ``update(queryset)`` to every row of ``model_name``, ``batch_size``
+    primary keys at a time, for example::
+
+        BatchedRunPython(
+            'mentor',
+            lambda batch: batch.exclude(availability=F('is_available')).update(availability=F('is_available')),
+            name='sync_mentor_availability',
+        )
+
+    ``update`` receives a queryset of the historical model limited to one
+    primary-key range and must be idempotent, since a batch interrupted before
+    its checkpoint commits runs again on resume.
+    """
+
+    def __init__(self, model_name, update, name, batch_size=1000, sleep=0.05,
+                 max_replica_lag=None, max_wait=600, reverse_code=migrations.RunPython.noop, hints=None):
+        self.model_name = model_name
+        self.update = update
+        self.name = name
+        self.batch_size = batch_size
+        self.sleep = sleep
+        self.max_replica_lag = max_replica_lag
+        self.max_wait = max_wait
+        super().__init__(self.backfill, reverse_code, atomic=False, hints=hints)
+
+    def describe(self):
+        return f'Batched backfill {self.name} of {self.model_name}'
+
+    def backfill(self, apps, schema_editor):
+        connection = schema_editor.connection
+        model = apps.get_model(self.app_label, self.model_name)
+        manager = model._base_manager.db_manager(connection.alias)
+        last_pk = self.read_checkpoint(connection)
+
+        while True:
+            remaining = manager.all() if last_pk is None else manager.filter(pk__gt=last_pk)
+            batch_pks = list(remaining.order_by('pk').values_list('pk', flat=True)[:self.batch_size])
+            if not batch_pks:
+                break
+            with transaction.atomic(using=connection.alias):
+                self.update(manager.filter(pk__gte=batch_pks[0], pk__lte=batch_pks[-1]))
+                last_pk = batch_pks[-1]
+                self.write_checkpoint(connection, last_pk)
+            self.throttle()
+
+        self.clear_checkpoint(connection)
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        # The historical model is looked up in backfill(), which RunPython
+        # calls without the app label
+        self.app_label = app_label
+        super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def throttle(self):
+        """Pause between batches so replication and other writers keep up."""
+        time.sleep(self.sleep)
+        if self.max_replica_lag is None or REPLICA_DB not in settings.DATABASES:
+            return
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            lag = replica_lag()
+            if lag is not None and lag <= self.max_replica_lag:
+                return
+            # None: the replica isn't replicating at all
+            observed = 'not replicating' if lag is None else f'{lag}s behind'
+            if time.monotonic() >= deadline:
+                raise RuntimeError(
+                    f'{self.name}: replica is {observed} after waiting {self.max_wait}s '
+                    f'(max_replica_lag is {self.max_replica_lag}s); the backfill resumes from its checkpoint'
+                )
+            logger.warning('%s: waiting for the replica (%s, max_replica_lag %ss)',
+                           self.name, observed, self.max_replica_lag)
+            time.sleep(1)
+
+    # The checkpoint table is created on first use so the operation works in
+    # any migration, including ones that run before core's own tables exist.
+
+    def ensure_checkpoint_table(self, cursor, connection):
+        table = connection.ops.quote_name(CHECKPOINT_TABLE)
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {table} (name varchar(200) NOT NULL PRIMARY KEY, last_pk varchar(64) NOT NULL)'
+        )
+
+    def read_checkpoint(self, connection):
+        with connection.cursor() as cursor:
+            self.ensure_checkpoint_table(cursor, connection)
+            cursor.execute(
+                f'SELECT last_pk FROM {connection.ops.quote_name(CHECKPOINT_TABLE)} WHERE name = %s', [self.name]
+            )
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        # Primary keys are integers for every core model; keep others as strings
+        return int(row[0]) if row[0].lstrip('-').isdigit() else row[0]
+
+    def write_checkpoint(self, connection, last_pk):
+        table = connection.ops.quote_name(CHECKPOINT_TABLE)
+        with connection.cursor() as cursor:
+            cursor.execute(f'UPDATE {table} SET last_pk = %s WHERE name = %s', [str(last_pk), self.name])
+            if not cursor.rowcount:
+                cursor.execute(f'INSERT INTO {table} (name, last_pk) VALUES (%s, %s)', [self.name, str(last_pk)])
+
+    def clear_checkpoint(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {connection.ops.quote_name(CHECKPOINT_TABLE)} WHERE name = %s', [self.name])
+
+
+ONLINE_DDL = 'ALGORITHM=INPLACE, LOCK=NONE'
+
+
+class AddIndexOnline(migrations.AddIndex):
+    """``AddIndex`` that builds the index without blocking writes on MySQL."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if index_exists(schema_editor, model, self.index.name):
+            return
+        if schema_editor.connection.vendor != 'mysql' or not self.allow_migrate_model(
+                schema_editor.connection.alias, model):
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        schema_editor.execute(add_index_sql(schema_editor, model, self.index))
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not index_exists(schema_editor, model, self.index.name):
+            return
+        if schema_editor.connection.vendor != 'mysql' or not self.allow_migrate_model(
+                schema_editor.connection.alias, model):
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        schema_editor.execute(remove_index_sql(schema_editor, model, self.index.name))
+
+    def describe(self):
+        return f'{super().describe()} online'
+
+
+class RemoveIndexOnline(migrations.RemoveIndex):
+    """``RemoveIndex`` that drops the index without blocking writes on MySQL."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not index_exists(schema_editor, model, self.name):
+            return
+        if schema_editor.connection.vendor != 'mysql' or not self.allow_migrate_model(
+                schema_editor.connection.alias, model):
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        schema_editor.execute(remove_index_sql(schema_editor, model, self.name))
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if index_exists(schema_editor, model, self.name):
+            return
+        if schema_editor.connection.vendor != 'mysql' or not self.allow_migrate_model(
+                schema_editor.connection.alias, model):
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        index = to_state.models[app_label, self.model_name_lower].get_index_by_name(self.name)
+        schema_editor.execute(add_index_sql(schema_editor, model, index))
+
+    def describe(self):
+        return f'{super().describe()} online'
+
+
+def index_exists(schema_editor, model, name):
+    """Whether ``model``'s table has an index called ``name`` (information_schema on MySQL)."""
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        return name in connection.introspection.get_constraints(cursor, model._meta.db_table)
+
+
+def add_index_sql(schema_editor, model, index):
+    if index.contains_expressions or index.condition or index.include:
+        raise ValueError(f'{index.name}: online index builds only support plain column indexes')
+    quote = schema_editor.quote_name
+    columns = ', '.join(
+        quote(model._meta.get_field(name.lstrip('-')).column) + (' DESC' if name.startswith('-') else '')
+        for name in index.fields
+    )
+    return f'ALTER TABLE {quote(model._meta.db_table)} ADD INDEX {quote(index.name)} ({columns}), {ONLINE_DDL}'
+
+
+def remove_index_sql(schema_editor, model, name):
+    quote = schema_editor.quote_name
+    return f'ALTER TABLE {quote(model._meta.db_table)} DROP INDEX {quote(name)}, {ONLINE_DDL}'
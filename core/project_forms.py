@@ -3,6 +3,7 @@ from django.core.exceptions import ValidationError
 from .models import Project, ProjectImage
 from django.core.validators import FileExtensionValidator
 from django.utils.translation import gettext_lazy as _
+from .form_styles import StyledModelFormMetaclass, INPUT_SM_CLASSES
 
 class MultipleFileInput(forms.ClearableFileInput):
     allow_multiple_selected = True
@@ -30,7 +31,7 @@ class MultipleFileField(forms.FileField):
             return [single_file_clean(d, initial) for d in data]
         return [single_file_clean(data, initial)]
 
-class ProjectForm(forms.ModelForm):
+class ProjectForm(forms.ModelForm, metaclass=StyledModelFormMetaclass):
     """Form for creating and updating projects with multiple image uploads."""
     images = MultipleFileField(
         required=False,
@@ -43,29 +44,30 @@ class ProjectForm(forms.ModelForm):
         help_text=_('Upload project screenshots (max 5MB each, max 5 files)')
     )
     tech_stack = forms.CharField(
-        required=False,
+        required=True,
         widget=forms.TextInput(attrs={'data-role': 'tagsinput'}),
         help_text=_('Add technologies separated by commas (e.g., Python, Django, React)')
     )
     
     class Meta:
         model = Project
-        fields = ['title', 'description', 'tech_stack', 'images']
+        fields = ['title', 'description', 'tech_stack']
         widgets = {
-            'description': forms.Textarea(attrs={'rows': 4, 'class': 'form-textarea'}),
+            'title': forms.TextInput(attrs={'placeholder': 'Project Title'}),
+            'description': forms.Textarea(attrs={
+                'rows': 4,
+                'placeholder': 'Project description, features, and technologies used...',
+            }),
         }
     
+    widget_attrs = {
+        'title': {'class': INPUT_SM_CLASSES},
+        'description': {'class': INPUT_SM_CLASSES},
+    }
+    
     def __init__(self, *args, **kwargs):
         self.request = kwargs.pop('request', None)
         super().__init__(*args, **kwargs)
-        if self.instance.pk:
-            self.fields['tech_stack'].initial = self.instance.tech_stack
-        super().__init__(*args, **kwargs)
-        self.fields['images'].widget.attrs.update({
-            'id': 'file-upload',
-            'x-ref': 'fileInput',
-            '@change': 'handleFileSelect($event)'
-        })
     
     def clean_images(self):
         """Clean and validate the uploaded images."""
@@ -77,34 +79,6 @@ class ProjectForm(forms.ModelForm):
                 raise ValidationError(_(f'File {image.name} is too large. Maximum size is 5MB.'))
         return images
     
-    class Meta:
-        model = Project
-        fields = ['title', 'description', 'tech_stack']
-        widgets = {
-            'title': forms.TextInput(attrs={
-                'class': 'mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500 sm:text-sm',
-                'placeholder': 'Project Title',
-            }),
-            'description': forms.Textarea(attrs={
-                'class': 'mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500 sm:text-sm',
-                'rows': 4,
-                'placeholder': 'Project description, features, and technologies used...',
-            }),
-            'tech_stack': forms.TextInput(attrs={
-                'class': 'mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500 sm:text-sm',
-                'placeholder': 'e.g., Python, Django, React, PostgreSQL',
-            }),
-        }
-    
-    def __init__(self, *args, **kwargs):
-        self.request = kwargs.pop('request', None)
-        super().__init__(*args, **kwargs)
-        
-        # Make fields required
-        self.fields['title'].required = True
-        self.fields['description'].required = True
-        self.fields['tech_stack'].required = True
-    
     def clean_image(self):
         """Validate uploaded images."""
         images = self.files.getlist('image')
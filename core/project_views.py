@@ -6,23 +6,31 @@ from django.views.generic import ListView, CreateView, UpdateView, DeleteView, D
 from django.views.generic.edit import FormMixin
 from django.forms import modelformset_factory
 from django.db import transaction
+from django.db.models import Count, Max
+from .conditional import validators
+from .mixins import ConditionalGetMixin, ReplicaReadMixin
 from .models import Project, ProjectImage
 from .project_forms import ProjectForm, ProjectImageForm
 
-class ProjectListView(LoginRequiredMixin, ListView):
+class ProjectListView(ReplicaReadMixin, LoginRequiredMixin, ConditionalGetMixin, ListView):
     """View for listing all projects of the logged-in student."""
     model = Project
     template_name = 'student/project/project_list.html'
     context_object_name = 'projects'
+    paginate_by = 12
     
     def get_queryset(self):
         """Return only the projects for the currently logged-in user."""
-        print(f"\n=== DEBUG: Fetching projects for user: {self.request.user.username} (ID: {self.request.user.id}) ===")
-        queryset = Project.objects.filter(student=self.request.user).order_by('-created_at')
-        print(f"=== DEBUG: Found {queryset.count()} projects ===")
-        for project in queryset:
-            print(f"- {project.title} (ID: {project.id})")
-        return queryset
+        return (
+            Project.objects.filter(student=self.request.user)
+            .select_related('cover_image')
+            .order_by('-created_at')
+        )
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['current_path'] = self.request.path
+        return context
 
 class ProjectCreateView(LoginRequiredMixin, CreateView):
     """View for creating a new project with multiple images."""
@@ -45,37 +53,19 @@ class ProjectCreateView(LoginRequiredMixin, CreateView):
                 self.object.student = self.request.user
                 self.object.save()
                 
-                # Debug: Print FILES dictionary
-                print("FILES:", self.request.FILES)
-                
                 # Handle file uploads
                 if 'images' in self.request.FILES:
-                    files = self.request.FILES.getlist('images')
-                    print(f"Found {len(files)} files to upload")
-                    
-                    for i, image in enumerate(files, 1):
+                    for image in self.request.FILES.getlist('images'):
                         try:
-                            print(f"Processing image {i}: {image.name} (size: {image.size} bytes, type: {image.content_type})")
-                            
-                            # Create the project image
-                            project_image = ProjectImage(project=self.object, image=image)
-                            project_image.save()
-                            
-                            print(f"Successfully saved image: {image.name}")
-                            print(f"Image path: {project_image.image.path}")
-                            print(f"Image URL: {project_image.image.url}")
-                            
+                            ProjectImage.objects.create(project=self.object, image=image)
                         except Exception as e:
-                            print(f"Error saving image {image.name}: {str(e)}")
                             messages.error(self.request, f'Error uploading {image.name}: {str(e)}')
-                else:
-                    print("No 'images' key in request.FILES")
+                    self.object.update_cover_image()
                 
                 messages.success(self.request, 'Project created successfully!')
                 return super().form_valid(form)
                 
         except Exception as e:
-            print(f"Unexpected error in form_valid: {str(e)}")
             messages.error(self.request, f'An error occurred while saving the project: {str(e)}')
             return self.form_invalid(form)
     
@@ -109,29 +99,45 @@ class ProjectUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
                 for file in self.request.FILES.getlist('image'):
                     if file:  # Ensure the file exists and has content
                         ProjectImage.objects.create(project=self.object, image=file)
+                if self.object.cover_image_id is None:
+                    self.object.update_cover_image()
         
         messages.success(self.request, 'Project updated successfully!')
         return super().form_valid(form)
 
-class ProjectDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
+class ProjectDetailView(LoginRequiredMixin, ConditionalGetMixin, DetailView):
     """View for viewing project details."""
     model = Project
     template_name = 'student/project/project_detail.html'
     context_object_name = 'project'
     
+    def get_queryset(self):
+        # Students only see their own projects; the project and its images
+        # are fetched once, in one query and one prefetch
+        return (
+            Project.objects.filter(student=self.request.user)
+            .select_related('student').prefetch_related('images')
+        )
+    
+    def get_validators(self):
+        # Images are added and removed without saving the project, so their
+        # count and newest id go into the validators alongside updated_at
+        summary = Project.objects.filter(pk=self.kwargs['pk'], student=self.request.user).aggregate(
+            last_modified=Max('updated_at'), image_count=Count('images'), last_image=Max('images__id'),
+        )
+        etag, _ = validators(
+            summary['last_modified'], summary['image_count'], summary['last_image'], *self.get_validator_parts(),
+        )
+        # Removing an image leaves updated_at alone, so the date can't vouch for the page
+        return etag, None
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # Add the request to the context
         context['request'] = self.request
         # Add MEDIA_URL to the context
         context['MEDIA_URL'] = '/media/'
-        # Prefetch related images to avoid N+1 query
-        context['project'] = Project.objects.prefetch_related('images').get(pk=self.object.pk)
         return context
-    
-    def test_func(self):
-        project = self.get_object()
-        return self.request.user == project.student
 
 class ProjectDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
     """View for deleting a project."""
@@ -157,6 +163,9 @@ class ProjectImageDeleteView(LoginRequiredMixin, UserPassesTestMixin, View):
     def post(self, request, *args, **kwargs):
         image = get_object_or_404(ProjectImage, pk=self.kwargs['pk'])
         project = image.project
+        was_cover = project.cover_image_id == image.pk
         image.delete()
+        if was_cover:
+            project.update_cover_image()
         messages.success(request, 'Image deleted successfully!')
         return redirect('core:project_update', pk=project.pk)
@@ -0,0 +1,64 @@
+"""
+Mentor ratings.
+
+Students rate a completed session from 1 to 5 stars (``Feedback.rating``).
+Each mentor row keeps the running count and sum of their ratings and a
+Bayesian average (``Mentor.bayesian_average``), so the directory sorts by an
+indexed column instead of aggregating every mentor's feedback per page.
+
+The totals move with F-expression UPDATEs as feedback is created, edited or
+deleted (``rating_changed``, called from core.signals). Changes that bypass
+the signals, such as ``QuerySet.update`` or ``bulk_create``, leave them
+behind; ``rebuild_ratings`` recomputes them from the feedback and is run by
+the rebuild_mentor_ratings command.
+"""
+import math
+
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from .cache import bump_mentor_card_version
+from .models import Feedback, Mentor
+
+
+def rating_changed(old, new):
+    """
+    Move the totals from ``old`` to ``new``, each a ``(mentor_id, rating)``
+    pair with ``rating`` None for no rating. One UPDATE per mentor touched.
+    """
+    deltas = {}
+    for (mentor_id, rating), sign in ((old, -1), (new, 1)):
+        if rating is not None:
+            count, total = deltas.get(mentor_id, (0, 0))
+            deltas[mentor_id] = (count + sign, total + sign * rating)
+    for mentor_id, (count, total) in deltas.items():
+        if count or total:
+            Mentor.add_ratings(mentor_id, count, total)
+            bump_mentor_card_version(mentor_id)
+
+
+def rebuild_ratings(mentors):
+    """
+    Recompute the totals of the ``mentors`` queryset from their feedback and
+    save the ones that had drifted. Returns the number repaired.
+    """
+    mentors = list(mentors.only('pk', 'rating_count', 'rating_sum', 'rating_average'))
+    totals = {
+        row['mentor']: (row['count'], row['total'])
+        for row in Feedback.objects.filter(mentor__in=[mentor.pk for mentor in mentors], rating__isnull=False)
+        .order_by().values('mentor').annotate(count=Count('rating'), total=Sum('rating'))
+    }
+    drifted, now = [], timezone.now()
+    for mentor in mentors:
+        count, total = totals.get(mentor.pk, (0, 0))
+        average = Mentor.bayesian_average(count, total)
+        if (mentor.rating_count, mentor.rating_sum) != (count, total) or not math.isclose(mentor.rating_average, average):
+            mentor.rating_count, mentor.rating_sum, mentor.rating_average = count, total, average
+            # bulk_update skips auto_now; the directory's validators read updated_at
+            mentor.updated_at = now
+            drifted.append(mentor)
+    if drifted:
+        Mentor.objects.bulk_update(drifted, ['rating_count', 'rating_sum', 'rating_average', 'updated_at'])
+        for mentor in drifted:
+            bump_mentor_card_version(mentor.pk)
+    return len(drifted)
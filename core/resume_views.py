@@ -1,4 +1,5 @@
 from django.contrib import messages
+from django.utils import timezone
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
@@ -6,10 +7,11 @@ from django.views.generic import ListView, CreateView, UpdateView, DeleteView, V
 from django.http import FileResponse, Http404
 from django.conf import settings
 import os
+from .mixins import ConditionalGetMixin, ReplicaReadMixin
 from .models import Resume
 from .resume_forms import ResumeForm
 
-class ResumeListView(LoginRequiredMixin, ListView):
+class ResumeListView(ReplicaReadMixin, LoginRequiredMixin, ConditionalGetMixin, ListView):
     model = Resume
     template_name = 'student/resume_list.html'
     context_object_name = 'resumes'
@@ -68,7 +70,9 @@ class ResumeDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
 class SetPrimaryResumeView(LoginRequiredMixin, View):
     def post(self, request, *args, **kwargs):
         resume = get_object_or_404(Resume, pk=kwargs['pk'], student=request.user)
-        Resume.objects.filter(student=request.user, is_primary=True).update(is_primary=False)
+        Resume.objects.filter(student=request.user, is_primary=True).update(
+            is_primary=False, updated_at=timezone.now()
+        )
         resume.is_primary = True
         resume.save()
         messages.success(request, 'Primary resume updated successfully!')
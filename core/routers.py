@@ -0,0 +1,158 @@
+"""
+Read-replica routing.
+
+Nothing is read from the replica unless a view opts in. ``ReplicaReadMixin``
+(and ``ReplicaChangeListMixin`` in the admin) run a GET inside
+``replica_reads()``, and only then does ``ReplicaRouter`` send reads of core
+models to the ``replica`` alias. Writes always go to ``default``. Reads inside
+a transaction also stay on ``default``.
+
+A request that may have written (any non-safe method) gets a short-lived
+cookie from ``ReplicaPinMiddleware``. While the cookie is present that browser
+reads from the primary, so people see their own bookings and uploads. A
+replica that is unreachable or more than ``REPLICA_MAX_LAG`` seconds behind is
+skipped until the next check.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+REPLICA_DB = 'replica'
+REPLICA_PIN_COOKIE = 'db_primary'
+
+# Framework tables (sessions, permissions, content types) always come from the primary
+REPLICA_APP_LABELS = {'core'}
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+# alias -> (monotonic time of the check, whether the replica was usable)
+_replica_health = {}
+
+
+@contextmanager
+def replica_reads():
+    """Route reads of core models to the replica for the duration of the block."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get() or model._meta.app_label not in REPLICA_APP_LABELS:
+            return None
+        # Reads inside a transaction must see that transaction's writes
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return REPLICA_DB
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+
+def replica_lag(alias=REPLICA_DB):
+    """
+    Seconds the replica is behind its source.
+
+    Returns 0 when the alias isn't a MySQL replica at all (a second local
+    database in development, or the test mirror) and None when replication is
+    stopped.
+    """
+    connection = connections[alias]
+    if connection.vendor != 'mysql':
+        return 0
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute('SHOW REPLICA STATUS')
+        except DatabaseError:
+            # MySQL < 8.0.22
+            cursor.execute('SHOW SLAVE STATUS')
+        row = cursor.fetchone()
+        if row is None:
+            return 0
+        status = dict(zip([column[0] for column in cursor.description], row))
+    return status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+
+
+def replica_available(alias=REPLICA_DB):
+    """Whether the replica is configured, reachable and fresh enough, checked at most every few seconds."""
+    if alias not in settings.DATABASES:
+        return False
+
+    now = time.monotonic()
+    checked = _replica_health.get(alias)
+    if checked and now - checked[0] < settings.REPLICA_HEALTH_CHECK_INTERVAL:
+        return checked[1]
+
+    try:
+        lag = replica_lag(alias)
+    except DatabaseError:
+        lag = None
+    usable = lag is not None and lag <= settings.REPLICA_MAX_LAG
+    _replica_health[alias] = (now, usable)
+    return usable
+
+
+def should_read_from_replica(request):
+    return (
+        request.method in ('GET', 'HEAD')
+        and REPLICA_PIN_COOKIE not in request.COOKIES
+        and replica_available()
+    )
+
+
+def serve_from_replica(request, view, *args, **kwargs):
+    """
+    Call ``view`` with its reads on the replica, if this request may use it.
+
+    Template responses are rendered inside the block, since that's where
+    lazy querysets in the context are evaluated.
+    """
+    if not should_read_from_replica(request):
+        return view(request, *args, **kwargs)
+    with replica_reads():
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render') and callable(response.render):
+            response = response.render()
+    return response
+
+
+async def aserve_from_replica(request, view, *args, **kwargs):
+    """Async counterpart of ``serve_from_replica`` for async views."""
+    if not await sync_to_async(should_read_from_replica)(request):
+        return await view(request, *args, **kwargs)
+    # sync_to_async copies the context, so queries run in worker threads see the flag too
+    with replica_reads():
+        response = await view(request, *args, **kwargs)
+        if hasattr(response, 'render') and callable(response.render):
+            response = await sync_to_async(response.render)()
+    return response
+
+
+class ReplicaPinMiddleware:
+    """Keep a browser on the primary for REPLICA_PIN_SECONDS after it writes."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE') and REPLICA_DB in settings.DATABASES:
+            response.set_cookie(
+                REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+                secure=request.is_secure(),
+            )
+        return response
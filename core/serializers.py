@@ -0,0 +1,85 @@
+from rest_framework import serializers
+
+from .models import Availability, Mentor, Project, Resume, Session
+
+
+class SparseFieldsetSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer limited to the ``fields`` it's constructed with, and able
+    to say which columns and joins those fields read (``queryset_for``).
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    def queryset_for(self, queryset, always=()):
+        """Narrow ``queryset`` to the columns and relations the remaining fields use, plus ``always``."""
+        model = queryset.model
+        only, related = set(always), set()
+        for field in self.fields.values():
+            path, opts = [], model._meta
+            for attr in field.source_attrs:
+                if attr == 'pk':
+                    break
+                model_field = opts.get_field(attr)
+                path.append(model_field.name)
+                # ``student_id`` names the column; ``student`` follows the join
+                if attr != model_field.name or not (model_field.many_to_one or model_field.one_to_one):
+                    break
+                related.add('__'.join(path))
+                opts = model_field.related_model._meta
+            # Every step of a join is loaded too; only() can't defer a key select_related follows
+            for depth in range(1, len(path) + 1):
+                only.add('__'.join(path[:depth]))
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*only) if only else queryset.only('pk')
+
+
+class SessionSerializer(SparseFieldsetSerializer):
+    student = serializers.CharField(source='student.username', read_only=True)
+    mentor = serializers.CharField(source='mentor.username', read_only=True)
+
+    class Meta:
+        model = Session
+        fields = [
+            'id', 'title', 'description', 'status', 'scheduled_time', 'duration_minutes',
+            'student_id', 'student', 'mentor_id', 'mentor', 'created_at', 'updated_at',
+        ]
+
+
+class MentorSerializer(SparseFieldsetSerializer):
+    id = serializers.IntegerField(source='pk', read_only=True)
+    username = serializers.CharField(source='user.username', read_only=True)
+    first_name = serializers.CharField(source='user.first_name', read_only=True)
+    last_name = serializers.CharField(source='user.last_name', read_only=True)
+
+    class Meta:
+        model = Mentor
+        fields = [
+            'id', 'username', 'first_name', 'last_name', 'title', 'company', 'bio',
+            'linkedin_url', 'is_available', 'updated_at',
+        ]
+
+
+class AvailabilitySerializer(SparseFieldsetSerializer):
+    class Meta:
+        model = Availability
+        fields = ['id', 'mentor_id', 'day_of_week', 'start_time', 'end_time', 'is_recurring', 'updated_at']
+
+
+class ProjectSerializer(SparseFieldsetSerializer):
+    cover_image = serializers.ImageField(source='cover_image.image', read_only=True, allow_null=True)
+
+    class Meta:
+        model = Project
+        fields = ['id', 'title', 'description', 'tech_stack', 'cover_image', 'created_at', 'updated_at']
+
+
+class ResumeSerializer(SparseFieldsetSerializer):
+    class Meta:
+        model = Resume
+        fields = ['id', 'title', 'file', 'is_primary', 'uploaded_at', 'updated_at']
@@ -0,0 +1,137 @@
+"""
+Bulk actions on a mentor's pending session requests.
+
+``apply_bulk_action`` accepts, rejects or reschedules any number of requests
+in one transaction: the requests are locked and read in one query, conflicts
+with the mentor's accepted sessions (and with each other) are found in one
+pass over the sorted intervals, and the changes are written with a single
+conditional UPDATE that only touches rows still requested from that mentor.
+"""
+import datetime
+from collections import namedtuple
+
+from django.db import transaction
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+
+from .ical import invalidate_feeds
+from .models import Session
+
+ACCEPT, REJECT, RESCHEDULE = 'accept', 'reject', 'reschedule'
+ACTIONS = (ACCEPT, REJECT, RESCHEDULE)
+
+# What happened to each session
+ACCEPTED, REJECTED, RESCHEDULED = 'accepted', 'rejected', 'rescheduled'
+CONFLICT, INVALID, NOT_PENDING = 'conflict', 'invalid', 'not_pending'
+
+Outcome = namedtuple('Outcome', ['session_id', 'title', 'outcome', 'detail'])
+
+
+def find_conflicts(fixed, candidates):
+    """
+    Return the keys of the ``candidates`` that can't be kept.
+
+    ``fixed`` are ``(start, end)`` intervals that are already booked and
+    ``candidates`` are ``(start, end, key)``. Candidates are kept earliest
+    first; one overlapping a fixed interval or an earlier kept candidate is a
+    conflict. Both lists are walked once, in start order.
+    """
+    fixed = sorted(fixed)
+    conflicts, position, frontier = set(), 0, None
+    for start, end, key in sorted(candidates):
+        # Everything kept so far that starts no later than this candidate
+        while position < len(fixed) and fixed[position][0] <= start:
+            if frontier is None or fixed[position][1] > frontier:
+                frontier = fixed[position][1]
+            position += 1
+        overlaps_earlier = frontier is not None and start < frontier
+        overlaps_next = position < len(fixed) and fixed[position][0] < end
+        if overlaps_earlier or overlaps_next:
+            conflicts.add(key)
+        elif frontier is None or end > frontier:
+            frontier = end
+    return conflicts
+
+
+def accepted_intervals(mentor, start, end):
+    """The mentor's accepted sessions overlapping ``start``..``end``, as (start, end) pairs."""
+    sessions = Session.objects.filter(
+        mentor=mentor, status='accepted', scheduled_time__lt=end,
+        scheduled_time__gt=start - datetime.timedelta(minutes=Session.MAX_DURATION_MINUTES),
+    ).values_list('scheduled_time', 'duration_minutes')
+    return [
+        (scheduled_time, scheduled_time + datetime.timedelta(minutes=duration))
+        for scheduled_time, duration in sessions
+    ]
+
+
+def apply_bulk_action(mentor, action, session_ids, new_times=None):
+    """
+    Apply ``action`` to the mentor's requested sessions ``session_ids`` and
+    return an ``Outcome`` per id, in the order given.
+
+    Rescheduling takes each session's new start time from ``new_times``; the
+    session stays requested at its new time.
+    """
+    if action not in ACTIONS:
+        raise ValueError(f'Unknown action {action!r}')
+    session_ids = list(dict.fromkeys(int(pk) for pk in session_ids))
+    new_times = new_times or {}
+    now = timezone.now()
+    outcomes = {}
+
+    with transaction.atomic():
+        pending = {
+            session.pk: session
+            for session in Session.objects.select_for_update().filter(
+                pk__in=session_ids, mentor=mentor, status='requested',
+            ).only('pk', 'student_id', 'title', 'scheduled_time', 'duration_minutes')
+        }
+        for pk in session_ids:
+            if pk not in pending:
+                outcomes[pk] = Outcome(pk, '', NOT_PENDING, 'This request is no longer pending.')
+
+        if action == REJECT:
+            chosen, changes, done = list(pending), {'status': 'rejected'}, REJECTED
+        else:
+            starts = {}
+            for pk, session in pending.items():
+                start = new_times.get(pk) if action == RESCHEDULE else session.scheduled_time
+                if start is None:
+                    outcomes[pk] = Outcome(pk, session.title, INVALID, 'Choose a new time.')
+                elif start <= now:
+                    outcomes[pk] = Outcome(pk, session.title, INVALID, 'That time has already passed.')
+                else:
+                    starts[pk] = start
+            candidates = [
+                (start, start + datetime.timedelta(minutes=pending[pk].duration_minutes), pk)
+                for pk, start in starts.items()
+            ]
+            conflicts = set()
+            if candidates:
+                fixed = accepted_intervals(
+                    mentor, min(start for start, _, _ in candidates), max(end for _, end, _ in candidates),
+                )
+                conflicts = find_conflicts(fixed, candidates)
+            for pk in conflicts:
+                outcomes[pk] = Outcome(pk, pending[pk].title, CONFLICT, 'This overlaps another session.')
+            chosen = [pk for pk in starts if pk not in conflicts]
+            if action == ACCEPT:
+                changes, done = {'status': 'accepted'}, ACCEPTED
+            else:
+                changes = {'scheduled_time': Case(
+                    *[When(pk=pk, then=Value(starts[pk])) for pk in chosen], output_field=DateTimeField(),
+                )}
+                done = RESCHEDULED
+
+        if chosen:
+            Session.objects.filter(pk__in=chosen, mentor=mentor, status='requested').update(
+                updated_at=now, **changes
+            )
+            # update() sends no signals; accepted sessions join both calendars
+            student_ids = [pending[pk].student_id for pk in chosen]
+            transaction.on_commit(lambda: invalidate_feeds([mentor.pk, *student_ids]))
+            for pk in chosen:
+                outcomes[pk] = Outcome(pk, pending[pk].title, done, '')
+
+    return [outcomes[pk] for pk in session_ids]
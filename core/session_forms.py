@@ -1,12 +1,16 @@
+import datetime
+
 from django import forms
 from django.utils import timezone
 from django.core.exceptions import ValidationError
-from .models import Session, User
+from .availability import free_at_filter
+from .models import Availability, Feedback, Session
+from .slots import free_mentor_ids
 
 class SessionBookingForm(forms.ModelForm):
     """Form for booking a session with a mentor."""
     def __init__(self, *args, **kwargs):
-        self.mentor_id = kwargs.pop('mentor_id', None)
+        self.mentor = kwargs.pop('mentor', None)
         super().__init__(*args, **kwargs)
         
         # Set default duration to 30 minutes if not set
@@ -30,7 +34,7 @@ class SessionBookingForm(forms.ModelForm):
                 attrs={
                     'class': 'form-control',
                     'min': 15,
-                    'max': 120,
+                    'max': Session.MAX_DURATION_MINUTES,
                     'step': 15,
                 }
             ),
@@ -52,15 +56,63 @@ class SessionBookingForm(forms.ModelForm):
             self.add_error('scheduled_time', 'Scheduled time cannot be in the past.')
             
         # Validate duration is within allowed range
-        if duration_minutes and (duration_minutes < 15 or duration_minutes > 120):
+        if duration_minutes and (duration_minutes < 15 or duration_minutes > Session.MAX_DURATION_MINUTES):
             self.add_error('duration_minutes', 'Duration must be between 15 and 120 minutes.')
             
-        # Validate mentor exists
-        if self.mentor_id:
-            try:
-                mentor = User.objects.get(id=self.mentor_id, is_mentor=True)
-                cleaned_data['mentor'] = mentor
-            except User.DoesNotExist:
-                raise ValidationError('Selected mentor does not exist or is not available.')
+        # The view has already resolved the mentor
+        if self.mentor:
+            cleaned_data['mentor'] = self.mentor
                 
         return cleaned_data
+
+
+class MentorFilterForm(forms.Form):
+    """Narrows the mentor directory to mentors free at a time of the week, or soon, and sorts it."""
+    SOON = datetime.timedelta(hours=48)
+    
+    day = forms.TypedChoiceField(
+        choices=[('', 'Any day')] + Availability.DAYS_OF_WEEK, coerce=int, empty_value=None, required=False,
+    )
+    time = forms.TimeField(required=False, widget=forms.TimeInput(attrs={'type': 'time', 'step': 900}))
+    soon = forms.BooleanField(required=False, label='Free in the next 48 hours')
+    sort = forms.ChoiceField(choices=[('', 'Sort: default'), ('rating', 'Sort: top rated')], required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if (cleaned_data.get('day') is None) != (cleaned_data.get('time') is None):
+            raise ValidationError('Choose both a day and a time.')
+        return cleaned_data
+
+    def filter(self, queryset, field='mentor_profile'):
+        """Mentors free on the chosen day and time, and/or soon (all of them if nothing was chosen), sorted."""
+        if not self.is_valid():
+            return queryset
+        if self.cleaned_data['day'] is not None:
+            alias, lookup = free_at_filter(
+                f'{field}__weekly_availability', self.cleaned_data['day'], self.cleaned_data['time'],
+            )
+            queryset = queryset.alias(**alias).filter(**lookup, **{f'{field}__is_available': True})
+        if self.cleaned_data['soon']:
+            # A range scan of the materialized slots (core.slots)
+            now = timezone.now()
+            queryset = queryset.filter(**{f'{field}__pk__in': free_mentor_ids(now, now + self.SOON)})
+        if self.cleaned_data['sort'] == 'rating':
+            # Walks the (-rating_average, user) index on the mentor table
+            queryset = queryset.order_by(f'-{field}__rating_average', f'{field}__user_id')
+        return queryset
+
+
+class SessionFeedbackForm(forms.ModelForm):
+    """A student's star rating and comments on a completed session."""
+    rating = forms.TypedChoiceField(
+        choices=[(stars, f'{stars} star{"s" if stars > 1 else ""}') for stars in range(5, 0, -1)],
+        coerce=int, widget=forms.RadioSelect,
+    )
+
+    class Meta:
+        model = Feedback
+        fields = ['rating', 'content']
+        labels = {'content': 'Comments'}
+        widgets = {
+            'content': forms.Textarea(attrs={'class': 'form-control', 'rows': 4}),
+        }
@@ -14,4 +14,8 @@ urlpatterns = [
     path('sessions/<int:pk>/', session_views.SessionDetailView.as_view(), name='session_detail'),
     path('sessions/<int:pk>/update/', session_views.SessionUpdateView.as_view(), name='update_session'),
     path('sessions/<int:pk>/cancel/', session_views.cancel_session, name='cancel_session'),
+    path('sessions/<int:session_id>/feedback/', session_views.SessionFeedbackView.as_view(), name='feedback_create'),
+    
+    # Calendar subscription (token in the URL; no login)
+    path('calendar/<int:user_id>/<str:token>.ics', session_views.CalendarFeedView.as_view(), name='calendar_feed'),
 ]
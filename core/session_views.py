@@ -1,36 +1,68 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.urls import reverse
-from django.views.generic import ListView, CreateView, DetailView, UpdateView
+from django.views.generic import ListView, CreateView, DetailView, UpdateView, View
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.utils.decorators import method_decorator
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseForbidden
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.utils.functional import cached_property
+from django.utils import timezone
 from django.db.models import Q
 
-from .models import User, Session
-from .session_forms import SessionBookingForm
+from .models import Feedback, User, Session
+from .cache import mentor_card_versions
+from .conditional import not_modified, queryset_validators, set_validators
+from .ical import CONTENT_TYPE, caching_feed, check_feed_token, feed_cache_key, feed_sessions, write_feed
+from .identity import identity_map
+from .mixins import ConditionalGetMixin, ReplicaReadMixin
+from .session_forms import MentorFilterForm, SessionBookingForm, SessionFeedbackForm
 
 
-class MentorListView(LoginRequiredMixin, ListView):
+class MentorListView(ReplicaReadMixin, LoginRequiredMixin, ConditionalGetMixin, ListView):
     """View to list all available mentors."""
     model = User
     template_name = 'student/mentor_list.html'
     context_object_name = 'mentors'
     paginate_by = 10
+    validator_field = 'mentor_profile__updated_at'
+    
+    @cached_property
+    def filter_form(self):
+        return MentorFilterForm(self.request.GET or None)
     
     def get_queryset(self):
         # Get all users who are mentors and have a mentor profile
-        return User.objects.filter(
+        mentors = User.objects.filter(
             is_mentor=True,
             mentor_profile__isnull=False
         ).select_related('mentor_profile')
+        # "Free on Tuesday at 18:00" reads one character of the profile row
+        return self.filter_form.filter(mentors)
+
+    def get_validator_parts(self):
+        parts = super().get_validator_parts()
+        if self.filter_form.is_valid() and self.filter_form.cleaned_data['soon']:
+            # "Free soon" moves with the clock, not only with the rows:
+            # a page is current for the hour it was built in
+            parts += (timezone.now().strftime('%Y-%m-%dT%H'),)
+        return parts
         
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # Add the current path without query parameters to the context
         context['current_path'] = self.request.path
+        # Pagination links keep the filter
+        query = self.request.GET.copy()
+        query.pop('page', None)
+        context['filter_form'] = self.filter_form
+        context['filter_query'] = f'{query.urlencode()}&' if query else ''
+        # Per-mentor versions key the cached directory cards
+        versions = mentor_card_versions([mentor.pk for mentor in context['mentors']])
+        for mentor in context['mentors']:
+            mentor.card_version = versions[mentor.pk]
         return context
 
 
@@ -44,17 +76,23 @@ class BookSessionView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
         # Only students can book sessions
         return self.request.user.is_student
     
+    @cached_property
+    def mentor(self):
+        # Looked up once for the page, the form's validation and the new session
+        mentor = identity_map(self.request).mentor(self.kwargs['mentor_id'])
+        if mentor is None:
+            raise Http404('No such mentor')
+        return mentor
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        mentor = get_object_or_404(User, id=self.kwargs['mentor_id'], is_mentor=True)
-        context['mentor'] = mentor
+        context['mentor'] = self.mentor
         return context
     
     def form_valid(self, form):
-        mentor = get_object_or_404(User, id=self.kwargs['mentor_id'], is_mentor=True)
         session = form.save(commit=False)
         session.student = self.request.user
-        session.mentor = mentor
+        session.mentor = self.mentor
         session.status = 'requested'
         session.save()
         messages.success(self.request, 'Session request sent successfully!')
@@ -62,14 +100,14 @@ class BookSessionView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
     
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
-        kwargs['mentor_id'] = self.kwargs['mentor_id']
+        kwargs['mentor'] = self.mentor
         return kwargs
         
     def get_success_url(self):
         return reverse('core:student_dashboard')
 
 
-class SessionDetailView(LoginRequiredMixin, DetailView):
+class SessionDetailView(LoginRequiredMixin, ConditionalGetMixin, DetailView):
     """View to see details of a specific session."""
     model = Session
     template_name = 'student/session_detail.html'
@@ -80,7 +118,70 @@ class SessionDetailView(LoginRequiredMixin, DetailView):
         return Session.objects.filter(
             Q(student=self.request.user) | 
             Q(mentor=self.request.user)
+        ).select_related('student', 'mentor', 'feedback')
+
+
+class SessionFeedbackView(LoginRequiredMixin, UpdateView):
+    """A student rates a completed session, or changes their rating."""
+    model = Feedback
+    form_class = SessionFeedbackForm
+    template_name = 'student/session_feedback.html'
+    
+    @cached_property
+    def session(self):
+        return get_object_or_404(
+            Session.objects.select_related('mentor', 'feedback'),
+            pk=self.kwargs['session_id'], student=self.request.user, status='completed',
         )
+    
+    def get_object(self, queryset=None):
+        try:
+            return self.session.feedback
+        except Feedback.DoesNotExist:
+            return Feedback(session=self.session, student=self.request.user, mentor=self.session.mentor)
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['session'] = self.session
+        return context
+    
+    def form_valid(self, form):
+        # The mentor's rating totals follow in core.signals
+        messages.success(self.request, 'Thank you for your feedback!')
+        return super().form_valid(form)
+    
+    def get_success_url(self):
+        return reverse('core:sessions:session_detail', kwargs={'pk': self.session.pk})
+
+
+class CalendarFeedView(View):
+    """
+    A user's accepted sessions as an iCalendar feed. Calendar apps can't log
+    in, so the URL carries the user's feed token instead (see core.ical).
+    """
+    def get(self, request, user_id, token):
+        user = User.objects.filter(pk=user_id, is_active=True).only('pk', 'password').first()
+        if user is None or not check_feed_token(user, token):
+            raise Http404('No such calendar')
+        
+        # A cached feed answers the poll without touching the sessions table
+        key = feed_cache_key(user.pk)
+        cached = cache.get(key)
+        if cached is not None:
+            etag, last_modified, body = cached
+        else:
+            etag, last_modified = queryset_validators(feed_sessions(user), user.pk)
+        
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            if cached is not None:
+                response = HttpResponse(body, content_type=CONTENT_TYPE)
+            else:
+                response = StreamingHttpResponse(
+                    caching_feed(write_feed(feed_sessions(user)), key, etag, last_modified),
+                    content_type=CONTENT_TYPE,
+                )
+        return set_validators(response, etag, last_modified)
 
 
 @method_decorator(login_required, name='dispatch')
@@ -0,0 +1,105 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import bump_mentor_card_version
+from .ical import invalidate_feeds
+from .models import Feedback, Mentor, Session
+from .ratings import rating_changed, rebuild_ratings
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Mentor)
+@receiver(post_delete, sender=Mentor)
+def invalidate_mentor_card(sender, instance, **kwargs):
+    """Drop the cached directory card of a mentor whose profile changed."""
+    bump_mentor_card_version(instance.pk)
+
+
+# User fields shown on a mentor's directory card
+CARD_USER_FIELDS = {'username', 'first_name', 'last_name', 'profile_picture', 'is_mentor'}
+
+
+@receiver(post_save, sender=User)
+def invalidate_mentor_user_card(sender, instance, created, update_fields=None, **kwargs):
+    """Names and profile pictures on the directory card come from the user row."""
+    if update_fields is not None and not CARD_USER_FIELDS & set(update_fields):
+        return
+    if instance.is_mentor:
+        bump_mentor_card_version(instance.pk)
+    display = instance.display_values()
+    loaded = getattr(instance, '_loaded_display', None) or (None,) * len(display)
+    instance._loaded_display = display
+    if created or loaded == display:
+        return
+    # Pages and API responses showing these fields take their validators
+    # from the rows that show them, not from the user
+    now = timezone.now()
+    if instance.is_mentor:
+        Mentor.objects.filter(pk=instance.pk).update(updated_at=now)
+    if loaded[0] != display[0]:
+        # Sessions in the API carry both usernames
+        Session.objects.filter(Q(student=instance) | Q(mentor=instance)).update(updated_at=now)
+
+
+@receiver(post_save, sender=User)
+def update_mentor_profile(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Create or delete the mentor profile when ``is_mentor`` changes.
+
+    Saves that don't touch ``is_mentor`` -- ``last_login`` on every login,
+    profile edits -- cost no query: ``update_fields`` rules them out, or the
+    value loaded from the database (``User.from_db``) shows it's unchanged.
+    """
+    if update_fields is not None and 'is_mentor' not in update_fields:
+        return
+    loaded = getattr(instance, '_loaded_is_mentor', None)
+    instance._loaded_is_mentor = instance.is_mentor
+    if created:
+        if instance.is_mentor:
+            Mentor.objects.get_or_create(user=instance)
+        return
+    if loaded == instance.is_mentor:
+        return
+    if instance.is_mentor:
+        Mentor.objects.get_or_create(user=instance)
+    else:
+        # Deletes through the collector, so post_delete still drops the card
+        Mentor.objects.filter(user=instance).delete()
+
+
+@receiver(post_save, sender=Session)
+@receiver(post_delete, sender=Session)
+def invalidate_calendar_feeds(sender, instance, **kwargs):
+    """The session is in both its student's and its mentor's .ics feed."""
+    user_ids = [instance.student_id, instance.mentor_id]
+    # After commit, so a poll in between can't cache the old feed under the new version
+    transaction.on_commit(lambda: invalidate_feeds(user_ids))
+
+
+@receiver(post_save, sender=Feedback)
+def update_mentor_rating_on_save(sender, instance, created, update_fields=None, **kwargs):
+    """Move the mentor's rating totals by the difference this save made."""
+    if update_fields is not None and not {'mentor', 'rating'} & set(update_fields):
+        return
+    new = (instance.mentor_id, instance.rating)
+    if created:
+        old = (None, None)
+    elif hasattr(instance, '_loaded_rating'):
+        old = instance._loaded_rating
+    else:
+        # Saved without being loaded, so the old rating is unknown; recount
+        instance._loaded_rating = new
+        rebuild_ratings(Mentor.objects.filter(pk=instance.mentor_id))
+        return
+    instance._loaded_rating = new
+    rating_changed(old, new)
+
+
+@receiver(post_delete, sender=Feedback)
+def update_mentor_rating_on_delete(sender, instance, **kwargs):
+    rating_changed(getattr(instance, '_loaded_rating', (instance.mentor_id, instance.rating)), (None, None))
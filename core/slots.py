@@ -0,0 +1,125 @@
+"""
+Upcoming availability slots, materialized.
+
+Mentors give their availability as weekly rules (``Availability``).
+``AvailabilitySlot`` holds the concrete occurrences of those rules for the
+next AVAILABILITY_SLOT_WEEKS weeks, so "which mentors are free in the next 48
+hours" is one range scan of the (start_time, mentor) index instead of
+expanding every mentor's rules in Python.
+
+The table is kept current two ways:
+
+* ``regenerate_slots(mentor_ids)`` replaces the slots of the mentors whose
+  rules just changed (the availability page, the admin, bulk import);
+* ``roll_forward()``, run nightly by the roll_availability_slots command,
+  deletes slots that have ended and adds the ones that came into range.
+
+Rule times are in TIME_ZONE. A rule that isn't recurring happens once, the
+first time it comes round after it was last saved. Booked sessions are not
+taken out of the slots.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Availability, AvailabilitySlot
+
+RULE_FIELDS = ('mentor_id', 'day_of_week', 'start_time', 'end_time', 'is_recurring', 'updated_at')
+
+# No slot is longer than a day, so one that overlaps a range starts at most a day before it
+MAX_SLOT_LENGTH = datetime.timedelta(days=1)
+
+
+def occurrences(day_of_week, start_time, end_time, is_recurring, updated_at, window_start, window_end):
+    """Yield the ``(start, end)`` datetimes of one rule that overlap ``[window_start, window_end)``."""
+    tz = timezone.get_default_timezone()
+    # A one-off rule's only occurrence is the first after it was saved
+    since = updated_at if not is_recurring else window_start
+    first = timezone.localtime(since, tz).date()
+    date = first + datetime.timedelta(days=(day_of_week - first.weekday()) % 7)
+    while True:
+        start = datetime.datetime.combine(date, start_time, tzinfo=tz)
+        end = datetime.datetime.combine(date, end_time, tzinfo=tz)
+        if start >= window_end:
+            return
+        if not is_recurring:
+            if start < updated_at:
+                date += datetime.timedelta(weeks=1)
+                continue
+            if end > window_start:
+                yield start, end
+            return
+        if end > window_start:
+            yield start, end
+        date += datetime.timedelta(weeks=1)
+
+
+def expand(rules, window_start, window_end):
+    """``AvailabilitySlot``\\s for ``rules`` (tuples of RULE_FIELDS) in the window."""
+    return [
+        AvailabilitySlot(mentor_id=mentor_id, start_time=start, end_time=end)
+        for mentor_id, *rule in rules
+        for start, end in occurrences(*rule, window_start, window_end)
+    ]
+
+
+def horizon(now):
+    return now + datetime.timedelta(weeks=settings.AVAILABILITY_SLOT_WEEKS)
+
+
+def regenerate_slots(mentor_ids, now=None):
+    """Replace the current and future slots of ``mentor_ids`` from their rules: three queries."""
+    now = now or timezone.now()
+    rules = Availability.objects.filter(mentor_id__in=mentor_ids).values_list(*RULE_FIELDS)
+    with transaction.atomic():
+        # Slots have no relations or signals, so this is a single DELETE
+        AvailabilitySlot.objects.filter(mentor_id__in=mentor_ids, end_time__gt=now).delete()
+        # Rules saved before overlaps were rejected can repeat a start time
+        AvailabilitySlot.objects.bulk_create(
+            expand(rules, now, horizon(now)), batch_size=1000, ignore_conflicts=True,
+        )
+
+
+def roll_forward(now=None, batch_size=1000):
+    """
+    Delete slots that have ended and add any missing ones up to the horizon.
+    Returns ``(deleted, rules)``: slots deleted and rules expanded.
+    """
+    now = now or timezone.now()
+    end = horizon(now)
+    deleted = AvailabilitySlot.objects.filter(end_time__lte=now).delete()[0]
+    rules = Availability.objects.order_by('pk')
+    count, last_pk = 0, None
+    while True:
+        # Each batch is read in full before inserting: the MySQL connector's
+        # cursors are unbuffered, so a half-read iterator() would block them
+        batch = rules if last_pk is None else rules.filter(pk__gt=last_pk)
+        rows = list(batch.values_list('pk', *RULE_FIELDS)[:batch_size])
+        if not rows:
+            break
+        # Slots that already exist are left alone
+        AvailabilitySlot.objects.bulk_create(
+            expand([rule for _, *rule in rows], now, end), ignore_conflicts=True,
+        )
+        count += len(rows)
+        last_pk = rows[-1][0]
+        if len(rows) < batch_size:
+            break
+    return deleted, count
+
+
+def free_mentor_ids(start, end):
+    """
+    The ids of available mentors with a slot overlapping ``[start, end)``:
+    a range scan of the (start_time, mentor) index.
+    """
+    return (
+        AvailabilitySlot.objects
+        .filter(start_time__gte=start - MAX_SLOT_LENGTH, start_time__lt=end, end_time__gt=start,
+                mentor__is_available=True)
+        .order_by()
+        .values_list('mentor_id', flat=True)
+        .distinct()
+    )
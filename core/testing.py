@@ -0,0 +1,83 @@
+"""
+Test helpers for asserting per-view SQL query budgets.
+
+A view that issues one query per related row (``project.images.first`` in a
+template loop, ``mentor.mentor_profile`` without ``select_related`` ...) looks
+fine with a handful of rows and falls over in production. ``query_budget``
+renders the same view against 1, 10 and 100 related rows and fails when the
+query count goes over the declared budget or grows with the row count.
+"""
+import functools
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.test.utils import CaptureQueriesContext
+
+# Row counts each budgeted view is rendered with
+QUERY_BUDGET_SIZES = (1, 10, 100)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a view goes over its budget or scales with row count."""
+
+
+def _format_queries(captured):
+    return '\n'.join(
+        f"{i}. {query['sql']}" for i, query in enumerate(captured, 1)
+    )
+
+
+def query_budget(max_queries, sizes=QUERY_BUDGET_SIZES, using=DEFAULT_DB_ALIAS):
+    """
+    Decorate a ``TestCase`` method with a maximum query budget.
+
+    The decorated method receives the number of related rows to create and
+    must return either a URL to GET through ``self.client`` or a callable that
+    performs the request and returns the response. Only queries issued by
+    that request are counted; fixture setup is not. Each size runs inside a
+    savepoint that is rolled back afterwards, so sizes do not leak rows into
+    each other. The counts per size are left in ``self.query_counts``.
+
+        @query_budget(6)
+        def test_project_list(self, rows):
+            self.make_projects(rows)
+            return reverse('core:project_list')
+    """
+    def decorator(test_func):
+        @functools.wraps(test_func)
+        def wrapper(self):
+            connection = connections[using]
+            counts = {}
+            largest = None
+
+            for size in sizes:
+                sid = transaction.savepoint(using=using)
+                try:
+                    target = test_func(self, size)
+                    with CaptureQueriesContext(connection) as ctx:
+                        response = target() if callable(target) else self.client.get(target)
+                    self.assertLess(
+                        response.status_code, 500,
+                        f'{test_func.__name__} returned {response.status_code} with {size} rows'
+                    )
+                    counts[size] = len(ctx)
+                    largest = ctx.captured_queries
+                finally:
+                    transaction.savepoint_rollback(sid, using=using)
+
+            summary = ', '.join(f'{size} rows: {count}' for size, count in counts.items())
+            worst = max(counts.values())
+            if worst > max_queries:
+                raise QueryBudgetExceeded(
+                    f'{test_func.__name__} used {worst} queries, budget is {max_queries} '
+                    f'({summary}).\nQueries at {sizes[-1]} rows:\n{_format_queries(largest)}'
+                )
+            if counts[sizes[-1]] > counts[sizes[0]]:
+                raise QueryBudgetExceeded(
+                    f'{test_func.__name__} query count grows with row count ({summary}).\n'
+                    f'Queries at {sizes[-1]} rows:\n{_format_queries(largest)}'
+                )
+            self.query_counts = counts
+
+        wrapper.query_budget = max_queries
+        return wrapper
+    return decorator
@@ -1,3 +1,1558 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import io
+import json
+import re
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.auth.forms import AuthenticationForm
+from django.contrib.sessions.models import Session as DjangoSession
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.apps import apps
+from django.db.migrations.loader import MigrationLoader
+from django.db import OperationalError, connection, connections, models
+from django.test import AsyncRequestFactory, Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from . import async_views, views
+from .archive import archive_sessions
+from .models import User, Mentor, Availability, AvailabilitySlot, Feedback, Project, ProjectImage, Resume, Session, SessionArchive
+from .availability import encode, is_free, slot_mask
+from .cache import CSRF_PLACEHOLDER, _page_cache_key, mentor_card_versions
+from .export import export_batches
+from .ical import feed_url, fold
+from .form_styles import CHECKBOX_CLASSES, INPUT_CLASSES
+from .forms import UserLoginForm, UserUpdateForm
+from .operations import CHECKPOINT_TABLE, AddIndexOnline, BatchedRunPython, add_index_sql
+from .resume_forms import ResumeForm
+from .session_actions import find_conflicts
+from .slots import regenerate_slots, roll_forward
+from .routers import REPLICA_PIN_COOKIE, ReplicaRouter, _replica_health, replica_reads
+from .testing import query_budget
+from .user_import import import_chunk
+
+
+class QueryBudgetTestCase(TestCase):
+    """
+    Every URL in ``core/urls.py`` and ``core/session_urls.py`` rendered with
+    1, 10 and 100 related rows. A failure here means a view or its template
+    started issuing queries per row.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user(
+            username='student', password='pass12345', first_name='Sam', last_name='Student',
+            email='student@example.com', is_student=True,
+        )
+        cls.mentor_user = User.objects.create_user(
+            username='mentor', password='pass12345', first_name='Mia', last_name='Mentor',
+            email='mentor@example.com', is_student=False, is_mentor=True,
+        )
+        cls.mentor = Mentor.objects.get(user=cls.mentor_user)
+        Availability.objects.create(
+            mentor=cls.mentor, day_of_week=0,
+            start_time=datetime.time(9, 0), end_time=datetime.time(10, 0),
+        )
+
+    def login_student(self):
+        self.client.force_login(self.student)
+
+    def login_mentor(self):
+        self.client.force_login(self.mentor_user)
+
+    # Fixture builders
+
+    def make_projects(self, rows, images_per_project=1):
+        projects = Project.objects.bulk_create([
+            Project(student=self.student, title=f'Project {i}', description='Description',
+                    tech_stack='Python, Django')
+            for i in range(rows)
+        ])
+        images = ProjectImage.objects.bulk_create([
+            ProjectImage(project=project, image=f'project_images/{project.pk}_{n}.png')
+            for project in projects
+            for n in range(images_per_project)
+        ])
+        for project, cover in zip(projects, images[::images_per_project]):
+            project.cover_image = cover
+        Project.objects.bulk_update(projects, ['cover_image'])
+        return projects
+
+    def make_resumes(self, rows):
+        return Resume.objects.bulk_create([
+            Resume(student=self.student, title=f'Resume {i}', file=f'resumes/{i}.pdf',
+                   is_primary=(i == 0))
+            for i in range(rows)
+        ])
+
+    def make_sessions(self, rows):
+        """Create ``rows`` requested, accepted and completed sessions, each with its own student."""
+        students = User.objects.bulk_create([
+            User(username=f'student_{i}', first_name='Extra', last_name=f'Student{i}')
+            for i in range(rows)
+        ])
+        now = timezone.now()
+        sessions = []
+        for i, student in enumerate([self.student] + students[1:]):
+            for status, offset in (('requested', 1), ('accepted', 2), ('completed', -2)):
+                sessions.append(Session(
+                    student=student, mentor=self.mentor_user, title=f'{status} {i}',
+                    status=status, scheduled_time=now + datetime.timedelta(days=offset, minutes=i),
+                ))
+        return Session.objects.bulk_create(sessions)
+
+    def make_mentors(self, rows):
+        users = User.objects.bulk_create([
+            User(username=f'mentor_{i}', first_name='Extra', last_name=f'Mentor{i}',
+                 is_student=False, is_mentor=True)
+            for i in range(rows)
+        ])
+        Mentor.objects.bulk_create([Mentor(user=user, title='Engineer') for user in users])
+        return users
+
+    def make_availability(self, rows):
+        return Availability.objects.bulk_create([
+            Availability(mentor=self.mentor, day_of_week=i % 7,
+                         start_time=datetime.time(10 + i // 14, (i // 7) % 2 * 30),
+                         end_time=datetime.time(10 + i // 14, (i // 7) % 2 * 30 + 15))
+            for i in range(rows)
+        ])
+
+    # Anonymous pages
+
+    @query_budget(0)
+    def test_home(self, rows):
+        self.make_mentors(rows)
+        return reverse('core:home')
+
+    @query_budget(0)
+    def test_register(self, rows):
+        self.make_mentors(rows)
+        return reverse('core:register')
+
+    @query_budget(0)
+    def test_login(self, rows):
+        return reverse('core:login')
+
+    @query_budget(4)
+    def test_logout(self, rows):
+        self.login_student()
+        return lambda: self.client.post(reverse('core:logout'))
+
+    @query_budget(0)
+    def test_password_reset(self, rows):
+        return reverse('core:password_reset')
+
+    @query_budget(0)
+    def test_password_reset_done(self, rows):
+        return reverse('core:password_reset_done')
+
+    @query_budget(1)
+    def test_password_reset_confirm(self, rows):
+        return reverse('core:password_reset_confirm', args=['MQ', 'invalid-token'])
+
+    @query_budget(0)
+    def test_password_reset_complete(self, rows):
+        return reverse('core:password_reset_complete')
+
+    # Profile
+
+    @query_budget(3)
+    def test_profile(self, rows):
+        self.login_student()
+        self.make_projects(rows)
+        return reverse('core:profile')
+
+    @query_budget(3)
+    def test_mentor_profile_update(self, rows):
+        self.login_mentor()
+        self.make_sessions(rows)
+        return reverse('core:mentor_profile_update')
+
+    # Student pages
+
+    @query_budget(14)
+    def test_student_dashboard(self, rows):
+        self.login_student()
+        self.make_projects(rows)
+        self.make_resumes(rows)
+        self.make_sessions(rows)
+        return reverse('core:student_dashboard')
+
+    @query_budget(4)
+    def test_resume_list(self, rows):
+        self.login_student()
+        self.make_resumes(rows)
+        return reverse('core:resume_list')
+
+    @query_budget(2)
+    def test_resume_upload(self, rows):
+        self.login_student()
+        self.make_resumes(rows)
+        return reverse('core:resume_upload')
+
+    @query_budget(5)
+    def test_resume_edit(self, rows):
+        self.login_student()
+        resume = self.make_resumes(rows)[0]
+        return reverse('core:resume_edit', args=[resume.pk])
+
+    @query_budget(5)
+    def test_resume_delete(self, rows):
+        self.login_student()
+        resume = self.make_resumes(rows)[0]
+        return reverse('core:resume_delete', args=[resume.pk])
+
+    @query_budget(7)
+    def test_set_primary_resume(self, rows):
+        self.login_student()
+        resume = self.make_resumes(rows)[-1]
+        return lambda: self.client.post(reverse('core:set_primary_resume', args=[resume.pk]))
+
+    @query_budget(5)
+    def test_resume_download(self, rows):
+        self.login_student()
+        resume = self.make_resumes(rows)[0]
+        return reverse('core:resume_download', args=[resume.pk])
+
+    @query_budget(5)
+    def test_project_list(self, rows):
+        self.login_student()
+        self.make_projects(rows)
+        return reverse('core:project_list')
+
+    @query_budget(2)
+    def test_project_create(self, rows):
+        self.login_student()
+        self.make_projects(rows)
+        return reverse('core:project_create')
+
+    @query_budget(5)
+    def test_project_detail(self, rows):
+        self.login_student()
+        project = self.make_projects(1, images_per_project=rows)[0]
+        return reverse('core:project_detail', args=[project.pk])
+
+    @query_budget(7)
+    def test_project_update(self, rows):
+        self.login_student()
+        project = self.make_projects(1, images_per_project=rows)[0]
+        return reverse('core:project_update', args=[project.pk])
+
+    @query_budget(5)
+    def test_project_delete(self, rows):
+        self.login_student()
+        project = self.make_projects(1, images_per_project=rows)[0]
+        return reverse('core:project_delete', args=[project.pk])
+
+    @query_budget(11)
+    def test_project_image_delete(self, rows):
+        self.login_student()
+        project = self.make_projects(1, images_per_project=rows)[0]
+        image = project.images.first()
+        return lambda: self.client.post(reverse('core:project_image_delete', args=[image.pk]))
+
+    # Booking and sessions
+
+    @query_budget(5)
+    def test_mentor_list(self, rows):
+        self.login_student()
+        self.make_mentors(rows)
+        return reverse('core:sessions:mentor_list')
+
+    @query_budget(3)
+    def test_book_session(self, rows):
+        self.login_student()
+        self.make_sessions(rows)
+        return reverse('core:sessions:book_session', args=[self.mentor_user.pk])
+
+    @query_budget(4)
+    def test_book_session_post(self, rows):
+        self.login_student()
+        self.make_sessions(rows)
+        # The mentor is looked up once for the form and the new session
+        return lambda: self.client.post(
+            reverse('core:sessions:book_session', args=[self.mentor_user.pk]),
+            {'title': 'Mock interview', 'description': '', 'duration_minutes': 30,
+             'scheduled_time': (timezone.localtime() + datetime.timedelta(days=3)).strftime('%Y-%m-%dT%H:%M')},
+        )
+
+    @query_budget(4)
+    def test_session_detail(self, rows):
+        self.login_student()
+        session = self.make_sessions(rows)[0]
+        return reverse('core:sessions:session_detail', args=[session.pk])
+
+    @query_budget(5)
+    def test_update_session(self, rows):
+        self.login_student()
+        session = self.make_sessions(rows)[0]
+        return reverse('core:sessions:update_session', args=[session.pk])
+
+    @query_budget(6)
+    def test_cancel_session(self, rows):
+        self.login_student()
+        session = self.make_sessions(rows)[0]
+        return lambda: self.client.post(reverse('core:sessions:cancel_session', args=[session.pk]))
+
+    @query_budget(3)
+    def test_feedback_create(self, rows):
+        self.login_student()
+        completed = next(session for session in self.make_sessions(rows)
+                         if session.student_id == self.student.pk and session.status == 'completed')
+        return reverse('core:sessions:feedback_create', args=[completed.pk])
+
+    @query_budget(3)
+    def test_calendar_feed(self, rows):
+        self.make_sessions(rows)
+        # The user, the validators and the rows, not an earlier size's cached feed
+        cache.clear()
+        url = feed_url(self.mentor_user)
+
+        def get_feed():
+            response = self.client.get(url)
+            b''.join(response.streaming_content)
+            return response
+        return get_feed
+
+    # Mentor pages
+
+    @query_budget(12)
+    def test_mentor_dashboard(self, rows):
+        self.login_mentor()
+        self.make_sessions(rows)
+        return reverse('core:mentor_dashboard')
+
+    @query_budget(3)
+    def test_mentor_availability(self, rows):
+        self.login_mentor()
+        self.make_availability(rows)
+        return reverse('core:mentor_availability')
+
+    @query_budget(5)
+    def test_mentor_sessions(self, rows):
+        self.login_mentor()
+        self.make_sessions(rows)
+        return reverse('core:mentor_sessions')
+
+    @query_budget(5)
+    def test_mentor_session_requests(self, rows):
+        self.login_mentor()
+        self.make_sessions(rows)
+        return reverse('core:mentor_session_requests')
+
+    @query_budget(4)
+    def test_mentor_upcoming_sessions(self, rows):
+        self.login_mentor()
+        self.make_sessions(rows)
+        return reverse('core:mentor_upcoming_sessions')
+
+    @query_budget(5)
+    def test_mentor_completed_sessions(self, rows):
+        self.login_mentor()
+        self.make_sessions(rows)
+        return reverse('core:mentor_completed_sessions')
+
+    @query_budget(3)
+    def test_mentor_session_update(self, rows):
+        self.login_mentor()
+        session = self.make_sessions(rows)[0]
+        return reverse('core:mentor_session_update', args=[session.pk])
+
+    @query_budget(4)
+    def test_mentor_session_delete(self, rows):
+        self.login_mentor()
+        session = self.make_sessions(rows)[0]
+        return reverse('core:mentor_session_delete', args=[session.pk])
+
+    @query_budget(7)
+    def test_update_session_status(self, rows):
+        self.login_mentor()
+        session = self.make_sessions(rows)[0]
+        # Lock, conflict check and conditional UPDATE, inside a SAVEPOINT under TestCase
+        return lambda: self.client.post(
+            reverse('core:update_session_status', args=[session.pk]), {'action': 'accept'}
+        )
+
+    @query_budget(7)
+    def test_bulk_session_action(self, rows):
+        self.login_mentor()
+        requested = [session.pk for session in self.make_sessions(rows) if session.status == 'requested']
+        return lambda: self.client.post(
+            reverse('core:mentor_session_requests_bulk'), {'action': 'accept', 'sessions': requested}
+        )
+
+    # API
+
+    @query_budget(4)
+    def test_api_sessions(self, rows):
+        self.login_mentor()
+        self.make_sessions(rows)
+        return reverse('v1:session-list')
+
+    @query_budget(4)
+    def test_api_mentors(self, rows):
+        self.login_student()
+        self.make_mentors(rows)
+        return reverse('v1:mentor-list')
+
+    @query_budget(4)
+    def test_api_availability(self, rows):
+        self.login_student()
+        self.make_availability(rows)
+        return reverse('v1:availability-list')
+
+    @query_budget(4)
+    def test_api_projects(self, rows):
+        self.login_student()
+        self.make_projects(rows)
+        return reverse('v1:project-list')
+
+    @query_budget(4)
+    def test_api_resumes(self, rows):
+        self.login_student()
+        self.make_resumes(rows)
+        return reverse('v1:resume-list')
+
+
+class ApiTests(TestCase):
+    """Keyset pagination, sparse fieldsets and conditional GET on the v1 API."""
+
+    def setUp(self):
+        self.student = User.objects.create_user(username='student', password='pass12345')
+        self.mentor_user = User.objects.create_user(username='mentor', password='pass12345', is_mentor=True)
+        now = timezone.now()
+        # Pairs of sessions share a start time, so the id breaks the tie
+        Session.objects.bulk_create([
+            Session(student=self.student, mentor=self.mentor_user, title=f'Session {i}',
+                    scheduled_time=now + datetime.timedelta(hours=i // 2))
+            for i in range(25)
+        ])
+        self.client.force_login(self.student)
+
+    def test_cursor_walks_every_session_once_in_order(self):
+        url, seen = reverse('v1:session-list') + '?page_size=4&fields=id', []
+        while url:
+            page = self.client.get(url).json()
+            seen += [session['id'] for session in page['results']]
+            url = page['next']
+        expected = list(Session.objects.order_by('scheduled_time', 'id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_fields_narrow_the_select(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('v1:session-list'), {'fields': 'id,mentor'})
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'mentor'})
+        select = queries.captured_queries[-1]['sql']
+        self.assertNotIn('description', select)
+        self.assertIn('username', select)
+        response = self.client.get(reverse('v1:session-list'), {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_availability_mentor_must_be_an_id(self):
+        url = reverse('v1:availability-list')
+        self.assertEqual(self.client.get(url, {'mentor': self.mentor_user.pk}).status_code, 200)
+        for mentor in ('abc', '²'):
+            self.assertEqual(self.client.get(url, {'mentor': mentor}).status_code, 400)
+
+    def test_renaming_a_user_changes_the_etags_that_show_it(self):
+        for url in (reverse('v1:session-list'), reverse('v1:mentor-list'),
+                    reverse('v1:mentor-detail', args=[self.mentor_user.pk])):
+            etag = self.client.get(url)['ETag']
+            mentor = User.objects.get(pk=self.mentor_user.pk)
+            mentor.username = f'{mentor.username}-x'
+            mentor.save()
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(mentor.username, response.content.decode())
+
+    def test_unchanged_list_is_not_modified(self):
+        url = reverse('v1:session-list')
+        etag = self.client.get(url)['ETag']
+        self.assertTrue(etag.startswith('W/'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # Answered from the COUNT/MAX query; no rows are read
+        self.assertIn('COUNT', queries.captured_queries[-1]['sql'])
+        Session.objects.first().save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('v1:session-list')).status_code, 403)
+
+
+class ConditionalGetTests(TestCase):
+    """Pages answer a re-poll with 304 from the validator query alone."""
+
+    def setUp(self):
+        self.student = User.objects.create_user(username='student', password='pass12345')
+        self.client.force_login(self.student)
+        self.project = Project.objects.create(
+            student=self.student, title='Portfolio', description='Description', tech_stack='Python'
+        )
+        self.url = reverse('core:project_detail', args=[self.project.pk])
+        # The first page sets the CSRF cookie, which the validators cover
+        self.client.get(reverse('core:project_list'))
+
+    def test_unchanged_project_is_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        # The session, the user and the validators
+        self.assertEqual(len(queries), 3)
+
+    def test_new_image_changes_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        ProjectImage.objects.create(project=self.project, image='project_images/a.png')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_list_page_is_not_modified_until_a_row_changes(self):
+        url = reverse('core:project_list')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.project.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_mentor_directory_follows_the_mentors_name(self):
+        mentor = User.objects.create_user(username='mentor', password='pass12345', is_mentor=True)
+        url = reverse('core:sessions:mentor_list')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        mentor = User.objects.get(pk=mentor.pk)
+        mentor.first_name = 'Mia'
+        mentor.save()
+        self.assertContains(self.client.get(url, HTTP_IF_NONE_MATCH=etag), 'Mia')
+
+    def test_pending_messages_are_rendered(self):
+        etag = self.client.get(self.url)['ETag']
+        resume = Resume.objects.create(student=self.student, title='CV', file='resumes/cv.pdf')
+        # Leaves a success message for the next page
+        self.client.post(reverse('core:set_primary_resume', args=[resume.pk]))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_other_students_project_is_not_found(self):
+        other = User.objects.create_user(username='other', password='pass12345')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class ProjectCoverImageTests(TestCase):
+    """``Project.cover_image`` follows image uploads and deletions."""
+
+    def setUp(self):
+        self.student = User.objects.create_user(username='student', password='pass12345')
+        self.client.force_login(self.student)
+        self.project = Project.objects.create(
+            student=self.student, title='Portfolio', description='Description', tech_stack='Python'
+        )
+
+    def test_first_image_becomes_cover(self):
+        first = ProjectImage.objects.create(project=self.project, image='project_images/a.png')
+        ProjectImage.objects.create(project=self.project, image='project_images/b.png')
+        self.project.update_cover_image()
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.cover_image, first)
+
+    def test_deleting_cover_promotes_next_image(self):
+        first = ProjectImage.objects.create(project=self.project, image='project_images/a.png')
+        second = ProjectImage.objects.create(project=self.project, image='project_images/b.png')
+        self.project.update_cover_image()
+        self.client.post(reverse('core:project_image_delete', args=[first.pk]))
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.cover_image, second)
+
+        self.client.post(reverse('core:project_image_delete', args=[second.pk]))
+        self.project.refresh_from_db()
+        self.assertIsNone(self.project.cover_image)
+
+
+class AnonymousPageCacheTests(TestCase):
+    """Anonymous pages come from the cache with a per-visitor CSRF token."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_login_page_cached_with_fresh_csrf_token(self):
+        url = reverse('core:login')
+        first = Client(enforce_csrf_checks=True).get(url)
+        self.assertIsNotNone(cache.get(_page_cache_key(first.wsgi_request)))
+
+        visitor = Client(enforce_csrf_checks=True)
+        with self.assertNumQueries(0):
+            second = visitor.get(url)
+        self.assertNotIn(CSRF_PLACEHOLDER, second.content)
+        self.assertIn('Cookie', second['Vary'])
+
+        token = re.search(rb'name="csrfmiddlewaretoken" value="([^"]+)"', second.content).group(1)
+        response = visitor.post(url, {
+            'csrfmiddlewaretoken': token.decode(), 'username': 'nobody', 'password': 'wrong',
+        })
+        self.assertEqual(response.status_code, 200)
+
+    def test_tracking_parameters_share_an_entry(self):
+        self.client.get(reverse('core:home'))
+        response = self.client.get(reverse('core:home') + '?utm_source=newsletter')
+        self.assertEqual(_page_cache_key(response.wsgi_request), 'page:/')
+
+    def test_other_query_strings_are_not_cached(self):
+        for query in ('?a=1', '?a=2', '?next=/profile/&utm_source=newsletter'):
+            response = self.client.get(reverse('core:login') + query)
+            self.assertIsNone(_page_cache_key(response.wsgi_request))
+        self.assertIsNone(cache.get('page:/login/'))
+
+    def test_authenticated_requests_bypass_cache(self):
+        user = User.objects.create_user(username='student', password='pass12345')
+        self.client.force_login(user)
+        self.client.get(reverse('core:home'))
+        self.assertIsNone(cache.get('page:/'))
+
+    def test_mentor_save_invalidates_only_that_card(self):
+        mentor_user = User.objects.create_user(username='mentor', password='pass12345', is_mentor=True)
+        other_user = User.objects.create_user(username='other', password='pass12345', is_mentor=True)
+        before = mentor_card_versions([mentor_user.pk, other_user.pk])
+        Mentor.objects.get(user=mentor_user).save()
+        after = mentor_card_versions([mentor_user.pk, other_user.pk])
+        self.assertNotEqual(before[mentor_user.pk], after[mentor_user.pk])
+        self.assertEqual(before[other_user.pk], after[other_user.pk])
+
+
+class FormStyleTests(TestCase):
+    """Widget styling is applied once to ``base_fields`` at class creation."""
+
+    def test_styles_applied_without_touching_parent_form(self):
+        self.assertEqual(UserLoginForm.base_fields['username'].widget.attrs['class'], INPUT_CLASSES)
+        self.assertNotIn('class', AuthenticationForm.base_fields['username'].widget.attrs)
+
+    def test_widget_attrs_override_defaults(self):
+        attrs = UserUpdateForm().fields['profile_picture'].widget.attrs
+        self.assertEqual(attrs['accept'], 'image/*')
+        self.assertEqual(ResumeForm().fields['is_primary'].widget.attrs['class'], CHECKBOX_CLASSES)
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    """Only opted-in reads of core models outside transactions go to the replica."""
+
+    def test_reads_use_primary_by_default(self):
+        self.assertIsNone(ReplicaRouter().db_for_read(Session))
+
+    def test_opted_in_reads_use_replica(self):
+        with replica_reads():
+            self.assertEqual(ReplicaRouter().db_for_read(Session), 'replica')
+            self.assertIsNone(ReplicaRouter().db_for_read(DjangoSession))
+            self.assertEqual(ReplicaRouter().db_for_write(Session), 'default')
+
+
+@unittest.skipUnless('replica' in settings.DATABASES, 'no replica database configured')
+class ReplicaReadTests(TransactionTestCase):
+    """
+    Dashboards read from the replica until the user writes or the replica lags.
+
+    Runs when a ``replica`` alias is configured (DB_REPLICA_HOST); in tests it
+    mirrors the default database.
+    """
+    databases = '__all__'
+
+    def setUp(self):
+        _replica_health.clear()
+        self.student = User.objects.create_user(username='student', password='pass12345')
+        self.client.force_login(self.student)
+
+    def core_queries(self, alias):
+        with CaptureQueriesContext(connections[alias]) as queries:
+            self.client.get(reverse('core:student_dashboard'))
+        return [query['sql'] for query in queries if 'core_' in query['sql']]
+
+    def test_dashboard_reads_from_replica(self):
+        with CaptureQueriesContext(connections['default']) as primary:
+            replica = self.core_queries('replica')
+        self.assertTrue(replica)
+        self.assertFalse([query for query in primary if 'core_' in query['sql']])
+
+    def test_write_pins_user_to_primary(self):
+        response = self.client.post(reverse('core:project_create'), {})
+        self.assertIn(REPLICA_PIN_COOKIE, response.cookies)
+        self.assertFalse(self.core_queries('replica'))
+
+    def test_lagging_replica_is_skipped(self):
+        with mock.patch('core.routers.replica_lag', return_value=settings.REPLICA_MAX_LAG + 1):
+            self.assertFalse(self.core_queries('replica'))
+
+
+class AsyncDashboardTests(TransactionTestCase):
+    """The async dashboards build the same context as the sync ones."""
+
+    def setUp(self):
+        self.student = User.objects.create_user(username='student', password='pass12345')
+        self.mentor_user = User.objects.create_user(username='mentor', password='pass12345', is_mentor=True)
+        now = timezone.now()
+        Session.objects.bulk_create([
+            Session(student=self.student, mentor=self.mentor_user, title=f'Session {i}', status=status,
+                    scheduled_time=now + datetime.timedelta(days=i + 1))
+            for i, status in enumerate(['requested', 'accepted', 'accepted', 'completed'])
+        ])
+        Project.objects.create(student=self.student, title='Portfolio', description='Description', tech_stack='Python')
+
+    def sync_context(self, view_class, user):
+        request = RequestFactory().get('/')
+        request.user = user
+        view = view_class()
+        view.setup(request)
+        return view.get_context_data()
+
+    async def async_context(self, view_class, user):
+        return await view_class().get_context_data(user)
+
+    async def test_student_dashboard_matches_sync_view(self):
+        expected = await sync_to_async(self.sync_context)(views.StudentDashboardView, self.student)
+        context = await self.async_context(async_views.StudentDashboardView, self.student)
+        for key in ('mentors_count', 'projects_count', 'sessions_count', 'resumes_count',
+                    'upcoming_sessions_count', 'accepted_sessions_count'):
+            self.assertEqual(context[key], expected[key], key)
+        self.assertEqual(
+            [session.pk for session in context['upcoming_sessions']],
+            await sync_to_async(lambda: [session.pk for session in expected['upcoming_sessions']])(),
+        )
+
+    async def test_mentor_dashboard_matches_sync_view(self):
+        expected = await sync_to_async(self.sync_context)(views.MentorDashboardView, self.mentor_user)
+        context = await self.async_context(async_views.MentorDashboardView, self.mentor_user)
+        for key in ('pending_requests', 'total_students', 'completed_sessions'):
+            self.assertEqual(context[key], expected[key], key)
+        self.assertEqual(
+            [session.pk for session in context['recent_activity']],
+            await sync_to_async(lambda: [session.pk for session in expected['recent_activity']])(),
+        )
+
+    async def test_anonymous_user_redirected_to_login(self):
+        request = AsyncRequestFactory().get('/student/dashboard/')
+
+        async def auser():
+            return AnonymousUser()
+        request.auser = auser
+        response = await async_views.StudentDashboardView.as_view()(request)
+        self.assertEqual(response.status_code, 302)
+
+    async def test_request_limit_queues_requests_beyond_it(self):
+        running, peak = 0, 0
+
+        async def app(scope, receive, send):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        limited = async_views.RequestLimit(app, 2)
+        await asyncio.gather(*(limited({'type': 'http'}, None, None) for _ in range(5)))
+        self.assertEqual(peak, 2)
+
+
+class WaitForDbTests(TransactionTestCase):
+    """wait_for_db retries until a real query succeeds, within its deadline."""
+
+    def run_command(self, *args):
+        with mock.patch('core.management.commands.wait_for_db.time.sleep') as sleep:
+            call_command('wait_for_db', *args, stdout=io.StringIO())
+        return sleep
+
+    def test_retries_until_connection_succeeds(self):
+        failures = iter([OperationalError('refused'), OperationalError('refused')])
+        ensure_connection = connection.ensure_connection
+
+        def flaky_connect():
+            failure = next(failures, None)
+            if failure:
+                raise failure
+            ensure_connection()
+
+        with mock.patch.object(connection, 'ensure_connection', side_effect=flaky_connect):
+            sleep = self.run_command()
+        self.assertEqual(sleep.call_count, 2)
+        # Backoff doubles from 50 ms, with up to half of each delay randomised
+        first, second = (call.args[0] for call in sleep.call_args_list)
+        self.assertTrue(0.025 <= first <= 0.05 and 0.05 <= second <= 0.1)
+
+    def test_gives_up_at_deadline(self):
+        with mock.patch.object(connection, 'ensure_connection', side_effect=OperationalError('refused')):
+            with self.assertRaisesMessage(CommandError, 'Gave up waiting for database'):
+                self.run_command('--timeout', '0')
+
+    def test_waits_for_tables(self):
+        with self.assertRaisesMessage(CommandError, 'Gave up waiting for tables'):
+            self.run_command('--timeout', '0', '--table', 'core_missing')
+        self.run_command('--table', 'core_session', '--migrations')
+
+
+class AuditDbTests(TestCase):
+    """audit_db finds the core tables and runs every hot view it explains."""
+
+    def test_reports_tables_indexes_and_hot_views(self):
+        student = User.objects.create_user(username='student', password='pass12345')
+        mentor_user = User.objects.create_user(username='mentor', password='pass12345', is_mentor=True)
+        Session.objects.create(student=student, mentor=mentor_user, title='Session', status='requested',
+                               scheduled_time=timezone.now() + datetime.timedelta(days=1))
+        out = io.StringIO()
+        call_command('audit_db', stdout=out)
+        output = out.getvalue()
+        self.assertIn('core_session', output)
+        self.assertNotIn('missing', output)
+        self.assertIn('Every declared index exists', output)
+        self.assertNotIn('skipped', output)
+        self.assertIn('mentor dashboard (as mentor)', output)
+        self.assertIn('student dashboard (as student)', output)
+
+
+class OnlineMigrationTests(TransactionTestCase):
+    """Batched backfills resume from their checkpoint; index DDL asks MySQL not to lock."""
+
+    def setUp(self):
+        for i in range(5):
+            User.objects.create_user(username=f'mentor{i}', password='pass12345', is_mentor=True)
+        Mentor.objects.update(availability=False)
+
+    def test_backfill_resumes_after_interruption(self):
+        batches = []
+
+        def update(batch):
+            if len(batches) == 2:
+                raise RuntimeError('deploy interrupted')
+            batches.append(sorted(batch.values_list('pk', flat=True)))
+            batch.update(availability=True)
+
+        operation = BatchedRunPython('mentor', update, name='test_sync', batch_size=2, sleep=0)
+        operation.app_label = 'core'
+        schema_editor = mock.Mock(connection=connection)
+        with self.assertRaisesMessage(RuntimeError, 'deploy interrupted'):
+            operation.backfill(apps, schema_editor)
+        self.assertEqual(Mentor.objects.filter(availability=True).count(), 4)
+
+        batches.clear()
+        operation.update = lambda batch: batches.append(list(batch.values_list('pk', flat=True)))
+        operation.backfill(apps, schema_editor)
+        # Only the last, unfinished range runs again
+        self.assertEqual(len(batches), 1)
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {CHECKPOINT_TABLE}')
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_throttle_gives_up_when_replication_is_stopped(self):
+        operation = BatchedRunPython('mentor', None, name='test_lag', sleep=0, max_replica_lag=5, max_wait=3)
+        clock = iter(range(100))
+        with mock.patch('core.operations.REPLICA_DB', 'default'), \
+                mock.patch('core.operations.replica_lag', return_value=None), \
+                mock.patch('core.operations.time.monotonic', side_effect=lambda: next(clock)), \
+                mock.patch('core.operations.time.sleep'), \
+                self.assertLogs('core.operations', 'WARNING') as logs, \
+                self.assertRaisesMessage(RuntimeError, 'replica is not replicating after waiting 3s'):
+            operation.throttle()
+        self.assertEqual(len(logs.output), 2)
+
+    def test_index_operations_can_run_again(self):
+        # A re-run after an interrupted backfill repeats the index operations before it
+        operation = AddIndexOnline('session', models.Index(fields=['title'], name='session_rerun_test'))
+        from_state = MigrationLoader(connection).project_state()
+        to_state = from_state.clone()
+        operation.state_forwards('core', to_state)
+        for _ in range(2):
+            with connection.schema_editor() as schema_editor:
+                operation.database_forwards('core', schema_editor, from_state, to_state)
+        with connection.cursor() as cursor:
+            self.assertIn('session_rerun_test', connection.introspection.get_constraints(cursor, 'core_session'))
+        for _ in range(2):
+            with connection.schema_editor() as schema_editor:
+                operation.database_backwards('core', schema_editor, to_state, from_state)
+        with connection.cursor() as cursor:
+            self.assertNotIn('session_rerun_test', connection.introspection.get_constraints(cursor, 'core_session'))
+
+    def test_index_sql_is_online(self):
+        index = models.Index(fields=['mentor', '-scheduled_time'], name='session_test')
+        with connection.schema_editor(collect_sql=True) as schema_editor:
+            sql = add_index_sql(schema_editor, Session, index)
+        self.assertIn('ADD INDEX', sql)
+        self.assertIn('"scheduled_time" DESC', sql)
+        self.assertTrue(sql.endswith('ALGORITHM=INPLACE, LOCK=NONE'))
+
+
+class SessionArchiveTests(TestCase):
+    """Old terminal sessions move to SessionArchive and are only read when asked for."""
+
+    def setUp(self):
+        self.student = User.objects.create_user(username='student', password='pass12345')
+        self.mentor_user = User.objects.create_user(username='mentor', password='pass12345', is_mentor=True)
+        now = timezone.now()
+        self.old_completed, self.old_accepted, self.recent_completed = Session.objects.bulk_create([
+            Session(student=self.student, mentor=self.mentor_user, title=title, status=status,
+                    scheduled_time=now - datetime.timedelta(days=days))
+            for title, status, days in [
+                ('Old completed', 'completed', 800),
+                ('Old accepted', 'accepted', 800),
+                ('Recent completed', 'completed', 10),
+            ]
+        ])
+
+    def test_archives_only_old_terminal_sessions(self):
+        Session.objects.create(student=self.student, mentor=self.mentor_user, title='Old cancelled',
+                               status='cancelled', scheduled_time=timezone.now() - datetime.timedelta(days=400))
+        call_command('archive_sessions', '--batch-size', '1', '--sleep', '0', stdout=io.StringIO())
+        self.assertEqual(
+            sorted(SessionArchive.objects.values_list('title', flat=True)), ['Old cancelled', 'Old completed']
+        )
+        self.assertEqual(SessionArchive.objects.get(title='Old completed').pk, self.old_completed.pk)
+        self.assertEqual(
+            sorted(Session.objects.values_list('title', flat=True)), ['Old accepted', 'Recent completed']
+        )
+
+    def test_completed_sessions_include_archive_on_request(self):
+        call_command('archive_sessions', stdout=io.StringIO())
+        self.client.login(username='mentor', password='pass12345')
+        url = reverse('core:mentor_completed_sessions')
+        response = self.client.get(url)
+        self.assertEqual([session.title for session in response.context['sessions']], ['Recent completed'])
+        response = self.client.get(url, {'archived': '1'})
+        self.assertEqual(
+            [session.title for session in response.context['sessions']], ['Recent completed', 'Old completed']
+        )
+        self.assertContains(response, 'Archived')
+
+    def test_archived_completed_sessions_are_paginated(self):
+        call_command('archive_sessions', stdout=io.StringIO())
+        now = timezone.now()
+        SessionArchive.objects.bulk_create([
+            SessionArchive(id=10_000 + i, student=self.student, mentor=self.mentor_user, title=f'Archived {i}',
+                           status='completed', scheduled_time=now - datetime.timedelta(days=900 + i),
+                           created_at=now, updated_at=now)
+            for i in range(20)
+        ])
+        self.client.login(username='mentor', password='pass12345')
+        url = reverse('core:mentor_completed_sessions')
+        response = self.client.get(url, {'archived': '1', 'page': 2})
+        self.assertEqual(response.context['paginator'].count, 22)
+        self.assertEqual([session.title for session in response.context['sessions']],
+                         [f'Archived {i}' for i in range(8, 18)])
+        self.assertContains(response, '?archived=1&page=3')
+
+    def test_admin_archive_filter_opens_archive_changelist(self):
+        User.objects.create_superuser(username='admin', password='pass12345', email='admin@example.com')
+        self.client.login(username='admin', password='pass12345')
+        response = self.client.get(reverse('admin:core_session_changelist'), {'archived': '1', 'status': 'completed'})
+        self.assertRedirects(response, reverse('admin:core_sessionarchive_changelist') + '?status=completed')
+
+
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.db')
+class PurgeSessionsTests(TestCase):
+    """purge_sessions deletes only expired rows, in batches."""
+
+    def test_deletes_expired_sessions_in_batches(self):
+        now = timezone.now()
+        DjangoSession.objects.bulk_create(
+            [DjangoSession(session_key=f'expired{i}', session_data='', expire_date=now - datetime.timedelta(days=1))
+             for i in range(5)]
+            + [DjangoSession(session_key=f'active{i}', session_data='', expire_date=now + datetime.timedelta(days=1))
+               for i in range(2)]
+        )
+        out = io.StringIO()
+        with mock.patch('core.management.commands.purge_sessions.time.sleep') as sleep:
+            call_command('purge_sessions', '--batch-size', '2', stdout=out)
+        self.assertEqual(sleep.call_count, 3)
+        self.assertIn('Purged 5 expired sessions', out.getvalue())
+        self.assertEqual(sorted(DjangoSession.objects.values_list('pk', flat=True)), ['active0', 'active1'])
+
+
+class BulkSessionActionTests(TestCase):
+    """Bulk accept/reject/reschedule of session requests."""
+
+    def setUp(self):
+        self.student = User.objects.create_user(username='student', password='pass12345')
+        self.mentor_user = User.objects.create_user(username='mentor', password='pass12345', is_mentor=True)
+        self.client.force_login(self.mentor_user)
+        self.start = (timezone.now() + datetime.timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+        self.url = reverse('core:mentor_session_requests_bulk')
+
+    def make_session(self, offset_minutes, status='requested', duration=30, mentor=None):
+        return Session.objects.create(
+            student=self.student, mentor=mentor or self.mentor_user, title=f'At {offset_minutes}',
+            status=status, duration_minutes=duration,
+            scheduled_time=self.start + datetime.timedelta(minutes=offset_minutes),
+        )
+
+    def post(self, data):
+        return self.client.post(self.url, data, HTTP_ACCEPT='application/json').json()['results']
+
+    def test_find_conflicts_in_one_pass(self):
+        hour = lambda h: self.start + datetime.timedelta(hours=h)
+        fixed = [(hour(1), hour(2))]
+        candidates = [
+            (hour(0), hour(0.5), 'early'),
+            (hour(0.25), hour(0.75), 'overlaps early'),
+            (hour(0.75), hour(1.25), 'runs into fixed'),
+            (hour(1.5), hour(1.75), 'inside fixed'),
+            (hour(2), hour(3), 'after fixed'),
+        ]
+        self.assertEqual(
+            find_conflicts(fixed, candidates), {'overlaps early', 'runs into fixed', 'inside fixed'},
+        )
+
+    def test_accept_reports_each_session(self):
+        self.make_session(60, status='accepted')
+        free, clash, first, second = (self.make_session(0), self.make_session(45),
+                                      self.make_session(120), self.make_session(135))
+        other = self.make_session(300, mentor=User.objects.create_user(username='other', is_mentor=True))
+        results = self.post({'action': 'accept', 'sessions': [free.pk, clash.pk, first.pk, second.pk, other.pk]})
+        self.assertEqual(
+            [result['outcome'] for result in results],
+            ['accepted', 'conflict', 'accepted', 'conflict', 'not_pending'],
+        )
+        self.assertEqual(
+            set(Session.objects.filter(status='accepted').values_list('pk', flat=True)) - {free.pk, first.pk},
+            {Session.objects.get(scheduled_time=self.start + datetime.timedelta(minutes=60)).pk},
+        )
+        other.refresh_from_db()
+        self.assertEqual(other.status, 'requested')
+
+    def test_reject_skips_sessions_already_handled(self):
+        pending, accepted = self.make_session(0), self.make_session(60, status='accepted')
+        results = self.post({'action': 'reject', 'sessions': [pending.pk, accepted.pk]})
+        self.assertEqual([result['outcome'] for result in results], ['rejected', 'not_pending'])
+        accepted.refresh_from_db()
+        self.assertEqual(accepted.status, 'accepted')
+
+    def test_reschedule_moves_each_session_to_its_time(self):
+        first, second = self.make_session(0), self.make_session(30)
+        new_time = timezone.localtime(self.start + datetime.timedelta(days=1))
+        results = self.post({
+            'action': 'reschedule', 'sessions': [first.pk, second.pk],
+            f'time_{first.pk}': new_time.strftime('%Y-%m-%dT%H:%M'),
+        })
+        self.assertEqual([result['outcome'] for result in results], ['rescheduled', 'invalid'])
+        first.refresh_from_db()
+        self.assertEqual(first.scheduled_time, new_time)
+        self.assertEqual(first.status, 'requested')
+
+    def test_ids_that_are_not_numbers_are_ignored(self):
+        session = self.make_session(0)
+        results = self.post({'action': 'reject', 'sessions': ['²', 'x', session.pk]})
+        self.assertEqual([result['outcome'] for result in results], ['rejected'])
+        response = self.client.post(self.url, {'action': 'reject', 'sessions': ['²']}, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_html_form_redirects_with_messages(self):
+        session = self.make_session(0)
+        response = self.client.post(self.url, {'action': 'accept', 'sessions': [session.pk]}, follow=True)
+        self.assertRedirects(response, reverse('core:mentor_session_requests'))
+        self.assertContains(response, 'Accepted 1 session request(s).')
+
+
+class ExportTests(TestCase):
+    """Streaming CSV/JSON Lines exports from the admin and export_data."""
+
+    def setUp(self):
+        self.student = User.objects.create_user(username='student', password='pass12345')
+        self.mentor_user = User.objects.create_user(username='mentor', password='pass12345', is_mentor=True)
+        now = timezone.now()
+        Session.objects.bulk_create([
+            Session(student=self.student, mentor=self.mentor_user, title=f'Session {i}',
+                    status='completed' if i % 2 else 'requested', scheduled_time=now)
+            for i in range(5)
+        ])
+
+    def test_batches_are_one_joined_query_each(self):
+        with CaptureQueriesContext(connection) as queries:
+            batches = list(export_batches(Session.objects.all(), chunk_size=2))
+        self.assertEqual([len(rows) for rows in batches], [2, 2, 1])
+        self.assertEqual(len(queries), 3)
+        self.assertIn('JOIN', queries.captured_queries[0]['sql'])
+        self.assertEqual(batches[0][0][5], 'student')
+
+    def test_admin_action_streams_the_filtered_change_list(self):
+        admin_user = User.objects.create_superuser(username='admin', password='pass12345', email='a@example.com')
+        self.client.force_login(admin_user)
+        response = self.client.post(
+            reverse('admin:core_session_changelist') + '?status__exact=completed',
+            {'action': 'export_csv', 'select_across': '1', 'index': '0',
+             '_selected_action': list(Session.objects.values_list('pk', flat=True))},
+        )
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['id', 'title', 'status'])
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(all(',completed,' in line and ',mentor,' in line for line in lines[1:]))
+
+    def test_command_writes_json_lines(self):
+        out, err = io.StringIO(), io.StringIO()
+        call_command('export_data', 'sessions', '--format', 'jsonl', '--filter', 'status=requested',
+                     '--chunk-size', '2', stdout=out, stderr=err)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual({row['student'] for row in rows}, {'student'})
+        self.assertIn('Exported 3 sessions', err.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('export_data', 'sessions', '--filter', 'nonsense=1', stdout=out, stderr=err)
+
+
+class BulkImportUsersTests(TestCase):
+    """bulk_import_users validates each row and inserts a chunk with a fixed number of queries."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        User.objects.create_user(username='taken', password='pass12345')
+
+    def write_file(self, name, content):
+        path = f'{self.tmpdir}/{name}'
+        with open(path, 'w', newline='') as f:
+            f.write(content)
+        return path
+
+    def test_imports_users_mentors_and_availability(self):
+        path = self.write_file('users.csv', (
+            'username,email,password,is_mentor,title,availability\n'
+            'alice,alice@example.com,,false,,\n'
+            'bob,bob@example.com,,true,Engineer,Mon 09:00-10:00; Wed 18:00-19:30\n'
+            'carol,not-an-email,,false,,\n'
+            'taken,taken@example.com,,false,,\n'
+            'dave,dave@example.com,,true,,Tue 09:00-10:00; Tue 09:30-11:00\n'
+        ))
+        out, err = io.StringIO(), io.StringIO()
+        call_command('bulk_import_users', path, '--workers', '1', '--chunk-size', '2', stdout=out, stderr=err)
+        self.assertTrue(User.objects.filter(username='alice', is_student=True).exists())
+        bob = User.objects.get(username='bob')
+        self.assertFalse(bob.has_usable_password())
+        self.assertEqual(bob.mentor_profile.title, 'Engineer')
+        self.assertEqual(bob.mentor_profile.availability_slots.count(), 2)
+        self.assertFalse(User.objects.filter(username__in=['carol', 'dave']).exists())
+        self.assertIn('Line 4: email: Enter a valid email address.', err.getvalue())
+        self.assertIn('Line 5: username: A user with that username already exists.', err.getvalue())
+        self.assertIn('Line 6: availability:', err.getvalue())
+        self.assertIn('Imported 2 users', out.getvalue())
+        self.assertIn('3 rows rejected', out.getvalue())
+
+    def test_chunk_costs_the_same_queries_at_any_size(self):
+        counts = []
+        for size in (2, 20):
+            rows = [
+                (n, {'username': f'user{size}_{n}', 'email': '', 'first_name': '', 'last_name': '',
+                     'password': '', 'is_mentor': True, 'title': '', 'company': '', 'bio': '',
+                     'linkedin_url': '', 'availability': [(0, datetime.time(9), datetime.time(10))]})
+                for n in range(size)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                created, errors = import_chunk(rows)
+            self.assertEqual((created, errors), (size, []))
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_usernames_are_matched_case_insensitively(self):
+        User.objects.create_user(username='dave', password='pass12345')
+        row = {'email': '', 'first_name': '', 'last_name': '', 'password': '', 'is_mentor': False,
+               'title': '', 'company': '', 'bio': '', 'linkedin_url': '', 'availability': []}
+        created, errors = import_chunk([
+            (2, {**row, 'username': 'Frank'}), (3, {**row, 'username': 'frank'}), (4, {**row, 'username': 'dave'}),
+        ])
+        self.assertEqual(created, 1)
+        self.assertEqual(sorted(errors), [
+            (3, {'username': ['Appears earlier in this file.']}),
+            (4, {'username': ['A user with that username already exists.']}),
+        ])
+
+    def test_passwords_are_hashed_in_worker_processes(self):
+        path = self.write_file('users.jsonl', json.dumps({'username': 'erin', 'password': 'Correct-Horse-42'}) + '\n')
+        call_command('bulk_import_users', path, '--workers', '2', stdout=io.StringIO(), stderr=io.StringIO())
+        self.assertTrue(User.objects.get(username='erin').check_password('Correct-Horse-42'))
+
+
+class MentorProfileSignalTests(TestCase):
+    """The mentor profile follows is_mentor without costing other saves a query."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='sam', password='pass12345')
+
+    def test_last_login_update_is_a_single_query(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.last_login = timezone.now()
+        with CaptureQueriesContext(connection) as queries:
+            user.save(update_fields=['last_login'])
+        self.assertEqual(len(queries), 1)
+
+    def test_full_save_without_is_mentor_change_is_a_single_query(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Sam'
+        with CaptureQueriesContext(connection) as queries:
+            user.save()
+        self.assertEqual(len(queries), 1)
+
+    def test_profile_follows_is_mentor(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.is_mentor = True
+        user.save()
+        self.assertTrue(Mentor.objects.filter(user=user).exists())
+        user.is_mentor = False
+        user.save()
+        self.assertFalse(Mentor.objects.filter(user=user).exists())
+
+
+class CalendarFeedTests(TestCase):
+    """Tokenized .ics feeds of accepted sessions, cached and conditional."""
+
+    def setUp(self):
+        cache.clear()
+        self.student = User.objects.create_user(username='student', password='pass12345')
+        self.mentor_user = User.objects.create_user(username='mentor', password='pass12345', is_mentor=True)
+        start = timezone.now().replace(microsecond=0) + datetime.timedelta(days=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.session = Session.objects.create(
+                student=self.student, mentor=self.mentor_user, title='Mock interview, round 1',
+                status='accepted', scheduled_time=start, duration_minutes=45,
+            )
+            Session.objects.create(student=self.student, mentor=self.mentor_user, title='Pending',
+                                   scheduled_time=start)
+        self.url = feed_url(self.student)
+
+    def fetch(self, **headers):
+        response = self.client.get(self.url, **headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body.decode()
+
+    def test_feed_lists_accepted_sessions(self):
+        response, body = self.fetch()
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        self.assertEqual(body.count('BEGIN:VEVENT'), 1)
+        self.assertIn('SUMMARY:Mock interview\\, round 1\r\n', body)
+        end = self.session.scheduled_time + datetime.timedelta(minutes=45)
+        self.assertIn(f'DTEND:{end.astimezone(datetime.timezone.utc):%Y%m%dT%H%M%SZ}', body)
+        self.assertTrue(body.endswith('END:VCALENDAR\r\n'))
+
+    def test_bad_token_is_not_found(self):
+        self.assertEqual(self.client.get(self.url.replace('.ics', 'x.ics')).status_code, 404)
+
+    def test_polls_are_cached_and_not_modified(self):
+        response, body = self.fetch()
+        with CaptureQueriesContext(connection) as queries:
+            cached, cached_body = self.fetch()
+            not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached_body, body)
+        self.assertEqual(not_modified.status_code, 304)
+        # Only the user lookup for the token check, per poll
+        self.assertEqual(len(queries), 2)
+
+    def test_cancelling_an_older_session_is_not_answered_by_date(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Session.objects.create(student=self.student, mentor=self.mentor_user, title='Round 2',
+                                   status='accepted', scheduled_time=self.session.scheduled_time)
+        response, _ = self.fetch()
+        self.assertNotIn('Last-Modified', response)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.session.status = 'cancelled'
+            self.session.save()
+        since = http_date(time.time() + 60)
+        response, body = self.fetch(HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('round 1', body)
+
+    def test_session_changes_invalidate_the_cached_feed(self):
+        response, _ = self.fetch()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.session.title = 'Renamed'
+            self.session.save()
+        changed, body = self.fetch(HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertIn('SUMMARY:Renamed', body)
+
+    def test_long_lines_are_folded(self):
+        self.assertEqual(fold('A' * 80), 'A' * 75 + '\r\n ' + 'A' * 5 + '\r\n')
+        folded = fold('é' * 50)
+        self.assertTrue(all(len(line.encode()) <= 75 for line in folded.split('\r\n')))
+
+
+class WeeklyAvailabilityTests(TestCase):
+    """The availability bitmask: in-memory overlap checks, bulk saves and the directory filter."""
+
+    def setUp(self):
+        self.mentor_user = User.objects.create_user(username='mentor', password='pass12345', is_mentor=True)
+        self.mentor = self.mentor_user.mentor_profile
+        self.client.force_login(self.mentor_user)
+        self.url = reverse('core:mentor_availability')
+
+    def post(self, slots, existing=(), delete=()):
+        data = {
+            'profile-title': 'Engineer', 'profile-is_available': 'on',
+            'availability-TOTAL_FORMS': len(existing) + len(slots),
+            'availability-INITIAL_FORMS': len(existing), 'availability-MIN_NUM_FORMS': 1,
+            'availability-MAX_NUM_FORMS': 1000,
+        }
+        for i, (pk, day, start, end) in enumerate(
+            [(slot.pk, slot.day_of_week, f'{slot.start_time:%H:%M}', f'{slot.end_time:%H:%M}') for slot in existing]
+            + [(None, *slot) for slot in slots]
+        ):
+            data.update({
+                f'availability-{i}-id': pk or '', f'availability-{i}-mentor': self.mentor.pk,
+                f'availability-{i}-day_of_week': day, f'availability-{i}-start_time': start,
+                f'availability-{i}-end_time': end, f'availability-{i}-is_recurring': 'on',
+            })
+            if pk in delete:
+                data[f'availability-{i}-DELETE'] = 'on'
+        return self.client.post(self.url, data)
+
+    def test_encoding(self):
+        self.assertEqual(encode(slot_mask(0, datetime.time(0), datetime.time(1))), 'f' + '0' * 167)
+        # Tuesday 18:00-18:30 is the first two quarters of hour 24 + 18
+        encoded = encode(slot_mask(1, datetime.time(18), datetime.time(18, 30)))
+        self.assertEqual(encoded[42], 'c')
+        self.assertTrue(is_free(encoded, 1, datetime.time(18, 15)))
+        self.assertFalse(is_free(encoded, 1, datetime.time(18, 30)))
+
+    def test_overlaps_within_one_submission_are_rejected(self):
+        response = self.post([(0, '09:00', '10:00'), (0, '09:45', '11:00')])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Monday 09:45-11:00 overlaps', str(response.context['formset'].non_form_errors()))
+        self.assertFalse(Availability.objects.exists())
+
+    def test_saves_changes_in_bulk_and_updates_the_mask(self):
+        existing = Availability.objects.bulk_create([
+            Availability(mentor=self.mentor, day_of_week=day, start_time=datetime.time(9),
+                         end_time=datetime.time(10))
+            for day in range(5)
+        ])
+        existing[0].start_time = datetime.time(8)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post([(1, '18:00', '19:00'), (2, '18:00', '19:00')], existing, delete={existing[4].pk})
+        self.assertRedirects(response, self.url, fetch_redirect_response=False)
+        writes = [q['sql'] for q in queries if q['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))]
+        # One delete, one insert for the new slots, one update for the changed one, one for the
+        # profile, and a delete and insert replacing the upcoming slots
+        self.assertEqual(len(writes), 6)
+        self.mentor.refresh_from_db()
+        self.assertTrue(is_free(self.mentor.weekly_availability, 0, datetime.time(8)))
+        self.assertTrue(is_free(self.mentor.weekly_availability, 1, datetime.time(18, 45)))
+        self.assertFalse(is_free(self.mentor.weekly_availability, 3, datetime.time(18)))
+        self.assertFalse(is_free(self.mentor.weekly_availability, 4, datetime.time(9)))
+        self.assertEqual(Availability.objects.count(), 6)
+
+    def test_directory_filters_mentors_free_at_a_time(self):
+        self.post([(1, '18:00', '19:00')])
+        other = User.objects.create_user(username='other', password='pass12345', is_mentor=True)
+        Mentor.objects.filter(pk=other.pk).update(
+            weekly_availability=encode(slot_mask(1, datetime.time(9), datetime.time(17))),
+        )
+        student = User.objects.create_user(username='student', password='pass12345')
+        self.client.force_login(student)
+        url = reverse('core:sessions:mentor_list')
+        response = self.client.get(url, {'day': 1, 'time': '18:15'})
+        self.assertEqual([mentor.pk for mentor in response.context['mentors']], [self.mentor_user.pk])
+        self.assertEqual(response.context['filter_query'], 'day=1&time=18%3A15&')
+        response = self.client.get(url, {'day': 1, 'time': '19:00'})
+        self.assertEqual(list(response.context['mentors']), [])
+        self.assertEqual(len(self.client.get(url).context['mentors']), 2)
+
+
+@override_settings(AVAILABILITY_SLOT_WEEKS=2)
+class AvailabilitySlotTests(TestCase):
+    """Materialized upcoming slots: expansion, per-mentor regeneration and the nightly roll-forward."""
+
+    def setUp(self):
+        self.tz = timezone.get_default_timezone()
+        # A Monday, at noon
+        self.now = datetime.datetime(2026, 10, 19, 12, tzinfo=self.tz)
+        self.mentor_user = User.objects.create_user(username='mentor', password='pass12345', is_mentor=True)
+        self.mentor = self.mentor_user.mentor_profile
+
+    def at(self, day, hour):
+        return datetime.datetime(2026, 10, day, hour, tzinfo=self.tz)
+
+    def add_rule(self, day, start, end, is_recurring=True):
+        rule = Availability.objects.create(mentor=self.mentor, day_of_week=day, start_time=datetime.time(start),
+                                           end_time=datetime.time(end), is_recurring=is_recurring)
+        Availability.objects.filter(pk=rule.pk).update(updated_at=self.now - datetime.timedelta(days=1))
+
+    def slots(self):
+        return list(AvailabilitySlot.objects.values_list('start_time', flat=True))
+
+    def test_recurring_rules_expand_to_each_week_in_range(self):
+        self.add_rule(0, 9, 10)
+        self.add_rule(0, 11, 13)
+        regenerate_slots([self.mentor.pk], now=self.now)
+        # This morning's 9:00 is over; the 11:00 slot is still going. Two weeks
+        # on, the range ends at noon, after the 9:00 slot starts
+        self.assertEqual(self.slots(), [
+            self.at(19, 11), self.at(26, 9), self.at(26, 11), datetime.datetime(2026, 11, 2, 9, tzinfo=self.tz),
+            datetime.datetime(2026, 11, 2, 11, tzinfo=self.tz),
+        ])
+
+    def test_one_off_rules_happen_once(self):
+        self.add_rule(2, 9, 10, is_recurring=False)
+        regenerate_slots([self.mentor.pk], now=self.now)
+        self.assertEqual(self.slots(), [self.at(21, 9)])
+        roll_forward(now=self.now + datetime.timedelta(days=7))
+        self.assertEqual(self.slots(), [])
+
+    def test_roll_forward_drops_past_slots_and_adds_new_ones(self):
+        self.add_rule(1, 18, 19)
+        regenerate_slots([self.mentor.pk], now=self.now)
+        self.assertEqual(self.slots(), [self.at(20, 18), self.at(27, 18)])
+        later = self.now + datetime.timedelta(days=2)
+        self.assertEqual(roll_forward(now=later), (1, 1))
+        self.assertEqual(self.slots(), [self.at(27, 18), datetime.datetime(2026, 11, 3, 18, tzinfo=self.tz)])
+        # Running again changes nothing
+        self.assertEqual(roll_forward(now=later), (0, 1))
+        self.assertEqual(len(self.slots()), 2)
+
+    def test_saving_availability_regenerates_the_mentors_slots(self):
+        self.client.force_login(self.mentor_user)
+        tomorrow = timezone.localtime() + datetime.timedelta(days=1)
+        self.client.post(reverse('core:mentor_availability'), {
+            'profile-title': 'Engineer', 'profile-is_available': 'on',
+            'availability-TOTAL_FORMS': 1, 'availability-INITIAL_FORMS': 0,
+            'availability-MIN_NUM_FORMS': 1, 'availability-MAX_NUM_FORMS': 1000,
+            'availability-0-day_of_week': tomorrow.weekday(), 'availability-0-start_time': '10:00',
+            'availability-0-end_time': '11:00', 'availability-0-is_recurring': 'on',
+        })
+        self.assertEqual(AvailabilitySlot.objects.filter(mentor=self.mentor).count(), 2)
+
+        student = User.objects.create_user(username='student', password='pass12345')
+        User.objects.create_user(username='busy', password='pass12345', is_mentor=True)
+        self.client.force_login(student)
+        response = self.client.get(reverse('core:sessions:mentor_list'), {'soon': 'on'})
+        self.assertEqual([mentor.pk for mentor in response.context['mentors']], [self.mentor_user.pk])
+
+    def test_free_soon_directory_is_revalidated_each_hour(self):
+        student = User.objects.create_user(username='student', password='pass12345')
+        self.client.force_login(student)
+        url = reverse('core:sessions:mentor_list')
+        # The first page sets the CSRF cookie, which the validators cover
+        self.client.get(url)
+        first = self.client.get(url, {'soon': 'on'})
+        self.assertEqual(self.client.get(url, {'soon': 'on'}, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now() + datetime.timedelta(hours=1)):
+            later = self.client.get(url, {'soon': 'on'}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(later.status_code, 200)
+
+    def test_duplicate_rules_expand_to_one_slot(self):
+        # Saved before overlapping rules were rejected
+        self.add_rule(0, 9, 10)
+        self.add_rule(0, 9, 10)
+        regenerate_slots([self.mentor.pk], now=self.now)
+        self.assertEqual(len(self.slots()), 2)
+
+    def test_roll_forward_walks_rules_in_batches(self):
+        for day in range(3):
+            self.add_rule(day, 18, 19)
+        self.assertEqual(roll_forward(now=self.now, batch_size=2), (0, 3))
+        self.assertEqual(len(self.slots()), 6)
+
+    def test_roll_availability_slots_command(self):
+        self.add_rule(1, 18, 19)
+        out = io.StringIO()
+        call_command('roll_availability_slots', stdout=out)
+        self.assertIn('expanded 1 availability rules 2 weeks ahead', out.getvalue())
+        self.assertEqual(len(self.slots()), 2)
+
+
+class MentorRatingTests(TestCase):
+    """Session ratings and the running aggregates on Mentor."""
+
+    def setUp(self):
+        self.student = User.objects.create_user(username='student', password='pass12345')
+        self.mentor_user = User.objects.create_user(username='mentor', password='pass12345', is_mentor=True)
+        self.session = Session.objects.create(
+            student=self.student, mentor=self.mentor_user, title='Mock interview', status='completed',
+            scheduled_time=timezone.now() - datetime.timedelta(days=1),
+        )
+
+    def rate(self, rating, mentor=None):
+        return Feedback.objects.create(mentor=mentor or self.mentor_user, student=self.student,
+                                       rating=rating, content='Thanks')
+
+    def assertTotals(self, count, total, user=None):
+        mentor = Mentor.objects.get(pk=(user or self.mentor_user).pk)
+        self.assertEqual((mentor.rating_count, mentor.rating_sum), (count, total))
+        self.assertAlmostEqual(mentor.rating_average, Mentor.bayesian_average(count, total))
+
+    def test_totals_follow_create_edit_and_delete(self):
+        first = self.rate(5)
+        self.rate(3)
+        self.rate(None)
+        self.assertTotals(2, 8)
+        first = Feedback.objects.get(pk=first.pk)
+        first.rating = 1
+        first.save()
+        self.assertTotals(2, 4)
+        other = User.objects.create_user(username='other', password='pass12345', is_mentor=True)
+        first.mentor = other
+        first.save()
+        self.assertTotals(1, 3)
+        self.assertTotals(1, 1, other)
+        Feedback.objects.get(pk=first.pk).delete()
+        self.assertTotals(0, 0, other)
+
+    def test_a_single_rating_is_pulled_towards_the_prior(self):
+        self.rate(5)
+        self.assertAlmostEqual(Mentor.objects.get(pk=self.mentor_user.pk).rating_average, (5 * 3.5 + 5) / 6)
+
+    def test_rebuild_repairs_drift(self):
+        self.rate(4)
+        self.rate(2)
+        stale = timezone.now() - datetime.timedelta(days=1)
+        Mentor.objects.update(rating_count=7, rating_sum=1, rating_average=0, updated_at=stale)
+        out = io.StringIO()
+        call_command('rebuild_mentor_ratings', stdout=out)
+        self.assertIn('repaired 1', out.getvalue())
+        self.assertTotals(2, 6)
+        self.assertGreater(Mentor.objects.get(pk=self.mentor_user.pk).updated_at, stale)
+        out = io.StringIO()
+        call_command('rebuild_mentor_ratings', stdout=out)
+        self.assertIn('repaired 0', out.getvalue())
+
+    def test_student_rates_a_completed_session(self):
+        self.client.force_login(self.student)
+        url = reverse('core:sessions:feedback_create', args=[self.session.pk])
+        self.assertContains(self.client.get(url), '5 stars')
+        response = self.client.post(url, {'rating': 4, 'content': 'Very helpful'})
+        self.assertRedirects(response, reverse('core:sessions:session_detail', args=[self.session.pk]),
+                             fetch_redirect_response=False)
+        self.client.post(url, {'rating': 2, 'content': 'On reflection'})
+        feedback = Feedback.objects.get()
+        self.assertEqual((feedback.session, feedback.rating, feedback.mentor), (self.session, 2, self.mentor_user))
+        self.assertTotals(1, 2)
+        page = self.client.get(reverse('core:sessions:session_detail', args=[self.session.pk]))
+        self.assertContains(page, 'You rated this session 2 out of 5.')
+
+        # Only the session's student, and only once it's completed
+        self.client.force_login(self.mentor_user)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        Session.objects.filter(pk=self.session.pk).update(status='accepted')
+        self.client.force_login(self.student)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_ratings_outlive_archived_sessions(self):
+        Feedback.objects.create(mentor=self.mentor_user, student=self.student, session=self.session,
+                                rating=5, content='Great')
+        list(archive_sessions(before=timezone.now()))
+        feedback = Feedback.objects.get()
+        self.assertIsNone(feedback.session)
+        self.assertTotals(1, 5)
+
+    def test_directory_sorts_by_rating(self):
+        other = User.objects.create_user(username='other', password='pass12345', is_mentor=True)
+        self.rate(2)
+        self.rate(5, mentor=other)
+        self.client.force_login(self.student)
+        response = self.client.get(reverse('core:sessions:mentor_list'), {'sort': 'rating'})
+        self.assertEqual([mentor.pk for mentor in response.context['mentors']], [other.pk, self.mentor_user.pk])
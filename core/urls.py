@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.urls import path, include
 from django.contrib.auth import views as auth_views
-from . import views
+from . import async_views, views
+from .cache import cache_anonymous_page
 from .resume_views import (ResumeListView, ResumeCreateView, 
                           ResumeUpdateView, ResumeDeleteView, 
                           SetPrimaryResumeView, ResumeDownloadView)
@@ -8,23 +10,26 @@ from .project_views import (ProjectListView, ProjectCreateView,
                            ProjectUpdateView, ProjectDeleteView, 
                            ProjectDetailView, ProjectImageDeleteView)
 from . import session_urls
-from .mentor_views import (MentorSessionRequestsView, UpdateSessionStatusView, 
+from .mentor_views import (MentorSessionRequestsView, UpdateSessionStatusView, BulkSessionActionView,
                          MentorUpcomingSessionsView, MentorCompletedSessionsView,
                          MentorAvailabilityView, MentorSessionsView, SessionUpdateView, SessionDeleteView)
 
 app_name = 'core'
 
+# Under ASGI the dashboards run their queries concurrently; WSGI keeps the sync views
+dashboards = async_views if settings.ASYNC_VIEWS else views
+
 urlpatterns = [
     # Home
-    path('', views.HomeView.as_view(), name='home'),
+    path('', cache_anonymous_page(views.HomeView.as_view()), name='home'),
     
     # Authentication
-    path('register/', views.RegisterView.as_view(), name='register'),
-    path('login/', auth_views.LoginView.as_view(
+    path('register/', cache_anonymous_page(views.RegisterView.as_view()), name='register'),
+    path('login/', cache_anonymous_page(auth_views.LoginView.as_view(
         template_name='registration/login.html',
         authentication_form=views.UserLoginForm,
         redirect_authenticated_user=True
-    ), name='login'),
+    )), name='login'),
     path('logout/', auth_views.LogoutView.as_view(
         template_name='registration/logged_out.html',
         next_page='core:login'
@@ -55,17 +60,18 @@ urlpatterns = [
     path('mentor/availability/', MentorAvailabilityView.as_view(), name='mentor_availability'),
     
     # Dashboards
-    path('student/dashboard/', views.StudentDashboardView.as_view(), name='student_dashboard'),
+    path('student/dashboard/', dashboards.StudentDashboardView.as_view(), name='student_dashboard'),
     
     # Mentor session management
     path('mentor/sessions/', MentorSessionsView.as_view(), name='mentor_sessions'),
     path('mentor/sessions/requests/', MentorSessionRequestsView.as_view(), name='mentor_session_requests'),
+    path('mentor/sessions/requests/bulk/', BulkSessionActionView.as_view(), name='mentor_session_requests_bulk'),
     path('mentor/sessions/upcoming/', MentorUpcomingSessionsView.as_view(), name='mentor_upcoming_sessions'),
     path('mentor/sessions/completed/', MentorCompletedSessionsView.as_view(), name='mentor_completed_sessions'),
     path('mentor/sessions/<int:pk>/', SessionUpdateView.as_view(), name='mentor_session_update'),
     path('mentor/sessions/<int:pk>/delete/', SessionDeleteView.as_view(), name='mentor_session_delete'),
     path('sessions/<int:pk>/update-status/', UpdateSessionStatusView.as_view(), name='update_session_status'),
-    path('mentor/dashboard/', views.MentorDashboardView.as_view(), name='mentor_dashboard'),
+    path('mentor/dashboard/', dashboards.MentorDashboardView.as_view(), name='mentor_dashboard'),
     
     # Resume Management
     path('resumes/', ResumeListView.as_view(), name='resume_list'),
@@ -0,0 +1,196 @@
+"""
+Bulk import of users, mentor profiles and weekly availability.
+
+Rows are read from CSV or JSON Lines one at a time and validated in memory
+with ``UserImportForm``. Each chunk of valid rows then costs a fixed handful
+of queries however large it is: one to find usernames that are already
+taken, one ``bulk_create`` each for users, mentor profiles and availability,
+and one to read back the new user ids (MySQL doesn't return them from a bulk
+insert), plus three to materialize the new mentors' upcoming slots
+(core.slots). Password hashing, the slow part, runs in a process pool.
+
+``bulk_create`` sends no ``post_save``, so the per-user signal that creates
+mentor profiles doesn't fire; the profiles are created here, a chunk at a
+time, instead.
+"""
+import csv
+import datetime
+import json
+
+from django import forms
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import validate_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .availability import encode, first_overlap, is_on_quarter, week_mask
+from .models import Availability, Mentor, User
+from .slots import regenerate_slots
+
+DAY_NAMES = {name[:3].lower(): day for day, name in Availability.DAYS_OF_WEEK}
+
+
+def parse_availability(value):
+    """
+    Parse ``"Mon 09:00-10:00; Wed 18:00-19:30"`` (or the JSON list
+    ``[{"day_of_week": 0, "start_time": "09:00", "end_time": "10:00"}]``)
+    into sorted ``(day_of_week, start_time, end_time)`` tuples.
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        slots = []
+        for part in filter(None, (part.strip() for part in value.split(';'))):
+            day, _, times = part.partition(' ')
+            start, _, end = times.strip().partition('-')
+            slots.append({'day_of_week': day, 'start_time': start, 'end_time': end})
+    else:
+        slots = value
+
+    parsed = []
+    for slot in slots:
+        try:
+            day = str(slot['day_of_week']).strip().lower()
+            day = int(day) if day.isdigit() else DAY_NAMES[day[:3]]
+            start = datetime.time.fromisoformat(str(slot['start_time']).strip())
+            end = datetime.time.fromisoformat(str(slot['end_time']).strip())
+        except (KeyError, TypeError, ValueError):
+            raise ValidationError(f'Could not read the availability slot {slot!r}.')
+        if day not in dict(Availability.DAYS_OF_WEEK):
+            raise ValidationError(f'{day} is not a day of the week (0-6).')
+        if start >= end:
+            raise ValidationError('End time must be after start time')
+        if not (is_on_quarter(start) and is_on_quarter(end)):
+            raise ValidationError('Times must be on the quarter hour (:00, :15, :30 or :45)')
+        parsed.append((day, start, end))
+
+    if first_overlap(parsed):
+        raise ValidationError('This time slot overlaps with an existing availability slot')
+    return sorted(parsed)
+
+
+class UserImportForm(forms.Form):
+    """One imported row. Validation only; nothing here touches the database."""
+    username = forms.CharField(max_length=150, validators=[UnicodeUsernameValidator()])
+    email = forms.EmailField(required=False)
+    first_name = forms.CharField(max_length=150, required=False)
+    last_name = forms.CharField(max_length=150, required=False)
+    password = forms.CharField(required=False, strip=False)
+    is_mentor = forms.BooleanField(required=False)
+    title = forms.CharField(max_length=100, required=False)
+    company = forms.CharField(max_length=100, required=False)
+    bio = forms.CharField(max_length=1000, required=False)
+    linkedin_url = forms.URLField(required=False)
+    availability = forms.Field(required=False)
+
+    def clean_availability(self):
+        return parse_availability(self.cleaned_data['availability'])
+
+    def clean(self):
+        cleaned_data = super().clean()
+        password = cleaned_data.get('password')
+        if password:
+            user = User(username=cleaned_data.get('username', ''), email=cleaned_data.get('email', ''),
+                        first_name=cleaned_data.get('first_name', ''), last_name=cleaned_data.get('last_name', ''))
+            try:
+                validate_password(password, user)
+            except ValidationError as e:
+                self.add_error('password', e)
+        if cleaned_data.get('availability') and not cleaned_data.get('is_mentor'):
+            self.add_error('availability', 'Only mentors have availability.')
+        return cleaned_data
+
+
+def read_rows(stream, format):
+    """Yield ``(line_number, row dict)`` from a CSV or JSON Lines stream without reading it all."""
+    if format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, {'__error__': f'Invalid JSON: {e}'}
+            continue
+        yield line_number, row if isinstance(row, dict) else {'__error__': 'Each line must be a JSON object.'}
+
+
+def validate_rows(rows):
+    """Yield ``(line_number, cleaned_data, errors)``; exactly one of the last two is None."""
+    for line_number, row in rows:
+        if '__error__' in row:
+            yield line_number, None, {'__all__': [row['__error__']]}
+            continue
+        form = UserImportForm(row)
+        if form.is_valid():
+            yield line_number, form.cleaned_data, None
+        else:
+            yield line_number, None, {field: list(errors) for field, errors in form.errors.items()}
+
+
+def import_chunk(rows, hash_passwords=None):
+    """
+    Create the users, mentor profiles and availability for ``rows``, a list of
+    ``(line_number, cleaned_data)``, in one transaction.
+
+    Returns ``(created, errors)``: the number of users created and a list of
+    ``(line_number, {field: [messages]})`` for rows that couldn't be.
+    """
+    hash_passwords = hash_passwords or (lambda passwords: [make_password(p) for p in passwords])
+    # Keyed case-insensitively: MySQL's default collation treats "alice" and
+    # "Alice" as the same username, and returns the stored spelling
+    errors, unique = [], {}
+    for line_number, data in rows:
+        key = data['username'].casefold()
+        if key in unique:
+            errors.append((line_number, {'username': ['Appears earlier in this file.']}))
+        else:
+            unique[key] = (line_number, data)
+    usernames = [data['username'] for _, data in unique.values()]
+    taken = {username.casefold() for username in User.objects.filter(username__in=usernames)
+             .values_list('username', flat=True)}
+    for key in taken & unique.keys():
+        line_number, _ = unique.pop(key)
+        errors.append((line_number, {'username': ['A user with that username already exists.']}))
+    if not unique:
+        return 0, errors
+
+    rows = list(unique.values())
+    # Blank passwords become unusable ones; the user sets one with a password reset
+    passwords = hash_passwords([data['password'] or None for _, data in rows])
+    with transaction.atomic():
+        User.objects.bulk_create([
+            User(
+                username=data['username'], email=data['email'], first_name=data['first_name'],
+                last_name=data['last_name'], password=password, is_mentor=data['is_mentor'],
+                is_student=not data['is_mentor'],
+            )
+            for (_, data), password in zip(rows, passwords)
+        ])
+        mentors = [data for _, data in rows if data['is_mentor']]
+        if mentors:
+            ids = {
+                username.casefold(): pk
+                for username, pk in User.objects.filter(username__in=[data['username'] for data in mentors])
+                .values_list('username', 'pk')
+            }
+            Mentor.objects.bulk_create([
+                Mentor(
+                    user_id=ids[data['username'].casefold()], title=data['title'], company=data['company'],
+                    bio=data['bio'], linkedin_url=data['linkedin_url'] or None,
+                    weekly_availability=encode(week_mask(data['availability'])),
+                )
+                for data in mentors
+            ])
+            Availability.objects.bulk_create([
+                Availability(mentor_id=ids[data['username'].casefold()], day_of_week=day, start_time=start, end_time=end)
+                for data in mentors
+                for day, start, end in data['availability']
+            ])
+            regenerate_slots([ids[data['username'].casefold()] for data in mentors if data['availability']])
+    return len(rows), errors
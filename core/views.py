@@ -47,6 +47,8 @@ from .forms import (
     MentorProfileForm
 )
 from .session_forms import SessionBookingForm
+from .ical import feed_url
+from .mixins import ReplicaReadMixin
 
 # Authentication Views
 class RegisterView(CreateView):
@@ -112,6 +114,7 @@ class ProfileView(LoginRequiredMixin, UpdateView):
         context = super().get_context_data(**kwargs)
         if hasattr(self.request.user, 'mentor') and self.request.user.mentor:
             context['mentor_form'] = MentorProfileForm(instance=self.request.user.mentor)
+        context['calendar_feed_url'] = self.request.build_absolute_uri(feed_url(self.request.user))
         return context
     
     def post(self, request, *args, **kwargs):
@@ -151,7 +154,7 @@ class HomeView(TemplateView):
                 context['dashboard_url'] = reverse_lazy('core:student_dashboard')
         return context
 
-class StudentDashboardView(LoginRequiredMixin, TemplateView):
+class StudentDashboardView(ReplicaReadMixin, LoginRequiredMixin, TemplateView):
     template_name = 'student/dashboard.html'
     
     def get_context_data(self, **kwargs):
@@ -208,7 +211,7 @@ class StudentDashboardView(LoginRequiredMixin, TemplateView):
         
         return context
 
-class MentorDashboardView(LoginRequiredMixin, TemplateView):
+class MentorDashboardView(ReplicaReadMixin, LoginRequiredMixin, TemplateView):
     template_name = 'mentor/dashboard.html'
     
     def get_context_data(self, **kwargs):
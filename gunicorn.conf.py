@@ -0,0 +1,96 @@
+"""
+Gunicorn configuration, picked up automatically from the working directory.
+
+Concurrency is sized from the CPUs the container may actually use (its
+cgroup quota), not the host's core count:
+
+    GUNICORN_WORKER_MODE=gthread   careerlift.wsgi, (2 x CPUs + 1) workers x GUNICORN_THREADS
+    GUNICORN_WORKER_MODE=uvicorn   careerlift.asgi, one worker per CPU
+
+GUNICORN_WORKERS, GUNICORN_THREADS, GUNICORN_TIMEOUT and GUNICORN_MAX_REQUESTS
+override the computed values.
+"""
+import math
+import os
+
+WORKER_MODES = {
+    'gthread': ('careerlift.wsgi:application', 'gthread'),
+    'uvicorn': ('careerlift.asgi:application', 'uvicorn_worker.UvicornWorker'),
+}
+
+
+def cpu_limit():
+    """CPUs available to this container: the cgroup quota, capped by the CPU affinity mask."""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+    quota = period = None
+    try:
+        # cgroup v2: "<quota> <period>", or "max <period>" when unlimited
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            value, period = f.read().split()
+        quota = None if value == 'max' else int(value)
+        period = int(period)
+    except (OSError, ValueError):
+        try:
+            # cgroup v1: quota is -1 when unlimited
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+                quota = int(f.read())
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+                period = int(f.read())
+        except (OSError, ValueError):
+            pass
+    if quota and quota > 0 and period:
+        cpus = min(cpus, math.ceil(quota / period))
+    return max(cpus, 1)
+
+
+worker_mode = os.getenv('GUNICORN_WORKER_MODE', 'gthread')
+if worker_mode not in WORKER_MODES:
+    raise RuntimeError(f'GUNICORN_WORKER_MODE must be one of {", ".join(WORKER_MODES)}, not {worker_mode!r}')
+wsgi_app, worker_class = WORKER_MODES[worker_mode]
+
+cpus = cpu_limit()
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+if worker_mode == 'gthread':
+    workers = int(os.getenv('GUNICORN_WORKERS', 2 * cpus + 1))
+    threads = int(os.getenv('GUNICORN_THREADS', '4'))
+else:
+    # The event loop handles concurrency; more workers only add memory
+    workers = int(os.getenv('GUNICORN_WORKERS', cpus))
+    threads = 1
+
+# Import Django once in the master; workers share its pages copy-on-write
+preload_app = True
+
+# Recycle workers to bound slow leaks; jitter keeps them from restarting together
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = max(max_requests // 10, 1)
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = 30
+keepalive = 5
+
+# Heartbeat files on tmpfs; an overlay filesystem can stall workers
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    # Import the URLconf (views, forms, admin) once in the master rather than
+    # on each worker's first request
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+
+    # Anything the preloaded app connected to must not be shared with the workers
+    from django.db import connections
+    connections.close_all()
+    server.log.info('%s mode: %s workers x %s threads on %s CPUs', worker_mode, workers, threads, cpus)
+
+
+def post_fork(server, worker):
+    # Per-process state starts empty in every worker; this is also where a
+    # metrics registry would be created, so each worker reports on its own.
+    from core import async_views, routers
+    async_views._executor = None
+    routers._replica_health.clear()